@@ -0,0 +1,275 @@
+"""Vintage curves: late-payment and default rates by origination month, account type and months on book.
+
+Events are dated so that a closed calendar month never changes:
+
+* late: an installment not settled (paid in full) by its due date, in the month it fell due;
+* default: an account's first installment still unsettled ``DEFAULT_DPD`` days after its due
+  date, in the month that happened.
+
+An account counts once per cohort cell. Installments and accounts are streamed
+in one pass ordered by account and due date, in whole-account chunks that are
+folded into NumPy ``[event month, cohort, account type]`` matrices. Each
+closed event month is stored in ``cohort_events_monthly`` the first time it
+is computed; after that only accounts that can have events in the current
+month are streamed again.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+from django.db import connection, transaction
+
+ACCOUNT_TYPES = ("loan_general", "loan_emi", "credit_card_usage", "education_loan")
+DEFAULT_DPD = 90
+CHUNK_ROWS = 20000
+
+_TYPE_INDEX = {name: index for index, name in enumerate(ACCOUNT_TYPES)}
+
+_COHORT_SIZES_SQL = """
+    SELECT date_trunc('month', opened_date)::date, account_type, COUNT(*)
+    FROM credit_accounts
+    WHERE status NOT IN ('pending_approval', 'rejected')
+      AND account_type = ANY(%s)
+      AND opened_date < %s
+    GROUP BY 1, 2
+"""
+
+# Settlement requests live in payments too; only installments count. A partial payment
+# sets paid_date, so an installment is settled only once amount_paid covers amount_due.
+_STREAM_SQL = """
+    SELECT
+        ca.account_id,
+        ca.account_type,
+        ca.opened_date,
+        p.due_date,
+        CASE WHEN p.amount_paid >= p.amount_due THEN p.paid_date END
+    FROM credit_accounts ca
+    JOIN payments p ON p.account_id = ca.account_id
+    WHERE ca.status NOT IN ('pending_approval', 'rejected')
+      AND ca.account_type = ANY(%s)
+      AND ca.opened_date < %s
+      AND p.status IN ('due', 'late', 'paid')
+      AND p.due_date < %s
+      {accounts}
+    ORDER BY ca.account_id, p.due_date
+"""
+
+_RECENT_ACCOUNTS_SQL = """
+      AND ca.account_id IN (
+          SELECT account_id FROM payments
+          WHERE due_date >= %s AND due_date < %s AND status IN ('due', 'late', 'paid')
+      )
+"""
+
+
+def _month_index(value):
+    return value.year * 12 + value.month - 1
+
+
+def _month_date(index):
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _first_of_run(*columns):
+    """True where a row starts a new run of equal values across ``columns`` (rows are pre-sorted)."""
+    first = np.ones(len(columns[0]), dtype=bool)
+    if len(first) > 1:
+        changed = np.zeros(len(first) - 1, dtype=bool)
+        for column in columns:
+            changed |= column[1:] != column[:-1]
+        first[1:] = changed
+    return first
+
+
+class _Accumulator:
+    """Counts of late and newly defaulted accounts per [event month, cohort month, account type]."""
+
+    def __init__(self, base_month, months, as_of):
+        self.base_month = base_month
+        self.as_of = np.datetime64(as_of, "D")
+        self.late = np.zeros((months, months, len(ACCOUNT_TYPES)), dtype=np.int64)
+        self.defaults = np.zeros_like(self.late)
+
+    def _months(self, days):
+        return days.astype("datetime64[M]").astype(np.int64) + 1970 * 12 - self.base_month
+
+    def add(self, rows):
+        """Fold rows of whole accounts (every installment of each account present, in stream order)."""
+        account_ids, account_types, opened, due, settled = zip(*rows)
+        account_ids = np.asarray(account_ids, dtype=np.int64)
+        types = np.fromiter((_TYPE_INDEX[name] for name in account_types), dtype=np.int64, count=len(rows))
+        cohort = self._months(np.asarray(opened, dtype="datetime64[D]"))
+        due = np.asarray(due, dtype="datetime64[D]")
+        settled = np.asarray(settled, dtype="datetime64[D]")
+        # Seen from as_of, a later settlement has not happened yet.
+        unsettled = np.isnat(settled) | (settled >= self.as_of)
+
+        late = np.where(unsettled, due < self.as_of, settled > due)
+        event = self._months(due)
+        self._count(self.late, late, account_ids, event, cohort, types)
+
+        threshold = due + np.timedelta64(DEFAULT_DPD, "D")
+        defaulted = np.where(unsettled, threshold < self.as_of, settled > threshold)
+        # Only the first default per account: rows are in due-date order within an account.
+        first_default = np.zeros(len(rows), dtype=bool)
+        indices = np.flatnonzero(defaulted)
+        first_default[indices[_first_of_run(account_ids[indices])]] = True
+        self._count(self.defaults, first_default, account_ids, self._months(threshold), cohort, types)
+
+    @staticmethod
+    def _count(matrix, mask, account_ids, event, cohort, types):
+        mask = mask & (event >= cohort)
+        account_ids, event, cohort, types = account_ids[mask], event[mask], cohort[mask], types[mask]
+        first = _first_of_run(account_ids, event)
+        np.add.at(matrix, (event[first], cohort[first], types[first]), 1)
+
+
+def _stream(cursor, accumulator):
+    """Feed the accumulator whole accounts; the trailing account of a chunk waits for the next one."""
+    carry = []
+    while True:
+        rows = cursor.fetchmany(CHUNK_ROWS)
+        if not rows:
+            if carry:
+                accumulator.add(carry)
+            return
+        rows = carry + rows
+        cut = len(rows)
+        while cut and rows[cut - 1][0] == rows[-1][0]:
+            cut -= 1
+        carry = rows[cut:]
+        if cut:
+            accumulator.add(rows[:cut])
+
+
+def _store_closed_months(cursor, accumulator, months):
+    rows = []
+    for month in months:
+        offset = month - accumulator.base_month
+        late, defaults = accumulator.late[offset], accumulator.defaults[offset]
+        for cohort, type_index in zip(*np.nonzero(late | defaults)):
+            rows.append(
+                (
+                    _month_date(month),
+                    _month_date(accumulator.base_month + int(cohort)),
+                    ACCOUNT_TYPES[type_index],
+                    int(late[cohort, type_index]),
+                    int(defaults[cohort, type_index]),
+                )
+            )
+    if rows:
+        cursor.executemany(
+            """
+            INSERT INTO cohort_events_monthly (event_month, cohort_month, account_type, late_accounts, defaulted_accounts)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (event_month, cohort_month, account_type) DO UPDATE
+            SET late_accounts = EXCLUDED.late_accounts, defaulted_accounts = EXCLUDED.defaulted_accounts
+            """,
+            rows,
+        )
+    cursor.executemany(
+        "INSERT INTO cohort_cached_months (event_month) VALUES (%s) ON CONFLICT (event_month) DO NOTHING",
+        [(_month_date(month),) for month in months],
+    )
+
+
+def clear_cache():
+    with connection.cursor() as cursor:
+        cursor.execute("TRUNCATE cohort_events_monthly, cohort_cached_months")
+
+
+def compute_cohorts(as_of=None, account_types=ACCOUNT_TYPES, cohort_from=None, cohort_to=None, max_mob=None):
+    """Vintage curves as of ``as_of`` (exclusive, default today); only the current month is recomputed once cached.
+
+    ``cohort_from``/``cohort_to`` are origination months (dates, inclusive). Each curve runs
+    from month on book 0 to the cohort's current age (or ``max_mob``).
+    """
+    as_of = as_of or date.today()
+    current = _month_index(as_of)
+
+    with connection.cursor() as cursor:
+        cursor.execute(_COHORT_SIZES_SQL, [list(ACCOUNT_TYPES), as_of])
+        size_rows = cursor.fetchall()
+    if not size_rows:
+        return {"asOf": as_of.isoformat(), "defaultDpd": DEFAULT_DPD, "cohorts": []}
+
+    base = min(_month_index(cohort_month) for cohort_month, _, _ in size_rows)
+    months = current - base + 1
+    sizes = np.zeros((months, len(ACCOUNT_TYPES)), dtype=np.int64)
+    for cohort_month, account_type, count in size_rows:
+        sizes[_month_index(cohort_month) - base, _TYPE_INDEX[account_type]] = count
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT event_month FROM cohort_cached_months WHERE event_month < %s", [_month_date(current)])
+        cached = {_month_index(row[0]) for row in cursor.fetchall()}
+    missing = [month for month in range(base, current) if month not in cached]
+
+    accumulator = _Accumulator(base, months, as_of)
+    params = [list(ACCOUNT_TYPES), as_of, as_of]
+    accounts = ""
+    if not missing:
+        # Closed months are all cached: only accounts with an installment that can be late or
+        # reach default this month matter, but their whole history decides "first default".
+        accounts = _RECENT_ACCOUNTS_SQL
+        params += [_month_date(current) - timedelta(days=DEFAULT_DPD), as_of]
+    with transaction.atomic():
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(_STREAM_SQL.format(accounts=accounts), params)
+            _stream(cursor, accumulator)
+        if missing:
+            with connection.cursor() as cursor:
+                _store_closed_months(cursor, accumulator, missing)
+
+    # [cohort, type, months on book]
+    late = np.zeros((months, len(ACCOUNT_TYPES), months), dtype=np.int64)
+    defaults = np.zeros_like(late)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT event_month, cohort_month, account_type, late_accounts, defaulted_accounts
+            FROM cohort_events_monthly
+            WHERE event_month >= %s AND event_month < %s AND account_type = ANY(%s)
+            """,
+            [_month_date(base), _month_date(current), list(ACCOUNT_TYPES)],
+        )
+        cached_rows = cursor.fetchall()
+    if cached_rows:
+        event_months, cohort_months, types, late_counts, default_counts = zip(*cached_rows)
+        cohort = np.fromiter((_month_index(value) - base for value in cohort_months), dtype=np.int64)
+        mob = np.fromiter((_month_index(value) - base for value in event_months), dtype=np.int64) - cohort
+        type_index = np.fromiter((_TYPE_INDEX[name] for name in types), dtype=np.int64)
+        keep = (cohort >= 0) & (mob >= 0)
+        np.add.at(late, (cohort[keep], type_index[keep], mob[keep]), np.asarray(late_counts)[keep])
+        np.add.at(defaults, (cohort[keep], type_index[keep], mob[keep]), np.asarray(default_counts)[keep])
+
+    offset = current - base
+    cohort_index = np.arange(months)
+    current_mob = offset - cohort_index
+    late[cohort_index, :, current_mob] += accumulator.late[offset]
+    defaults[cohort_index, :, current_mob] += accumulator.defaults[offset]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        late_rate = late / sizes[:, :, None]
+        default_rate = np.cumsum(defaults, axis=2) / sizes[:, :, None]
+
+    wanted = [_TYPE_INDEX[name] for name in account_types if name in _TYPE_INDEX]
+    first = max(0, _month_index(cohort_from) - base) if cohort_from else 0
+    last = min(offset, _month_index(cohort_to) - base) if cohort_to else offset
+    cohorts = []
+    for cohort in range(first, last + 1):
+        observed = offset - cohort + 1
+        shown = observed if max_mob is None else min(observed, max_mob + 1)
+        for type_index in wanted:
+            if not sizes[cohort, type_index]:
+                continue
+            cohorts.append(
+                {
+                    "cohort": _month_date(base + cohort).strftime("%Y-%m"),
+                    "accountType": ACCOUNT_TYPES[type_index],
+                    "accounts": int(sizes[cohort, type_index]),
+                    "monthsOnBook": observed - 1,
+                    "lateRate": np.round(late_rate[cohort, type_index, :shown], 4).tolist(),
+                    "cumulativeDefaultRate": np.round(default_rate[cohort, type_index, :shown], 4).tolist(),
+                }
+            )
+    return {"asOf": as_of.isoformat(), "defaultDpd": DEFAULT_DPD, "cohorts": cohorts}
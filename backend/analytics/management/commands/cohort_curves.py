@@ -0,0 +1,68 @@
+import json
+import time
+from datetime import date
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.cohorts import ACCOUNT_TYPES, DEFAULT_DPD, clear_cache, compute_cohorts
+
+# Months on book shown in the console table.
+SNAPSHOT_MOBS = (3, 6, 12, 24)
+
+
+class Command(BaseCommand):
+    help = (
+        "Vintage curves (late-payment and cumulative default rates by origination month, account type and months "
+        "on book). Closed months are cached in cohort_events_monthly, so repeated runs only recompute this month."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--as-of", help="Cut-off date (YYYY-MM-DD, exclusive). Defaults to today.")
+        parser.add_argument("--account-type", action="append", choices=ACCOUNT_TYPES, help="Repeat to select several.")
+        parser.add_argument("--max-mob", type=int, default=36, help="Longest months-on-book curve to report.")
+        parser.add_argument("--rebuild", action="store_true", help="Drop the cached months first (after backfills).")
+        parser.add_argument("--output", help="Write the full curves as JSON to this path.")
+
+    def handle(self, *args, **options):
+        as_of = None
+        if options["as_of"]:
+            try:
+                as_of = date.fromisoformat(options["as_of"])
+            except ValueError as exc:
+                raise CommandError("--as-of must be YYYY-MM-DD.") from exc
+        if options["max_mob"] < 0:
+            raise CommandError("--max-mob must not be negative.")
+
+        if options["rebuild"]:
+            clear_cache()
+        started = time.perf_counter()
+        result = compute_cohorts(
+            as_of=as_of,
+            account_types=options["account_type"] or ACCOUNT_TYPES,
+            max_mob=options["max_mob"],
+        )
+        elapsed = time.perf_counter() - started
+
+        header = "".join(f" {f'late@{mob}':>8}" for mob in SNAPSHOT_MOBS) + "".join(
+            f" {f'dflt@{mob}':>8}" for mob in SNAPSHOT_MOBS
+        )
+        self.stdout.write(f"{'cohort':<8} {'type':<18} {'accounts':>8}{header}")
+        for curve in result["cohorts"]:
+            cells = [
+                series[mob] if mob < len(series) else None
+                for series in (curve["lateRate"], curve["cumulativeDefaultRate"])
+                for mob in SNAPSHOT_MOBS
+            ]
+            self.stdout.write(
+                f"{curve['cohort']:<8} {curve['accountType']:<18} {curve['accounts']:>8}"
+                + "".join(f" {'-' if cell is None else f'{cell * 100:.2f}%':>8}" for cell in cells)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(result['cohorts'])} cohorts as of {result['asOf']} (default = {DEFAULT_DPD}+ DPD) "
+                f"in {elapsed * 1000:.0f}ms."
+            )
+        )
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(result, indent=2) + "\n")
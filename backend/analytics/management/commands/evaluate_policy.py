@@ -0,0 +1,77 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from daulterprobability.services import calculate_default_probability
+from evaluation.policy import PolicyError, get_policy, load_policy
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the credit policy over every scored user in portfolio_user_risk (refresh_portfolio keeps it "
+        "current). With a candidate policy file, report how its decisions differ from the active policy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("candidate", nargs="?", help="Policy JSON to compare with the active one.")
+
+    def handle(self, *args, **options):
+        active = get_policy()
+        candidate = None
+        if options["candidate"]:
+            try:
+                candidate = load_policy(options["candidate"])
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"{options['candidate']}: {exc}")
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT r.score, r.risk_category, r.utilization_pct, u.employment_type
+                FROM portfolio_user_risk r
+                JOIN users u USING (user_id)
+                """
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            self.stdout.write("portfolio_user_risk is empty; run refresh_portfolio first.")
+            return
+
+        started = time.perf_counter()
+        scores, risks, utilizations, employment_types = (list(column) for column in zip(*rows))
+        columns = {
+            "score": scores,
+            "pd": [
+                calculate_default_probability(score, risk_category=risk, utilization_pct=utilization)
+                for score, risk, utilization in zip(scores, risks, utilizations)
+            ],
+            "utilization": utilizations,
+            "risk": risks,
+            "employment_type": employment_types,
+        }
+        try:
+            current = active.evaluate_many(**columns)
+            proposed = candidate.evaluate_many(**columns) if candidate else None
+        except PolicyError as exc:
+            raise CommandError(str(exc))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self._report(f"Active policy {active.version}", current, len(rows))
+        if proposed is not None:
+            self._report(f"Candidate policy {candidate.version}", proposed, len(rows))
+            moves = Counter(zip(current["decision"].tolist(), proposed["decision"].tolist()))
+            changed = sum(count for (before, after), count in moves.items() if before != after)
+            self.stdout.write(f"{changed} of {len(rows)} decisions change:")
+            for (before, after), count in sorted(moves.items()):
+                if before != after:
+                    self.stdout.write(f"  {before} -> {after}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Evaluated {len(rows)} users in {elapsed_ms:.0f}ms."))
+
+    def _report(self, title, result, total):
+        self.stdout.write(title)
+        for decision, count in sorted(Counter(result["decision"].tolist()).items()):
+            self.stdout.write(f"  {decision}: {count} ({count / total:.1%})")
+        for rule, count in sorted(Counter(result["rule"].tolist()).items()):
+            self.stdout.write(f"  rule {rule}: {count}")
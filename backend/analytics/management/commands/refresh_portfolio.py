@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.services import refresh_portfolio
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the portfolio aggregates behind /api/admin/portfolio/summary. Safe to run while the API "
+        "serves traffic; schedule it as often as the summary needs to be fresh."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full-trend",
+            action="store_true",
+            help="Recompute every month of the trend, not just the newest ones (after backfilling score_history).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        users, months = refresh_portfolio(full_trend=options["full_trend"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Portfolio refreshed: {users} scored users, {months} trend month(s) "
+                f"in {(time.perf_counter() - started) * 1000:.0f}ms."
+            )
+        )
@@ -0,0 +1,263 @@
+"""Portfolio risk distributions, precomputed so the admin summary is one row read.
+
+``refresh_portfolio`` refreshes the per-user materialized view CONCURRENTLY
+(readers are never blocked), folds it into histograms and percentiles for
+score, utilization and probability of default, and stores the result in
+``portfolio_summary``. PD is not stored anywhere: users are grouped into
+(score, risk category, utilization band) cells, which is all the PD model
+reads, and each cell goes through ``calculate_default_probability`` once.
+
+The monthly trend is maintained by delta: only months from the newest stored
+one onwards are recomputed (``full=True`` redoes all of them, e.g. after a
+backfill), from raw snapshots plus the score_history_monthly rollups.
+"""
+
+import json
+import math
+from collections import Counter
+
+from django.db import connection, transaction
+
+from core.db import queries
+from core.renderers import dumps
+from creditscore_calculator.services import SCORE_MAX, SCORE_MIN
+from daulterprobability.services import calculate_default_probability
+
+SCORE_BIN_WIDTH = 25
+# Utilization bins of 10 points; the last one collects everything from 100% up.
+UTILIZATION_BIN_WIDTH = 10
+UTILIZATION_BINS = 11
+PD_BIN_WIDTH = 0.05
+PD_BINS = 20
+PERCENTILES = (0.10, 0.25, 0.50, 0.75, 0.90)
+RISK_CATEGORIES = ("LOW", "MEDIUM", "HIGH")
+
+_CELLS_SQL = """
+    SELECT
+        LEAST(GREATEST(score, %s), %s) AS score,
+        risk_category,
+        -- Upper bound of the PD model's utilization band; the model only distinguishes these.
+        CASE
+            WHEN utilization_pct <= 30 THEN 30
+            WHEN utilization_pct <= 50 THEN 50
+            WHEN utilization_pct <= 75 THEN 75
+            ELSE 100
+        END AS utilization_band,
+        LEAST(GREATEST(FLOOR(utilization_pct / %s), 0), %s)::int AS utilization_bin,
+        COUNT(*)
+    FROM portfolio_user_risk
+    GROUP BY 1, 2, 3, 4
+"""
+
+_STATS_SQL = """
+    SELECT
+        COUNT(*),
+        AVG(score)::float8,
+        AVG(utilization_pct),
+        percentile_disc(%s::float8[]) WITHIN GROUP (ORDER BY score),
+        percentile_disc(%s::float8[]) WITHIN GROUP (ORDER BY utilization_pct),
+        (SELECT COUNT(*) FROM users)
+    FROM portfolio_user_risk
+"""
+
+_TREND_SQL = """
+    WITH snapshots AS (
+        SELECT
+            user_id,
+            date_trunc('month', calculated_at AT TIME ZONE 'UTC')::date AS month,
+            COUNT(*) AS snapshots,
+            SUM(score) AS score_sum,
+            (array_agg(score ORDER BY calculated_at DESC))[1] AS last_score,
+            (array_agg(risk_level ORDER BY calculated_at DESC))[1] AS last_risk_level,
+            MAX(calculated_at) AS last_calculated_at
+        FROM score_history
+        WHERE calculated_at >= %s::timestamp AT TIME ZONE 'UTC'
+        GROUP BY 1, 2
+        UNION ALL
+        SELECT user_id, month, snapshots, score_avg * snapshots, last_score, last_risk_level, last_calculated_at
+        FROM score_history_monthly
+        WHERE month >= %s::date
+    ),
+    per_user AS (
+        SELECT
+            month,
+            SUM(snapshots) AS snapshots,
+            SUM(score_sum) AS score_sum,
+            (array_agg(last_score ORDER BY last_calculated_at DESC))[1] AS last_score,
+            UPPER((array_agg(last_risk_level ORDER BY last_calculated_at DESC))[1]) AS last_risk_level
+        FROM snapshots
+        GROUP BY user_id, month
+    ),
+    categorized AS (
+        SELECT
+            month,
+            snapshots,
+            score_sum,
+            CASE
+                WHEN last_risk_level IN ('LOW', 'MEDIUM', 'HIGH') THEN last_risk_level
+                WHEN last_score >= 700 THEN 'LOW'
+                WHEN last_score >= 650 THEN 'MEDIUM'
+                ELSE 'HIGH'
+            END AS risk_category
+        FROM per_user
+    )
+    INSERT INTO portfolio_monthly_trend (
+        month, users, snapshots, avg_score, low_users, medium_users, high_users, refreshed_at
+    )
+    SELECT
+        month,
+        COUNT(*),
+        SUM(snapshots),
+        ROUND(SUM(score_sum) / SUM(snapshots), 2),
+        COUNT(*) FILTER (WHERE risk_category = 'LOW'),
+        COUNT(*) FILTER (WHERE risk_category = 'MEDIUM'),
+        COUNT(*) FILTER (WHERE risk_category = 'HIGH'),
+        NOW()
+    FROM categorized
+    GROUP BY month
+    ON CONFLICT (month) DO UPDATE
+    SET users = EXCLUDED.users,
+        snapshots = EXCLUDED.snapshots,
+        avg_score = EXCLUDED.avg_score,
+        low_users = EXCLUDED.low_users,
+        medium_users = EXCLUDED.medium_users,
+        high_users = EXCLUDED.high_users,
+        refreshed_at = EXCLUDED.refreshed_at
+"""
+
+
+def _percentiles(values):
+    return {f"p{round(fraction * 100)}": value for fraction, value in zip(PERCENTILES, values or ())}
+
+
+def _weighted_percentiles(counts):
+    """Nearest-rank percentiles of {value: count}, the same definition as percentile_disc."""
+    total = sum(counts.values())
+    if not total:
+        return {}
+    ordered = sorted(counts.items())
+    result = {}
+    for fraction in PERCENTILES:
+        rank = max(1, math.ceil(fraction * total))
+        seen = 0
+        for value, count in ordered:
+            seen += count
+            if seen >= rank:
+                result[f"p{round(fraction * 100)}"] = value
+                break
+    return result
+
+
+def _histogram(counts, bins, width, start=0, open_ended=False):
+    histogram = []
+    for index in range(bins):
+        lower = start + index * width
+        upper = None if open_ended and index == bins - 1 else start + (index + 1) * width
+        histogram.append({"from": round(lower, 4), "to": None if upper is None else round(upper, 4), "count": counts[index]})
+    return histogram
+
+
+def build_summary(stats_row, cell_rows):
+    """Summary JSON from _STATS_SQL's row and _CELLS_SQL's rows."""
+    scored_users, mean_score, mean_utilization, score_percentiles, utilization_percentiles, total_users = stats_row
+    score_bins = (SCORE_MAX - SCORE_MIN) // SCORE_BIN_WIDTH
+
+    score_counts = Counter()
+    utilization_counts = Counter()
+    risk_counts = Counter()
+    pd_values = Counter()
+    for score, risk_category, utilization_band, utilization_bin, count in cell_rows:
+        score_counts[min((score - SCORE_MIN) // SCORE_BIN_WIDTH, score_bins - 1)] += count
+        utilization_counts[utilization_bin] += count
+        risk_counts[risk_category] += count
+        probability = calculate_default_probability(score, risk_category=risk_category, utilization_pct=utilization_band)
+        pd_values[probability] += count
+
+    pd_counts = Counter()
+    for probability, count in pd_values.items():
+        pd_counts[min(int(round(probability / PD_BIN_WIDTH, 6)), PD_BINS - 1)] += count
+    expected_defaults = sum(probability * count for probability, count in pd_values.items())
+
+    return {
+        "scoredUsers": scored_users,
+        "unscoredUsers": max(0, total_users - scored_users),
+        "riskLevels": {category: risk_counts[category] for category in RISK_CATEGORIES},
+        "score": {
+            "mean": round(mean_score, 2) if mean_score is not None else None,
+            "percentiles": _percentiles(score_percentiles),
+            "histogram": _histogram(score_counts, score_bins, SCORE_BIN_WIDTH, start=SCORE_MIN),
+        },
+        "utilization": {
+            "mean": round(mean_utilization, 2) if mean_utilization is not None else None,
+            "percentiles": {key: round(value, 2) for key, value in _percentiles(utilization_percentiles).items()},
+            "histogram": _histogram(utilization_counts, UTILIZATION_BINS, UTILIZATION_BIN_WIDTH, open_ended=True),
+        },
+        "probabilityOfDefault": {
+            "mean": round(expected_defaults / scored_users, 4) if scored_users else None,
+            "expectedDefaults": round(expected_defaults, 1),
+            "percentiles": _weighted_percentiles(pd_values),
+            "histogram": _histogram(pd_counts, PD_BINS, PD_BIN_WIDTH),
+        },
+    }
+
+
+def refresh_trend(cursor, full=False):
+    """Recompute the monthly trend from the newest stored month on (every month with ``full``)."""
+    since = None
+    if not full:
+        cursor.execute("SELECT MAX(month) FROM portfolio_monthly_trend")
+        since = cursor.fetchone()[0]
+    since = since.isoformat() if since else "-infinity"
+    cursor.execute(_TREND_SQL, [since, since])
+    return cursor.rowcount
+
+
+def refresh_portfolio(full_trend=False):
+    """Refresh every portfolio aggregate; returns (scored_users, trend_months_written)."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT ispopulated FROM pg_matviews WHERE matviewname = 'portfolio_user_risk'")
+        row = cursor.fetchone()
+        concurrently = " CONCURRENTLY" if row and row[0] else ""
+        cursor.execute(f"REFRESH MATERIALIZED VIEW{concurrently} portfolio_user_risk")
+
+        cursor.execute(_STATS_SQL, [list(PERCENTILES), list(PERCENTILES)])
+        stats_row = cursor.fetchone()
+        cursor.execute(_CELLS_SQL, [SCORE_MIN, SCORE_MAX, UTILIZATION_BIN_WIDTH, UTILIZATION_BINS - 1])
+        summary = build_summary(stats_row, cursor.fetchall())
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO portfolio_summary (summary_id, summary, refreshed_at)
+                VALUES (1, %s::jsonb, NOW())
+                ON CONFLICT (summary_id) DO UPDATE
+                SET summary = EXCLUDED.summary, refreshed_at = EXCLUDED.refreshed_at
+                """,
+                [dumps(summary).decode()],
+            )
+            months = refresh_trend(cursor, full=full_trend)
+    return summary["scoredUsers"], months
+
+
+def load_summary(cursor, months=12):
+    """The stored summary plus the newest ``months`` of trend, oldest first; None before the first refresh."""
+    row = queries.fetchone(cursor, queries.PORTFOLIO_SUMMARY)
+    if row is None:
+        return None
+    summary, refreshed_at = row
+    if isinstance(summary, (str, bytes)):
+        summary = json.loads(summary)
+    trend_rows = queries.fetchall(cursor, queries.PORTFOLIO_TREND, [months])
+    summary["refreshedAt"] = refreshed_at.isoformat()
+    summary["trend"] = [
+        {
+            "month": month.strftime("%Y-%m"),
+            "users": users,
+            "snapshots": snapshots,
+            "avgScore": float(avg_score),
+            "riskLevels": {"LOW": low_users, "MEDIUM": medium_users, "HIGH": high_users},
+        }
+        for month, users, snapshots, avg_score, low_users, medium_users, high_users in reversed(trend_rows)
+    ]
+    return summary
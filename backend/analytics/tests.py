@@ -0,0 +1,102 @@
+from datetime import date
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from analytics.cohorts import ACCOUNT_TYPES, _Accumulator, _month_index
+from analytics.services import build_summary
+from daulterprobability.services import calculate_default_probability
+
+LOAN_GENERAL = ACCOUNT_TYPES.index("loan_general")
+LOAN_EMI = ACCOUNT_TYPES.index("loan_emi")
+CREDIT_CARD = ACCOUNT_TYPES.index("credit_card_usage")
+
+
+def _cells(matrix):
+    """{(event month, cohort month, account type): count} for the non-zero cells."""
+    return {tuple(int(i) for i in index): int(matrix[tuple(index)]) for index in np.argwhere(matrix)}
+
+
+class AccumulatorTests(SimpleTestCase):
+    def setUp(self):
+        # Months are offsets from January 2024.
+        self.accumulator = _Accumulator(_month_index(date(2024, 1, 1)), 7, date(2024, 6, 15))
+
+    def add(self, rows):
+        self.accumulator.add(rows)
+        return _cells(self.accumulator.late), _cells(self.accumulator.defaults)
+
+    def test_late_installments_count_once_per_account_and_month(self):
+        opened = date(2024, 1, 10)
+        late, defaults = self.add(
+            [
+                (1, "loan_emi", opened, date(2024, 2, 10), date(2024, 2, 5)),
+                (1, "loan_emi", opened, date(2024, 3, 10), date(2024, 3, 20)),
+                (1, "loan_emi", opened, date(2024, 3, 25), None),
+                (1, "loan_emi", opened, date(2024, 4, 10), None),
+            ]
+        )
+        self.assertEqual(late, {(2, 0, LOAN_EMI): 1, (3, 0, LOAN_EMI): 1})
+        # 90 days past April 10 is after as_of.
+        self.assertEqual(defaults, {})
+
+    def test_first_default_only(self):
+        opened = date(2024, 1, 5)
+        late, defaults = self.add(
+            [
+                (2, "credit_card_usage", opened, date(2024, 1, 20), None),
+                (2, "credit_card_usage", opened, date(2024, 2, 20), None),
+            ]
+        )
+        self.assertEqual(late, {(0, 0, CREDIT_CARD): 1, (1, 0, CREDIT_CARD): 1})
+        # January 20 + 90 days falls in April; the February installment defaulting later does not count.
+        self.assertEqual(defaults, {(3, 0, CREDIT_CARD): 1})
+
+    def test_settlement_after_as_of_has_not_happened(self):
+        late, defaults = self.add(
+            [
+                (3, "loan_general", date(2024, 4, 1), date(2024, 5, 1), date(2024, 7, 1)),
+                (4, "loan_general", date(2024, 4, 1), date(2024, 5, 1), date(2024, 5, 1)),
+            ]
+        )
+        self.assertEqual(late, {(4, 3, LOAN_GENERAL): 1})
+        self.assertEqual(defaults, {})
+
+
+class BuildSummaryTests(SimpleTestCase):
+    stats_row = (3, 700.0, 40.0, [600, 650, 800, 800, 800], [10.0, 20.0, 30.0, 60.0, 120.0], 5)
+    cell_rows = [(800, "LOW", 30, 2, 2), (600, "HIGH", 100, 10, 1)]
+
+    def test_counts_and_histograms(self):
+        summary = build_summary(self.stats_row, self.cell_rows)
+        self.assertEqual(summary["scoredUsers"], 3)
+        self.assertEqual(summary["unscoredUsers"], 2)
+        self.assertEqual(summary["riskLevels"], {"LOW": 2, "MEDIUM": 0, "HIGH": 1})
+        self.assertEqual(summary["score"]["mean"], 700.0)
+        self.assertEqual(summary["score"]["percentiles"]["p50"], 800)
+
+        score_histogram = summary["score"]["histogram"]
+        self.assertEqual(sum(bin["count"] for bin in score_histogram), 3)
+        self.assertEqual(next(bin for bin in score_histogram if bin["from"] == 800)["count"], 2)
+        self.assertEqual(score_histogram[-1]["to"], 850)
+
+        utilization_histogram = summary["utilization"]["histogram"]
+        self.assertEqual(utilization_histogram[2]["count"], 2)
+        self.assertEqual(utilization_histogram[-1], {"from": 100, "to": None, "count": 1})
+
+    def test_probability_of_default(self):
+        low = calculate_default_probability(800, risk_category="LOW", utilization_pct=30)
+        high = calculate_default_probability(600, risk_category="HIGH", utilization_pct=100)
+        pd = build_summary(self.stats_row, self.cell_rows)["probabilityOfDefault"]
+        self.assertEqual(pd["expectedDefaults"], round(2 * low + high, 1))
+        self.assertEqual(pd["mean"], round((2 * low + high) / 3, 4))
+        self.assertEqual(pd["percentiles"]["p50"], low)
+        self.assertEqual(pd["percentiles"]["p90"], high)
+        self.assertEqual(sum(bin["count"] for bin in pd["histogram"]), 3)
+
+    def test_no_scored_users(self):
+        summary = build_summary((0, None, None, None, None, 4), [])
+        self.assertEqual(summary["unscoredUsers"], 4)
+        self.assertIsNone(summary["score"]["mean"])
+        self.assertIsNone(summary["probabilityOfDefault"]["mean"])
+        self.assertEqual(summary["probabilityOfDefault"]["percentiles"], {})
@@ -0,0 +1,85 @@
+from datetime import date
+
+from django.db import connection
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from authentication.services import has_admin_claim
+
+from .services import load_summary
+
+MAX_TREND_MONTHS = 120
+MAX_MONTHS_ON_BOOK = 240
+
+
+def _parse_month(value):
+    """``YYYY-MM`` -> first day of that month; raises ValueError."""
+    year, month = value.split("-")
+    return date(int(year), int(month), 1)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def portfolio_summary(request):
+    """Score, PD, risk-level and utilization distributions as of the last refresh_portfolio run."""
+    if not has_admin_claim(request):
+        return Response({"detail": "Admin authorization required."}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        months = int(request.query_params.get("months", 12))
+    except (TypeError, ValueError):
+        months = 0
+    if not 1 <= months <= MAX_TREND_MONTHS:
+        return Response(
+            {"error": f"months must be between 1 and {MAX_TREND_MONTHS}."}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    with connection.cursor() as cursor:
+        summary = load_summary(cursor, months)
+
+    if summary is None:
+        return Response(
+            {"detail": "Portfolio summary has not been built yet; run refresh_portfolio."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(summary, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def portfolio_cohorts(request):
+    """Late-payment and cumulative default curves by origination month, account type and months on book."""
+    if not has_admin_claim(request):
+        return Response({"detail": "Admin authorization required."}, status=status.HTTP_403_FORBIDDEN)
+
+    # NumPy is only loaded by the processes that serve this endpoint.
+    from .cohorts import ACCOUNT_TYPES, compute_cohorts
+
+    params = request.query_params
+    account_types = [name.strip() for name in params.get("accountType", "").split(",") if name.strip()]
+    unknown = sorted(set(account_types) - set(ACCOUNT_TYPES))
+    if unknown:
+        return Response(
+            {"error": f"Unknown accountType {', '.join(unknown)}; expected one of {', '.join(ACCOUNT_TYPES)}."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        cohort_from = _parse_month(params["from"]) if params.get("from") else None
+        cohort_to = _parse_month(params["to"]) if params.get("to") else None
+        max_mob = int(params.get("maxMob", 36))
+    except ValueError:
+        return Response({"error": "from/to must be YYYY-MM and maxMob an integer."}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 <= max_mob <= MAX_MONTHS_ON_BOOK:
+        return Response(
+            {"error": f"maxMob must be between 0 and {MAX_MONTHS_ON_BOOK}."}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    result = compute_cohorts(
+        account_types=account_types or ACCOUNT_TYPES,
+        cohort_from=cohort_from,
+        cohort_to=cohort_to,
+        max_mob=max_mob,
+    )
+    return Response(result, status=status.HTTP_200_OK)
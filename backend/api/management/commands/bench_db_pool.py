@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.db.pool import ConnectionPool
+from core.timing import summarize_ms
+
+
+class Command(BaseCommand):
+    help = "Compare per-request connection setup against pooled checkouts on the configured database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--no-pre-ping", action="store_true")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        threads = options["threads"]
+        if iterations <= 0 or threads <= 0:
+            raise CommandError("--iterations and --threads must be greater than 0.")
+
+        wrapper = connections[options["database"]]
+        params = wrapper.get_connection_params()
+
+        def connect():
+            return wrapper.Database.connect(**params)
+
+        def query(conn):
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+
+        def direct(_):
+            started = time.perf_counter()
+            conn = connect()
+            try:
+                query(conn)
+            finally:
+                conn.close()
+            return time.perf_counter() - started
+
+        pool = ConnectionPool(connect, min_size=threads, max_size=threads, pre_ping=not options["no_pre_ping"])
+        pool.fill()
+
+        def pooled(_):
+            started = time.perf_counter()
+            conn = pool.acquire()
+            try:
+                query(conn)
+            finally:
+                pool.release(conn)
+            return time.perf_counter() - started
+
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                results = [
+                    ("connect per request", summarize_ms(list(executor.map(direct, range(iterations))))),
+                    ("pooled checkout", summarize_ms(list(executor.map(pooled, range(iterations))))),
+                ]
+            stats = pool.stats()
+        finally:
+            pool.close()
+
+        for label, summary in results:
+            self.stdout.write(
+                f"{label:<20} p50={summary['p50']:.3f}ms p95={summary['p95']:.3f}ms "
+                f"p99={summary['p99']:.3f}ms mean={summary['mean']:.3f}ms"
+            )
+        self.stdout.write(
+            f"pool: checkouts={stats['checkouts']} waits={stats['waits']} "
+            f"wait_avg={stats['wait_seconds_avg'] * 1000:.3f}ms created={stats['created']}"
+        )
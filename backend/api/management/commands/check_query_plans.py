@@ -0,0 +1,176 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.db import queries
+
+# Statement name -> params built from the sample applicant; every registered read must be listed.
+SAMPLE_PARAMS = {
+    queries.USERS_EXISTS: lambda s: [s["username"], f"{s['username']}@plan-check.invalid"],
+    queries.USERS_TOKEN_USER_BY_USERNAME: lambda s: [s["username"], "plan-check"],
+    queries.USERS_TOKEN_USER: lambda s: [s["user_id"], "plan-check"],
+    queries.USERS_CREDENTIALS: lambda s: [s["username"]],
+    queries.USERS_RESOLVE_APPLICANT: lambda s: [str(s["user_id"]), s["username"]],
+    queries.USERS_MONTHLY_INCOME: lambda s: [s["user_id"]],
+    queries.TOKENS_IS_REVOKED: lambda s: ["plan-check"],
+    queries.SCORES_RECENT: lambda s: [s["user_id"]],
+    queries.SCORES_LATEST: lambda s: [s["user_id"]],
+    queries.ACCOUNTS_ACTIVE_TOTALS: lambda s: [s["user_id"]],
+    queries.ACCOUNTS_SCORING_SUMMARY: lambda s: [s["user_id"]],
+    queries.ACCOUNTS_QUOTE_FEATURES: lambda s: [0.05, s["user_id"]],
+    queries.ACCOUNTS_ACTIVE_LOANS: lambda s: [s["user_id"]],
+    queries.ACCOUNTS_ACTIVE_FOR_USER: lambda s: [s["account_id"], s["user_id"]],
+    queries.ACCOUNTS_PENDING_FOR_USER: lambda s: [s["user_id"]],
+    queries.ACCOUNTS_PENDING_BY_ID: lambda s: [s["account_id"], s["user_id"]],
+    queries.PAYMENTS_RECENT_FOR_USER: lambda s: [s["user_id"]],
+    queries.PAYMENTS_HISTORY_FOR_USER: lambda s: [s["user_id"]],
+    queries.PAYMENTS_FOR_SCORING: lambda s: [s["user_id"]],
+    queries.PAYMENTS_PENDING_FOR_USER: lambda s: [s["user_id"]],
+    queries.PAYMENTS_PENDING_SETTLEMENT_BY_ID: lambda s: [s["payment_id"], s["user_id"]],
+    queries.PAYMENTS_OLDEST_OPEN_INSTALLMENT: lambda s: [s["account_id"]],
+    queries.IDEMPOTENCY_GET: lambda s: [s["user_id"], "plan-check", "plan-check"],
+    queries.PINS_ACTIVE: lambda s: [f"user:{s['user_id']}"],
+    queries.PORTFOLIO_SUMMARY: lambda s: [],
+    queries.PORTFOLIO_TREND: lambda s: [12],
+}
+
+# Sorts that are part of the design: a top-N over the handful of rows one applicant owns.
+EXPECTED_SORTS = {
+    queries.SCORES_RECENT: "merges the newest raw and rolled-up snapshots",
+    queries.SCORES_LATEST: "merges the newest raw and rolled-up snapshots",
+    queries.ACCOUNTS_ACTIVE_LOANS: "groups one applicant's accounts",
+    queries.PAYMENTS_RECENT_FOR_USER: "top 8 across one applicant's accounts",
+    queries.PAYMENTS_HISTORY_FOR_USER: "top 30 over per-account slices that are already index-ordered",
+    queries.PAYMENTS_PENDING_FOR_USER: "pending installments across one applicant's accounts",
+}
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN every registered read statement against the current database (load one with generate_dataset) "
+        "and fail when a plan sequentially scans a large table or sorts where no sort is expected."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10000,
+            help="Sequential scans are only flagged on relations with at least this many estimated rows.",
+        )
+        parser.add_argument("--user-id", type=int, help="Sample applicant; defaults to the one with the most accounts.")
+        parser.add_argument("--analyze", action="store_true", help="Refresh planner statistics first.")
+        parser.add_argument(
+            "--custom-only",
+            action="store_true",
+            help="Skip the generic plans the registry's prepared statements fall back to.",
+        )
+        parser.add_argument("--output", help="Write every plan and finding as JSON to this path.")
+
+    def handle(self, *args, **options):
+        unlisted = sorted(
+            name
+            for name, statement in queries.registered().items()
+            if statement.kind == "read" and name not in SAMPLE_PARAMS
+        )
+        if unlisted:
+            raise CommandError(f"No sample params for {', '.join(unlisted)}; add them to SAMPLE_PARAMS.")
+
+        with connection.cursor() as cursor:
+            if options["analyze"]:
+                for table in ("users", "credit_accounts", "payments", "score_history", "score_history_monthly"):
+                    cursor.execute(f"ANALYZE {table}")
+            sample = self._sample(cursor, options["user_id"])
+            cursor.execute(
+                """
+                SELECT relname, reltuples
+                FROM pg_class
+                WHERE relkind = 'r' AND relnamespace = current_schema()::regnamespace
+                """
+            )
+            row_estimates = dict(cursor.fetchall())
+
+        modes = ("custom",) if options["custom_only"] else ("custom", "generic")
+        report = {"sample": sample, "statements": {}}
+        failures = 0
+        for name in sorted(SAMPLE_PARAMS):
+            params = SAMPLE_PARAMS[name](sample)
+            for mode in modes:
+                plan = self._explain(name, params, mode)
+                findings = self._findings(name, plan, row_estimates, options["min_rows"])
+                report["statements"][f"{name}[{mode}]"] = {"findings": findings, "plan": plan}
+                if findings:
+                    failures += 1
+                    self.stdout.write(self.style.ERROR(f"FAIL {name} [{mode}]"))
+                    for finding in findings:
+                        self.stdout.write(f"    {finding}")
+                else:
+                    self.stdout.write(f"ok   {name} [{mode}]")
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2, default=str) + "\n")
+        if failures:
+            raise CommandError(f"{failures} plan(s) regressed.")
+        self.stdout.write(self.style.SUCCESS(f"{len(SAMPLE_PARAMS)} statements checked."))
+
+    def _sample(self, cursor, user_id):
+        cursor.execute(
+            """
+            SELECT ca.user_id, u.username, MIN(ca.account_id)
+            FROM credit_accounts ca
+            JOIN users u ON u.user_id = ca.user_id
+            WHERE %s::bigint IS NULL OR ca.user_id = %s::bigint
+            GROUP BY ca.user_id, u.username
+            ORDER BY COUNT(*) DESC, ca.user_id
+            LIMIT 1
+            """,
+            [user_id, user_id],
+        )
+        row = cursor.fetchone()
+        if row is None:
+            raise CommandError("No applicant with credit accounts found; run generate_dataset first.")
+        cursor.execute("SELECT MIN(payment_id) FROM payments WHERE account_id = %s", [row[2]])
+        payment_id = cursor.fetchone()[0]
+        return {"user_id": row[0], "username": row[1], "account_id": row[2], "payment_id": payment_id or 0}
+
+    def _explain(self, name, params, mode):
+        statement = queries.get(name)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if mode == "custom":
+                    cursor.execute(f"EXPLAIN (FORMAT JSON) {statement.sql}", params)
+                else:
+                    cursor.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+                    cursor.execute(f"PREPARE plan_check AS {statement.prepare_sql}")
+                    placeholders = ", ".join(["%s"] * statement.param_count)
+                    cursor.execute(
+                        "EXPLAIN (FORMAT JSON) EXECUTE plan_check" + (f" ({placeholders})" if placeholders else ""),
+                        params,
+                    )
+                plan = cursor.fetchone()[0]
+                if mode != "custom":
+                    cursor.execute("DEALLOCATE plan_check")
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    def _findings(self, name, plan, row_estimates, min_rows):
+        findings = []
+        for node in _plan_nodes(plan):
+            node_type = node["Node Type"]
+            if node_type == "Seq Scan":
+                relation = node.get("Relation Name")
+                rows = row_estimates.get(relation, 0)
+                if rows >= min_rows:
+                    findings.append(f"Seq Scan on {relation} (~{rows:,.0f} rows)")
+            elif node_type == "Sort" and name not in EXPECTED_SORTS:
+                findings.append(f"Sort on {', '.join(node.get('Sort Key', []))}")
+        return findings
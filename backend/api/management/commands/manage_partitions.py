@@ -0,0 +1,76 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.db import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Maintain the monthly partitions of payments and score_history: create upcoming months, split rows out "
+        "of the default partitions, and roll score_history past the retention window into score_history_monthly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=getattr(settings, "PARTITION_MONTHS_AHEAD", 3),
+            help="Future months to keep created.",
+        )
+        parser.add_argument(
+            "--retain-months",
+            type=int,
+            default=getattr(settings, "SCORE_HISTORY_RETAIN_MONTHS", 24),
+            help="Raw score_history months to keep (including the current one); 0 keeps everything.",
+        )
+        parser.add_argument(
+            "--table",
+            action="append",
+            choices=sorted(partitions.PARTITIONED_TABLES),
+            help="Limit to one table; repeatable.",
+        )
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Rebuild plain (pre-partitioning) tables as partitioned ones. Locks each table for the copy.",
+        )
+
+    def handle(self, *args, **options):
+        if options["ahead"] < 0 or options["retain_months"] < 0:
+            raise CommandError("--ahead and --retain-months must not be negative.")
+
+        current = partitions.month_start(date.today())
+        last_month = partitions.add_months(current, options["ahead"])
+        cutoff = partitions.add_months(current, 1 - options["retain_months"]) if options["retain_months"] else None
+
+        for table in options["table"] or sorted(partitions.PARTITIONED_TABLES):
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    if not partitions.is_partitioned(cursor, table):
+                        if not options["convert"]:
+                            self.stdout.write(self.style.WARNING(f"{table} is not partitioned; rerun with --convert."))
+                            continue
+                        copied = partitions.convert_to_partitioned(cursor, table, last_month)
+                        self.stdout.write(f"{table}: converted, {copied} rows copied.")
+
+            keep_from = None
+            if table == "score_history" and cutoff is not None:
+                # Commits month by month; one transaction would hold the DROP TABLE lock for all of them.
+                with connection.cursor() as cursor:
+                    dropped, deleted = partitions.roll_up_score_history(cursor, cutoff)
+                keep_from = cutoff
+                self.stdout.write(
+                    f"{table}: rolled up before {cutoff:%Y-%m}, dropped {len(dropped)} partitions, "
+                    f"deleted {deleted} default-partition rows."
+                )
+
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    created = partitions.split_default_partition(cursor, table, not_before=keep_from)
+                    created += partitions.ensure_partitions(cursor, table, current, last_month)
+            for name, moved in created:
+                self.stdout.write(f"  created {name}" + (f" ({moved} rows moved from default)" if moved else ""))
+            self.stdout.write(self.style.SUCCESS(f"{table}: partitions through {last_month:%Y-%m}."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.db.routing import REPLICA_ALIAS, replica_configured, replica_health
+
+
+class Command(BaseCommand):
+    help = "Check the replica alias used for GET reads: reachability, replay lag and which server answers."
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError("DATABASE_REPLICA_URL is not set; all reads use the default alias.")
+
+        reachable = replica_health.check()
+        stats = replica_health.stats()
+        self.stdout.write(f"replica reachable={reachable} healthy={stats['healthy']} lag={stats['lag_seconds']}s")
+        if stats["last_error"]:
+            self.stdout.write(f"last error: {stats['last_error']}")
+
+        for alias in ("default", REPLICA_ALIAS):
+            try:
+                with connections[alias].cursor() as cursor:
+                    cursor.execute("SELECT inet_server_addr(), inet_server_port(), pg_is_in_recovery()")
+                    address, port, in_recovery = cursor.fetchone()
+            except Exception as exc:
+                self.stdout.write(f"{alias:<8} unreachable: {exc}")
+                continue
+            self.stdout.write(f"{alias:<8} {address or 'local socket'}:{port} in_recovery={in_recovery}")
@@ -0,0 +1,70 @@
+"""The tables the application started with, as databse/data.sql first defined them.
+
+Databases loaded from data.sql already have them (IF NOT EXISTS makes this a
+no-op there); on an empty database this is where ``migrate`` starts. Later
+migrations bring the schema up to the current data.sql.
+"""
+
+from django.db import migrations
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+  user_id BIGSERIAL PRIMARY KEY,
+  full_name VARCHAR(120) NOT NULL,
+  username VARCHAR(64) NOT NULL UNIQUE,
+  email VARCHAR(120) NOT NULL UNIQUE,
+  password_hash TEXT NOT NULL,
+  monthly_income NUMERIC(14,2),
+  employment_type VARCHAR(80),
+  address TEXT,
+  dob DATE,
+  phone VARCHAR(30),
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS credit_accounts (
+  account_id BIGSERIAL PRIMARY KEY,
+  user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+  account_type VARCHAR(50) NOT NULL,
+  purpose TEXT,
+  tenure_months INTEGER,
+  credit_limit NUMERIC(14,2) NOT NULL DEFAULT 0,
+  current_balance NUMERIC(14,2) NOT NULL DEFAULT 0,
+  opened_date DATE NOT NULL DEFAULT CURRENT_DATE,
+  status VARCHAR(20) NOT NULL DEFAULT 'active'
+);
+
+CREATE TABLE IF NOT EXISTS payments (
+  payment_id BIGSERIAL PRIMARY KEY,
+  account_id BIGINT NOT NULL REFERENCES credit_accounts(account_id) ON DELETE CASCADE,
+  due_date DATE NOT NULL,
+  paid_date DATE,
+  amount_due NUMERIC(14,2) NOT NULL DEFAULT 0,
+  amount_paid NUMERIC(14,2) NOT NULL DEFAULT 0,
+  status VARCHAR(20) NOT NULL DEFAULT 'due'
+);
+
+CREATE TABLE IF NOT EXISTS score_history (
+  score_id BIGSERIAL PRIMARY KEY,
+  user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+  score INTEGER NOT NULL CHECK (score BETWEEN 300 AND 850),
+  risk_level VARCHAR(20) NOT NULL,
+  factors JSONB NOT NULL DEFAULT '{}'::jsonb,
+  calculated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_accounts_user_id ON credit_accounts (user_id);
+CREATE INDEX IF NOT EXISTS idx_payments_account_id ON payments (account_id);
+CREATE INDEX IF NOT EXISTS idx_score_user_id_time ON score_history (user_id, calculated_at DESC);
+"""
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        # Never dropped on the way back: these hold the application's data.
+        migrations.RunSQL(CREATE_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,54 @@
+"""Days-past-due columns, the score refresh queue and the open-installment index for age_delinquencies.
+
+Mirrors databse/data.sql. The index is built concurrently, so this migration
+runs outside a transaction.
+"""
+
+from django.db import migrations
+
+from core.db.partitions import create_index
+
+CREATE_SQL = """
+ALTER TABLE payments
+  ADD COLUMN IF NOT EXISTS days_past_due INTEGER NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS dpd_bucket SMALLINT NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS score_refresh_queue (
+  user_id BIGINT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+  reason VARCHAR(40) NOT NULL,
+  queued_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+"""
+
+DROP_SQL = """
+DROP TABLE IF EXISTS score_refresh_queue;
+ALTER TABLE payments DROP COLUMN IF EXISTS dpd_bucket, DROP COLUMN IF EXISTS days_past_due;
+"""
+
+
+def create_open_installment_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        create_index(
+            cursor,
+            "payments",
+            "idx_payments_open_payment_id",
+            "(payment_id) WHERE status IN ('due', 'late') AND amount_paid < amount_due",
+        )
+
+
+def drop_open_installment_index(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS idx_payments_open_payment_id")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("api", "0001_base_schema"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+        migrations.RunPython(create_open_installment_index, drop_open_installment_index),
+    ]
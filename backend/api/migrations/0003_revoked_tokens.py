@@ -0,0 +1,20 @@
+"""JWT ids revoked before expiry (authentication.services). Mirrors databse/data.sql."""
+
+from django.db import migrations
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+  jti VARCHAR(64) PRIMARY KEY,
+  expires_at TIMESTAMPTZ NOT NULL
+);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0002_delinquency_aging"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, "DROP TABLE IF EXISTS revoked_tokens"),
+    ]
@@ -0,0 +1,53 @@
+"""Monthly partitions for payments and score_history, and score_history_monthly for their rollups.
+
+Mirrors databse/data.sql. A database that predates partitioning has both
+tables rebuilt here with ``core.db.partitions.convert_to_partitioned``, which
+locks each table for the copy; on a large database run ``manage_partitions
+--convert`` in a maintenance window first and this finds nothing to convert.
+"""
+
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations
+
+from core.db import partitions
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS score_history_monthly (
+  user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+  month DATE NOT NULL,
+  snapshots INTEGER NOT NULL,
+  score_min INTEGER NOT NULL,
+  score_max INTEGER NOT NULL,
+  score_avg NUMERIC(6,2) NOT NULL,
+  last_score INTEGER NOT NULL,
+  last_risk_level VARCHAR(20) NOT NULL,
+  last_factors JSONB NOT NULL DEFAULT '{}'::jsonb,
+  last_calculated_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (user_id, month)
+);
+"""
+
+
+def partition_tables(apps, schema_editor):
+    current = partitions.month_start(date.today())
+    last_month = partitions.add_months(current, getattr(settings, "PARTITION_MONTHS_AHEAD", 3))
+    with schema_editor.connection.cursor() as cursor:
+        for table in sorted(partitions.PARTITIONED_TABLES):
+            if not partitions.is_partitioned(cursor, table):
+                partitions.convert_to_partitioned(cursor, table, last_month)
+            partitions.ensure_partitions(cursor, table, current, last_month)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0003_revoked_tokens"),
+    ]
+
+    operations = [
+        # Neither step is undone: the rollups replace raw rows that are gone, and the
+        # partitioned tables serve the same queries as the plain ones.
+        migrations.RunSQL(CREATE_SQL, migrations.RunSQL.noop),
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+"""Indexes behind the registered hot queries (core.db.queries); check_query_plans guards them.
+
+Every index is built concurrently and with IF NOT EXISTS, so this runs
+against a live database and against a fresh load of databse/data.sql, which
+already includes them.
+"""
+
+from django.db import migrations
+
+from core.db.partitions import create_index
+
+INDEXES = (
+    # accounts.active_totals / scoring_summary / active_loans: one user's accounts by status.
+    ("credit_accounts", "idx_accounts_user_status", "(user_id, status)"),
+    # accounts.pending_for_user: pending loans in display order without a sort.
+    ("credit_accounts", "idx_accounts_pending_approval", "(user_id, account_id DESC) WHERE status = 'pending_approval'"),
+    # payments.pending_for_user / pending_settlement_by_id.
+    ("payments", "idx_payments_pending_approval", "(account_id, payment_id) WHERE status = 'pending_approval'"),
+    # payments.oldest_open_installment.
+    (
+        "payments",
+        "idx_payments_open_by_account",
+        "(account_id, due_date, payment_id) WHERE status IN ('due', 'late') AND amount_paid < amount_due",
+    ),
+    # payments.history_for_user: per-account slices already in display order.
+    ("payments", "idx_payments_account_activity", "(account_id, (COALESCE(paid_date, due_date)) DESC, payment_id DESC)"),
+    # users.resolve_applicant: case-insensitive username lookup.
+    ("users", "idx_users_lower_username", "(LOWER(username))"),
+)
+
+
+def create_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, name, spec in INDEXES:
+            create_index(cursor, table, name, spec)
+        # Leading column of idx_accounts_user_status; keeping both only slows writes.
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_accounts_user_id")
+
+
+def drop_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_accounts_user_id ON credit_accounts (user_id)")
+        for _, name, _ in reversed(INDEXES):
+            # Dropping a partitioned index drops its per-partition children with it.
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("api", "0004_partitioned_history"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
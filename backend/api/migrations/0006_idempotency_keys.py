@@ -0,0 +1,31 @@
+"""Store for Idempotency-Key replays on the loan POSTs (payments.idempotency).
+
+Mirrors databse/data.sql; IF NOT EXISTS keeps it a no-op on a fresh load.
+"""
+
+from django.db import migrations
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+  user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+  scope VARCHAR(40) NOT NULL,
+  idem_key VARCHAR(255) NOT NULL,
+  request_hash CHAR(64) NOT NULL,
+  status_code SMALLINT NOT NULL,
+  response JSONB NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (user_id, scope, idem_key)
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys (expires_at);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0005_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, "DROP TABLE IF EXISTS idempotency_keys"),
+    ]
@@ -0,0 +1,77 @@
+"""Aggregates behind GET /api/admin/portfolio/summary (analytics.services).
+
+portfolio_user_risk holds one row per scored user and is refreshed
+CONCURRENTLY (it needs the unique index); portfolio_summary and
+portfolio_monthly_trend are written by refresh_portfolio. Mirrors
+databse/data.sql.
+
+The view pins the tables it reads, so it comes after 0004 has rebuilt
+score_history as a partitioned table.
+"""
+
+from django.db import migrations
+
+CREATE_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS portfolio_user_risk AS
+WITH latest AS (
+    SELECT DISTINCT ON (user_id) user_id, score, risk_level
+    FROM (
+        SELECT user_id, score, risk_level, calculated_at FROM score_history
+        UNION ALL
+        SELECT user_id, last_score, last_risk_level, last_calculated_at FROM score_history_monthly
+    ) snapshots
+    ORDER BY user_id, calculated_at DESC
+),
+balances AS (
+    SELECT user_id, SUM(credit_limit) AS total_limit, SUM(current_balance) AS total_balance
+    FROM credit_accounts
+    WHERE status = 'active'
+    GROUP BY user_id
+)
+SELECT
+    l.user_id,
+    l.score,
+    CASE
+        WHEN UPPER(l.risk_level) IN ('LOW', 'MEDIUM', 'HIGH') THEN UPPER(l.risk_level)
+        WHEN l.score >= 700 THEN 'LOW'
+        WHEN l.score >= 650 THEN 'MEDIUM'
+        ELSE 'HIGH'
+    END AS risk_category,
+    CASE WHEN b.total_limit > 0 THEN (b.total_balance / b.total_limit * 100)::float8 ELSE 0 END AS utilization_pct
+FROM latest l
+LEFT JOIN balances b USING (user_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_portfolio_user_risk_user ON portfolio_user_risk (user_id);
+
+CREATE TABLE IF NOT EXISTS portfolio_summary (
+  summary_id SMALLINT PRIMARY KEY CHECK (summary_id = 1),
+  summary JSONB NOT NULL,
+  refreshed_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS portfolio_monthly_trend (
+  month DATE PRIMARY KEY,
+  users INTEGER NOT NULL,
+  snapshots INTEGER NOT NULL,
+  avg_score NUMERIC(6,2) NOT NULL,
+  low_users INTEGER NOT NULL,
+  medium_users INTEGER NOT NULL,
+  high_users INTEGER NOT NULL,
+  refreshed_at TIMESTAMPTZ NOT NULL
+);
+"""
+
+DROP_SQL = """
+DROP TABLE IF EXISTS portfolio_monthly_trend;
+DROP TABLE IF EXISTS portfolio_summary;
+DROP MATERIALIZED VIEW IF EXISTS portfolio_user_risk;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0006_idempotency_keys"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
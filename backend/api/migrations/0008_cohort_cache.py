@@ -0,0 +1,34 @@
+"""Per closed month cache for the vintage curves (analytics.cohorts). Mirrors databse/data.sql."""
+
+from django.db import migrations
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS cohort_events_monthly (
+  event_month DATE NOT NULL,
+  cohort_month DATE NOT NULL,
+  account_type VARCHAR(50) NOT NULL,
+  late_accounts INTEGER NOT NULL,
+  defaulted_accounts INTEGER NOT NULL,
+  PRIMARY KEY (event_month, cohort_month, account_type)
+);
+
+CREATE TABLE IF NOT EXISTS cohort_cached_months (
+  event_month DATE PRIMARY KEY,
+  computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+"""
+
+DROP_SQL = """
+DROP TABLE IF EXISTS cohort_cached_months;
+DROP TABLE IF EXISTS cohort_events_monthly;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0007_portfolio_analytics"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,27 @@
+"""Cluster-wide counters for the loan POST velocity checks (payments.velocity). Mirrors databse/data.sql."""
+
+from django.db import migrations
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS velocity_counters (
+  scope VARCHAR(40) NOT NULL,
+  subject VARCHAR(80) NOT NULL,
+  window_seconds INTEGER NOT NULL,
+  window_start TIMESTAMPTZ NOT NULL,
+  current_hits INTEGER NOT NULL DEFAULT 0,
+  previous_hits INTEGER NOT NULL DEFAULT 0,
+  expires_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (scope, subject, window_seconds)
+);
+CREATE INDEX IF NOT EXISTS idx_velocity_counters_expires_at ON velocity_counters (expires_at);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0008_cohort_cache"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, "DROP TABLE IF EXISTS velocity_counters"),
+    ]
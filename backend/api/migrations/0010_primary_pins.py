@@ -0,0 +1,20 @@
+"""Read-your-writes pins shared by every worker (core.db.routing). Mirrors databse/data.sql."""
+
+from django.db import migrations
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS primary_pins (
+  subject VARCHAR(160) PRIMARY KEY,
+  pinned_until TIMESTAMPTZ NOT NULL
+);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0009_velocity_counters"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, "DROP TABLE IF EXISTS primary_pins"),
+    ]
@@ -1,3 +1,59 @@
-from django.test import TestCase
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TransactionTestCase
+
+DATA_SQL = Path(settings.BASE_DIR).parent / "databse" / "data.sql"
+
+
+def _seed_sql():
+    """The INSERTs at the end of data.sql; the schema itself comes from the migrations."""
+    text = DATA_SQL.read_text(encoding="utf-8")
+    return text[text.index("-- Seed users") : text.rindex("COMMIT;")]
+
+
+def _postgres_available():
+    if connection.vendor != "postgresql":
+        return False
+    try:
+        connection.ensure_connection()
+    except OperationalError:
+        return False
+    finally:
+        connection.close()
+    return True
+
+
+POSTGRES_AVAILABLE = _postgres_available()
+
+
+@skipUnless(POSTGRES_AVAILABLE, "check_query_plans needs a reachable PostgreSQL database.")
+class QueryPlanTests(TransactionTestCase):
+    # Without a server no test database is set up at all, so the rest of the suite still runs.
+    databases = {"default"} if POSTGRES_AVAILABLE else set()
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The test database was built by the migrations, so this also checks that they produce the
+        # schema the registered statements expect. A flush only empties Django's own tables, hence
+        # seeding once per class.
+        with connection.cursor() as cursor:
+            cursor.execute(_seed_sql())
+
+    def test_registered_reads_plan_against_the_schema(self):
+        # The seed data is a few rows per table, where a scan and sort are cheapest whatever the
+        # indexes; with both priced out, a Sort or Seq Scan in a plan means no index serves it.
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("SET enable_sort = off")
+        try:
+            call_command("check_query_plans", analyze=True, min_rows=0, stdout=StringIO())
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_seqscan")
+                cursor.execute("RESET enable_sort")
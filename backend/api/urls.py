@@ -1,18 +1,36 @@
 from django.urls import path
 
-from authentication.views import login, signup
+from analytics.views import portfolio_cohorts, portfolio_summary
+from authentication.views import login, logout, signup
+from core.lazy import lazy_async_view
+from core.metrics import metrics_view
+from core.profiling import profile_aggregate_view
 from dashboard.views import dashboard
-from payments.views import payment_history, payment_loans, payment_settle_loan, payment_take_loan
+from payments.views import payment_history, payment_loans, payment_quote, payment_settle_loan, payment_take_loan
 from evaluation.views import evaluation, evaluation_approval
 
 urlpatterns = [
     path("signup/", signup),
     path("login/", login),
+    path("logout/", logout),
     path("dashboard/", dashboard),
     path("payments/loans/", payment_loans),
     path("payments/take/", payment_take_loan),
+    path("payments/quote/", payment_quote),
     path("payments/settle/", payment_settle_loan),
     path("payments/history/", payment_history),
     path("evaluations/<str:applicant_id>", evaluation),
     path("evaluations/<str:applicant_id>/approval", evaluation_approval),
+    path("metrics/", metrics_view),
+    path("admin/profiles/", profile_aggregate_view),
+    path("admin/portfolio/summary", portfolio_summary),
+    path("admin/portfolio/cohorts", portfolio_cohorts),
+    # Async read endpoints; serve through core.asgi (e.g. uvicorn) to get their concurrency.
+    # Imported on first use so WSGI workers never load psycopg 3.
+    path("async/dashboard/", lazy_async_view("dashboard.async_views.dashboard_async")),
+    path("async/payments/loans/", lazy_async_view("payments.async_views.payment_loans_async")),
+    path("async/payments/history/", lazy_async_view("payments.async_views.payment_history_async")),
+    path("async/evaluations/<str:applicant_id>", lazy_async_view("evaluation.async_views.evaluation_async")),
+    # Server-Sent Events; needs ASGI, a WSGI worker would be tied up for the whole stream.
+    path("events/", lazy_async_view("notifications.views.event_stream")),
 ]
@@ -1,10 +1,11 @@
-from authentication.views import login, signup
+from authentication.views import login, logout, signup
 from dashboard.views import dashboard
 from payments.views import payment_history, payment_loans, payment_settle_loan, payment_take_loan
 
 __all__ = [
     "signup",
     "login",
+    "logout",
     "dashboard",
     "payment_loans",
     "payment_take_loan",
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """pbkdf2_sha256 with the work factor taken from settings.PASSWORD_HASH_ITERATIONS.
+
+    Keeps the stock algorithm name so existing hashes verify, and lets check_password
+    flag hashes with a different iteration count for rehashing on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PASSWORD_HASH_ITERATIONS", PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class HashingBacklogFull(Exception):
+    """Raised when the hashing executor has no free slot or a hash times out; callers answer 429."""
+
+
+class _HashingExecutor:
+    """Fixed pool of hashing threads behind a bounded admission counter.
+
+    PBKDF2 runs in OpenSSL with the GIL released, so hashing threads use spare cores
+    while request threads only wait on a future. Work beyond workers + queue_size is
+    refused immediately instead of piling up behind the request threads.
+    """
+
+    def __init__(self, workers, queue_size, timeout):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwhash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._hash_seconds_total = 0.0
+        self._recent_hash_seconds = deque(maxlen=512)
+
+    def _timed(self, fn, args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._pending -= 1
+                self._hash_seconds_total += elapsed
+                self._recent_hash_seconds.append(elapsed)
+
+    def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise HashingBacklogFull()
+            self._pending += 1
+            self._submitted += 1
+
+        future = self._pool.submit(self._timed, fn, args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Still queued: it never runs, so _timed will not release its slot.
+            if future.cancel():
+                with self._lock:
+                    self._pending -= 1
+            with self._lock:
+                self._rejected += 1
+            raise HashingBacklogFull()
+
+    def stats(self):
+        with self._lock:
+            recent = sorted(self._recent_hash_seconds)
+            completed = self._submitted - self._pending
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": min(self._pending, self.workers),
+                "queue_depth": max(0, self._pending - self.workers),
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+                "hash_seconds_total": round(self._hash_seconds_total, 6),
+                "hash_seconds_avg": round(self._hash_seconds_total / completed, 6) if completed else 0.0,
+                "hash_seconds_p95": round(recent[int(len(recent) * 0.95)], 6) if recent else 0.0,
+            }
+
+
+_executor = _HashingExecutor(
+    workers=getattr(settings, "PASSWORD_HASHING_WORKERS", 2),
+    queue_size=getattr(settings, "PASSWORD_HASHING_QUEUE_SIZE", 8),
+    timeout=getattr(settings, "PASSWORD_HASHING_TIMEOUT", 10),
+)
+
+
+def hash_password(password):
+    return _executor.run(make_password, password)
+
+
+def verify_password(password, encoded):
+    """Return (is_valid, needs_rehash) for a stored hash."""
+    needs_rehash = []
+    is_valid = _executor.run(check_password, password, encoded, needs_rehash.append)
+    return is_valid, bool(needs_rehash)
+
+
+def hashing_stats():
+    return _executor.stats()
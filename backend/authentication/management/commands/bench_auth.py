@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+
+from authentication.services import _claims_cache, generate_token, get_authenticated_user
+from core.timing import summarize_ms
+
+
+class Command(BaseCommand):
+    help = "Benchmark authenticated-request latency for legacy, cold-cache and warm-cache JWT paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="Existing username to authenticate as.")
+        parser.add_argument("--iterations", type=int, default=500)
+
+    def handle(self, *args, **options):
+        username = options["username"]
+        iterations = options["iterations"]
+        if iterations <= 0:
+            raise CommandError("--iterations must be greater than 0.")
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT user_id, full_name FROM users WHERE username = %s", [username])
+            row = cursor.fetchone()
+        if not row:
+            raise CommandError(f"User {username!r} not found.")
+
+        factory = RequestFactory()
+        legacy_token = generate_token(username)
+        claims_token = generate_token(username, user_id=row[0], full_name=row[1])
+
+        def run(token, clear_cache):
+            request = factory.get("/api/dashboard/", HTTP_AUTHORIZATION=f"Bearer {token}")
+            samples = []
+            for _ in range(iterations):
+                if clear_cache:
+                    _claims_cache.clear()
+                started = time.perf_counter()
+                get_authenticated_user(request)
+                samples.append(time.perf_counter() - started)
+            return summarize_ms(samples)
+
+        results = [
+            ("before: username lookup per request", run(legacy_token, clear_cache=True)),
+            ("after: cache miss (claims + revocation check)", run(claims_token, clear_cache=True)),
+            ("after: cache hit", run(claims_token, clear_cache=False)),
+        ]
+        _claims_cache.clear()
+
+        for label, stats in results:
+            self.stdout.write(
+                f"{label:<48} p50={stats['p50']:.3f}ms p95={stats['p95']:.3f}ms mean={stats['mean']:.3f}ms"
+            )
@@ -0,0 +1,253 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from authentication.services import _sync_users_sequence, validate_signup_payload
+from core.db.copy import copy_rows
+from creditscore_calculator.services import build_score_snapshot
+
+USER_COLUMNS = (
+    "full_name",
+    "username",
+    "email",
+    "password_hash",
+    "employment_type",
+    "monthly_income",
+    "address",
+    "dob",
+    "phone",
+)
+
+
+def _init_hashing_worker(settings_module):
+    # Spawned (non-fork) workers start without Django configured.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def _clean(value):
+    value = (value or "").strip()
+    return value or None
+
+
+# Widths of the users columns that come straight from the CSV.
+MAX_LENGTHS = {"full_name": 120, "email": 120, "employment_type": 80, "phone": 30}
+# NUMERIC(14,2).
+MAX_INCOME = Decimal("999999999999.99")
+
+
+def _parse_income(value):
+    """Decimal income rounded to cents, or None when blank; raises ValueError when invalid."""
+    if value is None:
+        return None
+    try:
+        income = Decimal(value.replace(",", "")).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"monthly_income {value!r} is not a number.")
+    if not income.is_finite() or income < 0 or income > MAX_INCOME:
+        raise ValueError(f"monthly_income {value!r} is out of range.")
+    return income
+
+
+def _parse_dob(value):
+    """Date of birth from YYYY-MM-DD, or None when blank; raises ValueError when invalid."""
+    if value is None:
+        return None
+    try:
+        dob = date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"dob {value!r} is not a YYYY-MM-DD date.")
+    if dob > date.today():
+        raise ValueError(f"dob {value!r} is in the future.")
+    return dob
+
+
+def _read_applicants(path, report_error):
+    """Yield validated rows from the CSV, dropping in-file duplicates (first occurrence wins)."""
+    seen_usernames = set()
+    seen_emails = set()
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle)
+        missing = {"username", "email", "password"} - set(reader.fieldnames or [])
+        if missing:
+            raise CommandError(f"CSV is missing required columns: {', '.join(sorted(missing))}.")
+
+        for line_number, raw in enumerate(reader, start=2):
+            username = _clean(raw.get("username"))
+            email = _clean(raw.get("email"))
+            password = raw.get("password") or ""
+
+            error = validate_signup_payload(username, email, password)
+            if error:
+                report_error(line_number, error)
+                continue
+            if username in seen_usernames or email in seen_emails:
+                report_error(line_number, "Duplicate username or email within file.")
+                continue
+            try:
+                monthly_income = _parse_income(_clean(raw.get("monthly_income")))
+                dob = _parse_dob(_clean(raw.get("dob")))
+            except ValueError as exc:
+                report_error(line_number, str(exc))
+                continue
+
+            applicant = {
+                "line": line_number,
+                "full_name": _clean(raw.get("full_name")) or username,
+                "username": username,
+                "email": email,
+                "password": password,
+                "employment_type": _clean(raw.get("employment_type")),
+                "monthly_income": monthly_income,
+                "address": _clean(raw.get("address")),
+                "dob": dob,
+                "phone": _clean(raw.get("phone")),
+            }
+            too_long = [field for field, limit in MAX_LENGTHS.items() if len(applicant[field] or "") > limit]
+            if too_long:
+                report_error(line_number, f"Too long: {', '.join(too_long)}.")
+                continue
+            seen_usernames.add(username)
+            seen_emails.add(email)
+            yield applicant
+
+
+def _existing_identities(usernames, emails):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT username, email
+            FROM users
+            WHERE username = ANY(%s) OR email = ANY(%s)
+            """,
+            [usernames, emails],
+        )
+        rows = cursor.fetchall()
+    return {row[0] for row in rows}, {row[1] for row in rows}
+
+
+def _snapshot_rows(created):
+    for user_id, monthly_income in created:
+        score, risk_level, factors = build_score_snapshot(float(monthly_income), (0, 0, 0, 0, 0), [], {})
+        yield user_id, score, risk_level, json.dumps(factors)
+
+
+def _load_batch(applicants, hashes, with_snapshot):
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            _sync_users_sequence(cursor)
+            cursor.execute(
+                """
+                CREATE TEMP TABLE import_users_stage (
+                    full_name VARCHAR(120),
+                    username VARCHAR(64),
+                    email VARCHAR(120),
+                    password_hash TEXT,
+                    employment_type VARCHAR(80),
+                    monthly_income NUMERIC(14,2),
+                    address TEXT,
+                    dob DATE,
+                    phone VARCHAR(30)
+                ) ON COMMIT DROP
+                """
+            )
+            copy_rows(
+                cursor,
+                "import_users_stage",
+                USER_COLUMNS,
+                (
+                    (
+                        applicant["full_name"],
+                        applicant["username"],
+                        applicant["email"],
+                        password_hash,
+                        applicant["employment_type"],
+                        applicant["monthly_income"],
+                        applicant["address"],
+                        applicant["dob"],
+                        applicant["phone"],
+                    )
+                    for applicant, password_hash in zip(applicants, hashes)
+                ),
+            )
+            # Rows that raced in since the dedupe query are skipped rather than failing the batch.
+            cursor.execute(
+                f"""
+                INSERT INTO users ({', '.join(USER_COLUMNS)})
+                SELECT {', '.join(USER_COLUMNS)}
+                FROM import_users_stage
+                ON CONFLICT DO NOTHING
+                RETURNING user_id, COALESCE(monthly_income, 0)
+                """
+            )
+            created = cursor.fetchall()
+
+            if with_snapshot and created:
+                # New applicants have no accounts or payments, so their factors depend on income only.
+                copy_rows(cursor, "score_history", ("user_id", "score", "risk_level", "factors"), _snapshot_rows(created))
+    return len(created)
+
+
+class Command(BaseCommand):
+    help = "Bulk-import applicants from a CSV (username,email,password[,full_name,employment_type,...])."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--batch-size", type=int, default=20000)
+        parser.add_argument("--with-snapshot", action="store_true", help="Create an initial score_history row.")
+        parser.add_argument("--dry-run", action="store_true", help="Validate and dedupe only.")
+
+    def handle(self, *args, **options):
+        if options["workers"] <= 0 or options["batch_size"] <= 0:
+            raise CommandError("--workers and --batch-size must be greater than 0.")
+
+        errors = []
+        applicants = list(_read_applicants(options["csv_path"], lambda line, error: errors.append((line, error))))
+
+        existing_usernames, existing_emails = _existing_identities(
+            [applicant["username"] for applicant in applicants],
+            [applicant["email"] for applicant in applicants],
+        )
+        fresh = [
+            applicant
+            for applicant in applicants
+            if applicant["username"] not in existing_usernames and applicant["email"] not in existing_emails
+        ]
+        skipped_existing = len(applicants) - len(fresh)
+
+        for line, error in errors[:20]:
+            self.stderr.write(f"line {line}: {error}")
+        if len(errors) > 20:
+            self.stderr.write(f"... {len(errors) - 20} more invalid rows")
+
+        self.stdout.write(
+            f"{len(applicants) + len(errors)} rows: {len(errors)} invalid, "
+            f"{skipped_existing} already registered, {len(fresh)} to import."
+        )
+        if options["dry_run"] or not fresh:
+            return
+
+        imported = 0
+        batch_size = options["batch_size"]
+        with ProcessPoolExecutor(
+            max_workers=options["workers"],
+            initializer=_init_hashing_worker,
+            initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "core.settings"),),
+        ) as pool:
+            for start in range(0, len(fresh), batch_size):
+                batch = fresh[start:start + batch_size]
+                chunksize = max(1, len(batch) // (options["workers"] * 4))
+                hashes = list(pool.map(make_password, [applicant["password"] for applicant in batch], chunksize=chunksize))
+                imported += _load_batch(batch, hashes, options["with_snapshot"])
+                self.stdout.write(f"  imported {imported}/{len(fresh)}")
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} applicants."))
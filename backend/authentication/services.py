@@ -1,27 +1,26 @@
 import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 import jwt
 from django.conf import settings
-from django.contrib.auth.hashers import check_password, make_password
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.db import connection
 
+from core.db import queries
+
+from .hashing import HashingBacklogFull, hash_password, verify_password
+
 USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9_]{3,30}$")
 
 
 def _sync_users_sequence(cursor):
     """Align users.user_id sequence with current max id to prevent PK collisions."""
-    cursor.execute(
-        """
-        SELECT setval(
-            pg_get_serial_sequence('users', 'user_id'),
-            COALESCE((SELECT MAX(user_id) FROM users), 1),
-            true
-        )
-        """
-    )
+    queries.execute(cursor, queries.USERS_SYNC_SEQUENCE)
 
 
 def validate_signup_payload(username, email, password):
@@ -42,47 +41,191 @@ def validate_login_payload(username, password):
     return None
 
 
-def generate_token(username, is_admin=False):
+def generate_token(username, is_admin=False, user_id=None, full_name=None, lifetime=timedelta(hours=2)):
+    issued_at = datetime.utcnow()
     payload = {
         "sub": username,
         "is_admin": is_admin,
-        "iat": datetime.utcnow(),
-        "exp": datetime.utcnow() + timedelta(hours=2),
+        "jti": uuid.uuid4().hex,
+        "iat": issued_at,
+        "exp": issued_at + lifetime,
     }
+    if user_id is not None:
+        payload["user_id"] = user_id
+        payload["full_name"] = full_name
     return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
 
 
-def extract_username_from_auth_header(request):
+class _ClaimsCache:
+    """Per-process LRU of verified token -> (username, user_data), bounded by TTL and token expiry."""
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return value
+
+    def set(self, token, value, token_exp):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = min(time.time() + self.ttl_seconds, float(token_exp))
+        with self._lock:
+            self._entries[token] = (expires_at, value)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, token):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_claims_cache = _ClaimsCache(
+    getattr(settings, "AUTH_CLAIMS_CACHE_SIZE", 4096),
+    getattr(settings, "AUTH_CLAIMS_CACHE_TTL", 60),
+)
+
+
+def extract_bearer_token(request, allow_query_token=False):
     auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer ") and allow_query_token:
+        # EventSource cannot set headers; only the SSE stream accepts ?token=.
+        return request.GET.get("token", "").strip() or None
     if not auth_header.startswith("Bearer "):
         return None
 
     token = auth_header.split(" ", 1)[1].strip()
-    if not token:
-        return None
+    return token or None
+
 
+def decode_token(token):
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
     except jwt.InvalidTokenError:
         return None
 
+
+def extract_username_from_auth_header(request):
+    token = extract_bearer_token(request)
+    if not token:
+        return None
+
+    payload = decode_token(token)
+    if not payload:
+        return None
+
     return payload.get("sub")
 
 
-def get_authenticated_user(request):
-    username = extract_username_from_auth_header(request)
-    if not username:
-        return None, None
+def has_admin_claim(request):
+    """True for a valid, unrevoked admin token; the revocation check is cached like user tokens."""
+    token = extract_bearer_token(request)
+    if not token:
+        return False
+    cache_key = ("admin", token)
+    if _claims_cache.get(cache_key) is not None:
+        return True
 
+    payload = decode_token(token)
+    if not payload or not payload.get("is_admin") or not payload.get("jti"):
+        return False
     with connection.cursor() as cursor:
-        cursor.execute("SELECT user_id, full_name FROM users WHERE username = %s", [username])
-        row = cursor.fetchone()
+        revoked = queries.fetchone(cursor, queries.TOKENS_IS_REVOKED, [payload["jti"]])[0]
+    if revoked:
+        return False
+    _claims_cache.set(cache_key, True, payload["exp"])
+    return True
+
+
+def _token_user_query(claims):
+    if claims.get("user_id") is None:
+        # Tokens issued before user_id was embedded carry only the username.
+        return queries.USERS_TOKEN_USER_BY_USERNAME, [claims.get("sub"), claims.get("jti")]
+
+    return queries.USERS_TOKEN_USER, [claims["user_id"], claims.get("jti")]
+
+
+def _verify_token(request, allow_query_token=False):
+    """Return (token, cached_result, claims); at most one of cached_result/claims is set."""
+    token = extract_bearer_token(request, allow_query_token)
+    if not token:
+        return None, None, None
+
+    cached = _claims_cache.get(token)
+    if cached is not None:
+        return token, cached, None
+
+    claims = decode_token(token)
+    if not claims or not claims.get("sub"):
+        return None, None, None
+    return token, None, claims
 
+
+def _remember_token_user(token, claims, row):
     if not row:
         return None, None
 
     user_id, full_name = row
-    return username, {"user_id": user_id, "full_name": full_name}
+    result = (claims["sub"], {"user_id": user_id, "full_name": full_name})
+    _claims_cache.set(token, result, claims["exp"])
+    return result
+
+
+def get_authenticated_user(request):
+    token, cached, claims = _verify_token(request)
+    if cached is not None:
+        return cached
+    if not claims:
+        return None, None
+
+    with connection.cursor() as cursor:
+        row = queries.fetchone(cursor, *_token_user_query(claims))
+
+    return _remember_token_user(token, claims, row)
+
+
+async def aget_authenticated_user(request, allow_query_token=False):
+    """Async twin of get_authenticated_user for ASGI views; cache hits never touch the database."""
+    token, cached, claims = _verify_token(request, allow_query_token)
+    if cached is not None:
+        return cached
+    if not claims:
+        return None, None
+
+    from core.db import aio
+
+    row = await aio.fetchone(*_token_user_query(claims))
+    return _remember_token_user(token, claims, row)
+
+
+def revoke_token(token):
+    """Revoke a token everywhere; other processes stop honouring it once their cache entry ages out."""
+    claims = decode_token(token)
+    _claims_cache.discard(token)
+    _claims_cache.discard(("admin", token))
+    if not claims or not claims.get("jti"):
+        return False
+
+    with connection.cursor() as cursor:
+        queries.execute(cursor, queries.TOKENS_PRUNE_REVOKED)
+        queries.execute(cursor, queries.TOKENS_REVOKE, [claims["jti"], claims["exp"]])
+    return True
 
 
 def create_user(
@@ -96,30 +239,19 @@ def create_user(
     dob=None,
     phone=None,
 ):
-    hashed_pwd = make_password(password)
+    with connection.cursor() as cursor:
+        if queries.fetchone(cursor, queries.USERS_EXISTS, [username, email]):
+            return False
+
+    # Hash only once the username/email is known to be free.
+    hashed_pwd = hash_password(password)
 
     with connection.cursor() as cursor:
         _sync_users_sequence(cursor)
 
-        cursor.execute("SELECT 1 FROM users WHERE username=%s OR email=%s", [username, email])
-        if cursor.fetchone():
-            return False
-
-        cursor.execute(
-            """
-            INSERT INTO users (
-                full_name,
-                username,
-                email,
-                password_hash,
-                employment_type,
-                monthly_income,
-                address,
-                dob,
-                phone
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
+        queries.execute(
+            cursor,
+            queries.USERS_INSERT,
             [
                 full_name or username,
                 username,
@@ -138,7 +270,24 @@ def create_user(
 
 def validate_user_credentials(username, password):
     with connection.cursor() as cursor:
-        cursor.execute("SELECT password_hash FROM users WHERE username = %s", [username])
-        row = cursor.fetchone()
+        row = queries.fetchone(cursor, queries.USERS_CREDENTIALS, [username])
+
+    if not row:
+        return None
+
+    user_id, full_name, password_hash = row
+    is_valid, needs_rehash = verify_password(password, password_hash)
+    if not is_valid:
+        return None
+
+    if needs_rehash:
+        # Upgrade to the configured work factor; a busy executor just defers it to a later login.
+        try:
+            new_hash = hash_password(password)
+        except HashingBacklogFull:
+            new_hash = None
+        if new_hash:
+            with connection.cursor() as cursor:
+                queries.execute(cursor, queries.USERS_UPDATE_PASSWORD_HASH, [new_hash, user_id])
 
-    return bool(row and check_password(password, row[0]))
+    return {"user_id": user_id, "full_name": full_name}
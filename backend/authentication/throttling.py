@@ -0,0 +1,78 @@
+import threading
+import time
+
+from django.conf import settings
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Too many attempts.")
+        self.retry_after = retry_after
+
+
+class TokenBuckets:
+    """In-memory token buckets keyed by an arbitrary string (username, client IP)."""
+
+    def __init__(self, burst, refill_seconds, max_keys=50000):
+        self.burst = burst
+        self.refill_seconds = refill_seconds
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        # Full buckets carry no state worth keeping.
+        full_after = self.burst * self.refill_seconds
+        self._buckets = {
+            key: (tokens, updated)
+            for key, (tokens, updated) in self._buckets.items()
+            if now - updated < full_after
+        }
+
+    def take(self, key):
+        """Consume one token for key; return 0 when allowed, else seconds until the next token."""
+        if self.burst <= 0:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) / self.refill_seconds)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) * self.refill_seconds
+            self._buckets[key] = (tokens - 1, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0
+
+
+_user_buckets = TokenBuckets(
+    burst=getattr(settings, "LOGIN_USER_BURST", 5),
+    refill_seconds=getattr(settings, "LOGIN_USER_REFILL_SECONDS", 12),
+)
+_ip_buckets = TokenBuckets(
+    burst=getattr(settings, "LOGIN_IP_BURST", 20),
+    refill_seconds=getattr(settings, "LOGIN_IP_REFILL_SECONDS", 3),
+)
+
+
+def client_ip(request):
+    """REMOTE_ADDR, or the address TRUSTED_PROXY_COUNT proxies back in X-Forwarded-For.
+
+    Each proxy appends the address it saw, so only the rightmost entries are trustworthy;
+    anything further left is whatever the client sent.
+    """
+    trusted = getattr(settings, "TRUSTED_PROXY_COUNT", 0)
+    if trusted > 0:
+        forwarded = [entry.strip() for entry in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if entry.strip()]
+        if len(forwarded) >= trusted:
+            return forwarded[-trusted]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def check_auth_rate(request, username=None):
+    retry_after = _ip_buckets.take(client_ip(request))
+    if not retry_after and username:
+        retry_after = _user_buckets.take(username.lower())
+    if retry_after:
+        raise RateLimited(retry_after)
@@ -4,13 +4,23 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 
+from .hashing import HashingBacklogFull
 from .services import (
     create_user,
+    extract_bearer_token,
     generate_token,
+    revoke_token,
     validate_login_payload,
     validate_signup_payload,
     validate_user_credentials,
 )
+from .throttling import RateLimited, check_auth_rate
+
+
+def _too_many_requests(error, retry_after):
+    response = JsonResponse({"error": error}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+    return response
 
 
 @api_view(["POST"])
@@ -29,15 +39,21 @@ def signup(request):
     dob = request.data.get("dob")
     phone = request.data.get("phone")
 
-    user_created = create_user(
-        full_name,
-        username,
-        email,
-        password,
-        address=address,
-        dob=dob or None,
-        phone=phone,
-    )
+    try:
+        check_auth_rate(request)
+        user_created = create_user(
+            full_name,
+            username,
+            email,
+            password,
+            address=address,
+            dob=dob or None,
+            phone=phone,
+        )
+    except RateLimited as exc:
+        return _too_many_requests("Too many signup attempts. Try again later.", exc.retry_after)
+    except HashingBacklogFull:
+        return _too_many_requests("Server is busy. Try again shortly.", 1)
     if not user_created:
         return JsonResponse({"error": "Username or email already exists."}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -54,6 +70,11 @@ def login(request):
     if validation_error:
         return JsonResponse({"error": validation_error}, status=status.HTTP_400_BAD_REQUEST)
 
+    try:
+        check_auth_rate(request, username)
+    except RateLimited as exc:
+        return _too_many_requests("Too many login attempts. Try again later.", exc.retry_after)
+
     admin_username = getattr(settings, "ADMIN_USERNAME", None)
     admin_password = getattr(settings, "ADMIN_PASSWORD", None)
 
@@ -69,8 +90,13 @@ def login(request):
             status=status.HTTP_200_OK,
         )
 
-    if validate_user_credentials(username, password):
-        token = generate_token(username, is_admin=False)
+    try:
+        user = validate_user_credentials(username, password)
+    except HashingBacklogFull:
+        return _too_many_requests("Server is busy. Try again shortly.", 1)
+
+    if user:
+        token = generate_token(username, is_admin=False, user_id=user["user_id"], full_name=user["full_name"])
         return JsonResponse(
             {
                 "message": "Login successful!",
@@ -82,3 +108,13 @@ def login(request):
         )
 
     return JsonResponse({"error": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def logout(request):
+    token = extract_bearer_token(request)
+    if not token or not revoke_token(token):
+        return JsonResponse({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    return JsonResponse({"message": "Logged out."}, status=status.HTTP_200_OK)
@@ -0,0 +1,35 @@
+"""Benchmark cases: a fixture generator plus the hot path it feeds."""
+
+from creditscore_calculator.services import build_score_snapshot
+from daulterprobability.services import calculate_default_probability
+from evaluation.views import _normalize_applicant_lookup, build_evaluation_payload
+
+from . import fixtures
+
+
+def _score_snapshot(batch):
+    for monthly_income, account_summary, payment_rows, previous_factors in batch:
+        build_score_snapshot(monthly_income, account_summary, payment_rows, previous_factors)
+
+
+def _default_probability(batch):
+    for score, risk_category, utilization_pct in batch:
+        calculate_default_probability(score, risk_category=risk_category, utilization_pct=utilization_pct)
+
+
+def _applicant_lookup(batch):
+    for applicant_id in batch:
+        _normalize_applicant_lookup(applicant_id)
+
+
+def _evaluation_payload(batch):
+    for user_row, score_rows, limit_row, pending_items in batch:
+        build_evaluation_payload(user_row, score_rows, limit_row, pending_items)
+
+
+CASES = {
+    "score_snapshot": (fixtures.score_snapshot_inputs, _score_snapshot),
+    "default_probability": (fixtures.default_probability_inputs, _default_probability),
+    "applicant_lookup": (fixtures.applicant_lookup_inputs, _applicant_lookup),
+    "evaluation_payload": (fixtures.evaluation_payload_inputs, _evaluation_payload),
+}
@@ -0,0 +1,206 @@
+"""Synthetic applicant population for capacity and load testing.
+
+Each user is generated from its own seeded RNG, so a given (seed, user_id) always
+produces the same accounts, installments and score history regardless of how
+the load is split across workers. ``generate_dataset`` streams each table's
+rows into ``COPY`` from generators over one chunk of user plans at a time.
+"""
+
+import json
+import math
+import random
+from datetime import datetime, time, timedelta, timezone
+
+from creditscore_calculator.services import build_score_snapshot
+from payments.services import dpd_bucket
+
+from .fixtures import EMPLOYMENT_TYPES
+
+USER_COLUMNS = (
+    "user_id",
+    "full_name",
+    "username",
+    "email",
+    "password_hash",
+    "monthly_income",
+    "employment_type",
+    "address",
+    "dob",
+    "phone",
+    "created_at",
+)
+ACCOUNT_COLUMNS = (
+    "account_id",
+    "user_id",
+    "account_type",
+    "purpose",
+    "tenure_months",
+    "credit_limit",
+    "current_balance",
+    "opened_date",
+    "status",
+)
+PAYMENT_COLUMNS = (
+    "account_id",
+    "due_date",
+    "paid_date",
+    "amount_due",
+    "amount_paid",
+    "status",
+    "days_past_due",
+    "dpd_bucket",
+)
+SCORE_COLUMNS = ("user_id", "score", "risk_level", "factors", "calculated_at")
+
+# Account ids are user-derived (base + offset * MAX_ACCOUNTS_PER_USER + n) so workers never coordinate.
+MAX_ACCOUNTS_PER_USER = 6
+ACCOUNT_COUNT_WEIGHTS = (15, 30, 25, 15, 8, 5, 2)
+ACCOUNT_PROFILES = (
+    # account_type, weight, purposes, tenure choices (None = revolving), limit as multiple of monthly income
+    ("loan_general", 35, ("Home renovation", "Vehicle financing", "Small business expansion", "Medical expenses"),
+     (12, 18, 24, 36, 48, 60), (2.0, 8.0)),
+    ("loan_emi", 20, ("Phone purchase", "Appliance purchase", "Laptop purchase"), (3, 6, 9, 12), (0.3, 1.5)),
+    ("credit_card_usage", 35, ("General spending", "Travel and expenses", "Online shopping"), (None,), (1.0, 3.0)),
+    ("education_loan", 10, ("Postgraduate tuition", "Undergraduate tuition", "Professional course"),
+     (24, 30, 36, 48), (3.0, 10.0)),
+)
+ACCOUNT_PROFILE_WEIGHTS = tuple(profile[1] for profile in ACCOUNT_PROFILES)
+ACCOUNT_STATUSES = ("active", "closed", "pending_approval", "rejected")
+ACCOUNT_STATUS_WEIGHTS = (70, 25, 3, 2)
+EMPLOYMENT_WEIGHTS = (38, 18, 12, 14, 12, 6)
+FIRST_NAMES = ("Aarav", "Nisha", "Ritesh", "Sita", "Bikash", "Anita", "Suman", "Pooja", "Kiran", "Rajan", "Maya", "Dipesh")
+LAST_NAMES = ("Shrestha", "Karki", "Gautam", "Thapa", "Adhikari", "Rai", "Gurung", "Tamang", "Poudel", "Magar")
+CITIES = ("Kathmandu", "Lalitpur", "Pokhara", "Butwal", "Dharan", "Biratnagar", "Bharatpur", "Hetauda")
+
+
+def _user_rng(seed, user_id):
+    return random.Random(seed * 1_000_003 + user_id)
+
+
+def _score_path(rng, latest_score, snapshots):
+    """Latest score first, then a mean-reverting monthly walk backwards."""
+    scores = [latest_score]
+    for _ in range(snapshots - 1):
+        previous = scores[-1] + rng.gauss(0, 14) + (650 - scores[-1]) * 0.05
+        scores.append(int(max(300, min(850, round(previous)))))
+    return scores
+
+
+def _risk_level(score):
+    if score >= 720:
+        return "low"
+    if score >= 660:
+        return "medium"
+    return "high"
+
+
+def _installments(rng, account_id, opened_date, tenure_months, limit, status, late_propensity, as_of, max_installments):
+    """Monthly installments ending at as_of (or the end of tenure), newest max_installments only."""
+    if status in {"pending_approval", "rejected"}:
+        return [], 0
+
+    months_open = max(0, (as_of - opened_date).days // 30)
+    months = months_open if tenure_months is None else min(months_open, tenure_months)
+    first = max(0, months - max_installments)
+    amount = round(limit / tenure_months, 2) if tenure_months else round(limit * rng.uniform(0.05, 0.3), 2)
+
+    rows = []
+    paid_installments = 0
+    for month in range(first, months):
+        due_date = opened_date + timedelta(days=30 * (month + 1))
+        is_latest = month == months - 1
+        if rng.random() < late_propensity:
+            days_past_due = int(rng.expovariate(1 / 18)) + 1
+            paid_date = due_date + timedelta(days=days_past_due)
+            if status == "active" and is_latest and paid_date > as_of:
+                # Still outstanding: the nightly aging job keeps advancing these.
+                days_past_due = (as_of - due_date).days
+                paid = round(amount * rng.choice((0, 0, 0.25, 0.5)), 2)
+                rows.append((account_id, due_date, None, amount, paid, "late", days_past_due, dpd_bucket(days_past_due)))
+                continue
+            rows.append((account_id, due_date, paid_date, amount, amount, "late", days_past_due, dpd_bucket(days_past_due)))
+        else:
+            paid_date = due_date - timedelta(days=rng.randint(0, 5))
+            rows.append((account_id, due_date, paid_date, amount, amount, "paid", 0, 0))
+        paid_installments += 1
+
+    if status == "active" and (tenure_months is None or months < tenure_months):
+        next_due = opened_date + timedelta(days=30 * (months + 1))
+        rows.append((account_id, next_due, None, amount, 0, "due", 0, 0))
+    return rows, paid_installments
+
+
+def plan_user(seed, user_id, account_base, offset, username, password_hash, as_of, max_installments, snapshots):
+    """(user_row, account_rows, payment_rows, score_rows) for one synthetic applicant."""
+    rng = _user_rng(seed, user_id)
+
+    # Log-normal income around 55k/month; a few applicants never declared one.
+    monthly_income = None if rng.random() < 0.04 else round(min(2_000_000, math.exp(rng.gauss(10.9, 0.6))), 2)
+    income = monthly_income or 30000.0
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    age_days = rng.randint(21 * 365, 65 * 365)
+    user_created = as_of - timedelta(days=rng.randint(30, 3650))
+    user_row = (
+        user_id,
+        f"{first} {last}",
+        username,
+        f"{username}@example.test",
+        password_hash,
+        monthly_income,
+        rng.choices(EMPLOYMENT_TYPES, EMPLOYMENT_WEIGHTS)[0],
+        f"{rng.choice(CITIES)}-{rng.randint(1, 30)}, Nepal",
+        as_of - timedelta(days=age_days),
+        f"+977-98{rng.randint(10_000_000, 99_999_999)}",
+        datetime.combine(user_created, time(12, 0), tzinfo=timezone.utc),
+    )
+
+    # Most applicants pay on time; a long tail is chronically late.
+    late_propensity = rng.betavariate(1.2, 12)
+    account_rows = []
+    payment_rows = []
+    scoring_rows = []
+    total_limit = total_balance = 0.0
+    active_accounts = 0
+    account_count = rng.choices(range(MAX_ACCOUNTS_PER_USER + 1), ACCOUNT_COUNT_WEIGHTS)[0]
+    for index in range(account_count):
+        account_type, _, purposes, tenures, limit_range = rng.choices(ACCOUNT_PROFILES, ACCOUNT_PROFILE_WEIGHTS)[0]
+        account_id = account_base + offset * MAX_ACCOUNTS_PER_USER + index
+        tenure_months = rng.choice(tenures)
+        limit = round(income * rng.uniform(*limit_range), -2) or 1000.0
+        opened_date = user_created + timedelta(days=rng.randint(0, max(0, (as_of - user_created).days - 1)))
+        status = rng.choices(ACCOUNT_STATUSES, ACCOUNT_STATUS_WEIGHTS)[0]
+
+        installments, paid = _installments(
+            rng, account_id, opened_date, tenure_months, limit, status, late_propensity, as_of, max_installments
+        )
+        if status == "closed":
+            balance = 0.0
+        elif status in {"pending_approval", "rejected"}:
+            balance = limit
+        elif tenure_months:
+            balance = round(limit * max(0.0, 1 - paid / tenure_months), 2)
+        else:
+            balance = round(limit * rng.uniform(0, 0.9), 2)
+
+        account_rows.append(
+            (account_id, user_id, account_type, rng.choice(purposes), tenure_months, limit, balance, opened_date, status)
+        )
+        payment_rows.extend(installments)
+        scoring_rows.extend(
+            (row[1], row[2], row[5], row[3], row[4], row[6], opened_date, account_type) for row in installments
+        )
+        total_limit += limit
+        total_balance += balance
+        active_accounts += status == "active"
+
+    # The latest snapshot goes through the real factor math so scores match the generated history.
+    summary = (total_limit, total_balance, total_balance / account_count if account_count else 0.0, account_count, active_accounts)
+    latest_score, _, factors = build_score_snapshot(income, summary, scoring_rows, {})
+    factors_json = json.dumps(factors)
+    latest_at = datetime.combine(as_of, time(6, 0), tzinfo=timezone.utc)
+    score_rows = [
+        (user_id, score, _risk_level(score), factors_json, latest_at - timedelta(days=30 * step))
+        for step, score in enumerate(_score_path(rng, latest_score, snapshots))
+        if step == 0 or latest_at - timedelta(days=30 * step) >= user_row[-1]
+    ]
+    return user_row, account_rows, payment_rows, score_rows
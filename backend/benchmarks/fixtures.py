@@ -0,0 +1,119 @@
+"""Deterministic synthetic inputs for the micro-benchmarks.
+
+Every generator takes a seed so runs compare like with like. Large batches
+cycle over a bounded pool of distinct users (``POOL_SIZE``) instead of
+materializing a million payment histories; the per-call work is the same.
+"""
+
+import json
+import random
+from datetime import date, datetime, timedelta
+
+POOL_SIZE = 10000
+ANCHOR_DATE = date(2024, 1, 1)
+ACCOUNT_TYPES = ("loan_general", "loan_emi", "credit_card_usage", "education_loan")
+EMPLOYMENT_TYPES = ("Salaried", "Self-employed", "Contract", "Business", "Government", None)
+FACTOR_KEYS = (
+    "payment_history",
+    "credit_utilization",
+    "credit_age",
+    "inquiries",
+    "debt_to_income",
+    "income_stability",
+    "employment_history",
+    "credit_mix",
+    "delinquencies",
+    "collateral_strength",
+)
+
+
+def _payment_rows(rng, account_count):
+    rows = []
+    for _ in range(account_count):
+        account_type = rng.choice(ACCOUNT_TYPES)
+        opened_date = ANCHOR_DATE - timedelta(days=rng.randint(30, 3650))
+        for _ in range(rng.randint(1, 6)):
+            due_date = opened_date + timedelta(days=rng.randint(30, 900))
+            amount_due = round(rng.uniform(500, 25000), 2)
+            status = rng.choices(("paid", "late", "approved", "due", "pending_approval"), (55, 10, 15, 15, 5))[0]
+            days_past_due = rng.choice((0, 0, 0, 5, 15, 45, 95)) if status in {"late", "due"} else 0
+            paid_date = due_date + timedelta(days=days_past_due) if status in {"paid", "late", "approved"} else None
+            amount_paid = amount_due if paid_date else 0.0
+            rows.append(
+                (due_date, paid_date, status, amount_due, amount_paid, days_past_due, opened_date, account_type)
+            )
+    return rows
+
+
+def _factors(rng):
+    return {key: rng.randint(30, 100) for key in FACTOR_KEYS}
+
+
+def score_snapshot_inputs(count, seed=1):
+    """(monthly_income, account_summary, payment_rows, previous_factors) per user."""
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(min(count, POOL_SIZE)):
+        account_count = rng.randint(0, 5)
+        total_limit = sum(rng.uniform(10000, 500000) for _ in range(account_count))
+        total_balance = total_limit * rng.uniform(0, 1.1)
+        summary = (
+            total_limit,
+            total_balance,
+            total_balance / account_count if account_count else 0.0,
+            account_count,
+            rng.randint(0, account_count),
+        )
+        pool.append((rng.uniform(0, 400000), summary, _payment_rows(rng, account_count), _factors(rng)))
+    return [pool[index % len(pool)] for index in range(count)]
+
+
+def default_probability_inputs(count, seed=2):
+    """(score, risk_category, utilization_pct) per user."""
+    rng = random.Random(seed)
+    return [
+        (rng.randint(300, 850), rng.choice(("LOW", "MEDIUM", "HIGH", None)), rng.uniform(0, 120))
+        for _ in range(count)
+    ]
+
+
+def applicant_lookup_inputs(count, seed=3):
+    """Mixed applicant ids as the evaluation URL receives them."""
+    rng = random.Random(seed)
+    shapes = (
+        lambda: f"APP-{rng.randint(1, 99999):05d}",
+        lambda: str(rng.randint(1, 10 ** 7)),
+        lambda: f"user_{rng.randint(1, 10 ** 6)}",
+        lambda: f"  APP-{rng.randint(1, 999)}  ",
+        lambda: "",
+    )
+    return [rng.choice(shapes)() for _ in range(count)]
+
+
+def evaluation_payload_inputs(count, seed=4):
+    """(user_row, score_rows, limit_row, pending_items) as the evaluation view passes them."""
+    rng = random.Random(seed)
+    pool = []
+    for user_id in range(1, min(count, POOL_SIZE) + 1):
+        user_row = (
+            user_id,
+            f"Applicant {user_id}",
+            f"user_{user_id}",
+            ANCHOR_DATE - timedelta(days=rng.randint(7000, 20000)),
+            f"98{rng.randint(10 ** 7, 10 ** 8 - 1)}",
+            f"{rng.randint(1, 999)} Synthetic Street",
+            round(rng.uniform(0, 400000), 2),
+            rng.choice(EMPLOYMENT_TYPES),
+        )
+        calculated_at = datetime(2024, 1, 1, 12, 0, 0)
+        score_rows = []
+        for offset in range(6):
+            score = rng.randint(300, 850)
+            risk_level = "low" if score >= 720 else "medium" if score >= 660 else "high"
+            # Django's PostgreSQL backend returns jsonb as text, so the fixture does too.
+            score_rows.append((score, risk_level, json.dumps(_factors(rng)), calculated_at - timedelta(days=30 * offset)))
+        total_limit = rng.uniform(0, 1000000)
+        total_balance = total_limit * rng.uniform(0, 1.1)
+        limit_row = (user_row[6], user_row[7], total_limit, total_balance, total_balance * rng.uniform(0, 0.1))
+        pool.append((user_row, score_rows, limit_row, []))
+    return [pool[index % len(pool)] for index in range(count)]
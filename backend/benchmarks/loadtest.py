@@ -0,0 +1,336 @@
+"""Closed-loop HTTP load generator for the API, stdlib only.
+
+Each virtual client keeps one HTTP/1.1 keep-alive connection and loops
+"pick an operation from the mix, run it, record it" until the deadline.
+Latency, status, and the server's ``X-Query-Count`` / ``Server-Timing: db``
+are recorded per endpoint label.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from core.timing import percentile
+
+READ_PATHS = {
+    "dashboard": ("/api/dashboard/", "/api/async/dashboard/"),
+    "loans": ("/api/payments/loans/", "/api/async/payments/loans/"),
+    "history": ("/api/payments/history/", "/api/async/payments/history/"),
+    "evaluation": ("/api/evaluations/{applicant}", "/api/async/evaluations/{applicant}"),
+}
+DEFAULT_MIX = "dashboard=30,loans=15,history=15,evaluation=20,take=8,settle=7,approve=5"
+LOAN_CATEGORIES = (("general", 12), ("emi", 6), ("cc", None))
+
+_SERVER_TIMING_DB = re.compile(r"(?:^|,)\s*db;dur=([0-9.]+)")
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in READ_PATHS and name not in {"take", "settle", "approve", "login"}:
+            raise ValueError(f"Unknown operation {name!r} in mix.")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class HttpResponse:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"{}")
+        except ValueError:
+            return {}
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client over asyncio streams (Content-Length and chunked bodies)."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        if parts.scheme != "http":
+            raise ValueError("Only plain http:// targets are supported.")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def _read_body(self, headers):
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    await self._reader.readline()
+                    return b"".join(chunks)
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+        length = headers.get("content-length")
+        if length is not None:
+            return await self._reader.readexactly(int(length))
+        return await self._reader.read()
+
+    async def _roundtrip(self, method, path, body, headers):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host_header}", "Connection: keep-alive"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        lines.append(f"Content-Length: {len(body or b'')}")
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Server closed the connection.")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        response_body = await self._read_body(response_headers)
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return HttpResponse(status, response_headers, response_body)
+
+    async def request(self, method, path, payload=None, token=None, extra_headers=None):
+        headers = dict(extra_headers or {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        body = json.dumps(payload).encode() if payload is not None else None
+        for attempt in range(2):
+            try:
+                return await asyncio.wait_for(self._roundtrip(method, path, body, headers), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # A keep-alive connection the server already dropped; retry once on a fresh one.
+                await self.close()
+                if attempt:
+                    raise
+            except BaseException:
+                await self.close()
+                raise
+
+
+class EndpointStats:
+    __slots__ = ("latencies", "statuses", "errors", "queries", "query_samples", "db_ms")
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = defaultdict(int)
+        self.errors = 0
+        self.queries = 0
+        self.query_samples = 0
+        self.db_ms = 0.0
+
+    def record(self, seconds, response=None, error=False):
+        self.latencies.append(seconds)
+        if response is None or error or response.status >= 400:
+            self.errors += 1
+        if response is None:
+            self.statuses["exception"] += 1
+            return
+        self.statuses[str(response.status)] += 1
+        count = response.headers.get("x-query-count")
+        if count is not None:
+            self.queries += int(count)
+            self.query_samples += 1
+        match = _SERVER_TIMING_DB.search(response.headers.get("server-timing", ""))
+        if match:
+            self.db_ms += float(match.group(1))
+
+    def summary(self, elapsed):
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "rps": count / elapsed if elapsed else 0.0,
+            "error_rate": self.errors / count if count else 0.0,
+            "p50_ms": percentile(ordered, 0.50) * 1000,
+            "p95_ms": percentile(ordered, 0.95) * 1000,
+            "p99_ms": percentile(ordered, 0.99) * 1000,
+            "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+            "queries_per_request": self.queries / self.query_samples if self.query_samples else None,
+            "db_ms_per_request": self.db_ms / self.query_samples if self.query_samples else None,
+            "statuses": dict(self.statuses),
+        }
+
+
+class VirtualUser:
+    __slots__ = ("username", "user_id", "token", "loans")
+
+    def __init__(self, username, user_id):
+        self.username = username
+        self.user_id = user_id
+        self.token = None
+        self.loans = []
+
+
+class LoadTest:
+    def __init__(self, base_url, users, password, mix, *, admin=None, async_reads=False, timeout=30.0, seed=7):
+        self.base_url = base_url
+        self.users = users
+        self.password = password
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.admin = admin
+        self.admin_token = None
+        self.async_reads = async_reads
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.stats = defaultdict(EndpointStats)
+
+    async def _timed(self, label, client, method, path, payload=None, token=None):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, payload, token)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            self.stats[label].record(time.perf_counter() - started)
+            return None
+        self.stats[label].record(time.perf_counter() - started, response)
+        return response
+
+    async def _login(self, client, username, password):
+        """Log in, waiting out 429s so a burst of logins does not fail against the auth rate limits."""
+        for _ in range(20):
+            response = await self._timed("login", client, "POST", "/api/login/", {"username": username, "password": password})
+            if response is None:
+                return None
+            if response.status == 429:
+                await asyncio.sleep(float(response.headers.get("retry-after", "1")))
+                continue
+            return response.json().get("token") if response.status == 200 else None
+        return None
+
+    async def login_all(self, concurrency):
+        queue = asyncio.Queue()
+        for user in self.users:
+            queue.put_nowait(user)
+
+        async def worker():
+            client = HttpClient(self.base_url, self.timeout)
+            try:
+                while not queue.empty():
+                    user = queue.get_nowait()
+                    user.token = await self._login(client, user.username, self.password)
+            finally:
+                await client.close()
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(self.users)) or 1)))
+        if self.admin:
+            client = HttpClient(self.base_url, self.timeout)
+            try:
+                self.admin_token = await self._login(client, *self.admin)
+            finally:
+                await client.close()
+        self.users = [user for user in self.users if user.token]
+        return len(self.users)
+
+    def _read_path(self, name, user):
+        path = READ_PATHS[name][1 if self.async_reads else 0]
+        return path.format(applicant=f"APP-{user.user_id:05d}")
+
+    async def _run_operation(self, name, client, user):
+        label = f"async:{name}" if self.async_reads and name in READ_PATHS else name
+        if name in READ_PATHS:
+            response = await self._timed(label, client, "GET", self._read_path(name, user), token=user.token)
+            if name == "loans" and response is not None and response.status == 200:
+                user.loans = response.json().get("loans", [])
+            return
+
+        if name == "login":
+            await self._timed("login", client, "POST", "/api/login/", {"username": user.username, "password": self.password})
+            return
+
+        if name == "take":
+            category, tenure = self.rng.choice(LOAN_CATEGORIES)
+            payload = {
+                "category": category,
+                "purpose": "Load test",
+                "amount": self.rng.randrange(5000, 200000, 500),
+                "employmentType": "Salaried",
+                "income": self.rng.randrange(20000, 200000, 1000),
+            }
+            if tenure:
+                payload["tenureMonths"] = tenure
+            await self._timed("take", client, "POST", "/api/payments/take/", payload, user.token)
+            return
+
+        if name == "settle":
+            if not user.loans:
+                response = await self._timed("loans", client, "GET", "/api/payments/loans/", token=user.token)
+                if response is not None and response.status == 200:
+                    user.loans = response.json().get("loans", [])
+            open_loans = [loan for loan in user.loans if loan.get("outstanding", 0) > 0]
+            if not open_loans:
+                return
+            loan = self.rng.choice(open_loans)
+            amount = round(min(loan["outstanding"], self.rng.uniform(500, 5000)), 2)
+            await self._timed("settle", client, "POST", "/api/payments/settle/", {"loanId": loan["id"], "amount": amount}, user.token)
+            return
+
+        if name == "approve" and self.admin_token:
+            applicant = f"APP-{user.user_id:05d}"
+            response = await self._timed("evaluation", client, "GET", f"/api/evaluations/{applicant}", token=self.admin_token)
+            if response is None or response.status != 200:
+                return
+            pending = response.json().get("evaluation", {}).get("pendingApprovals", [])
+            if not pending:
+                return
+            item = self.rng.choice(pending)
+            payload = {
+                "requestType": item["type"],
+                "requestId": item["requestId"],
+                "action": "APPROVE" if self.rng.random() < 0.8 else "REJECT",
+            }
+            await self._timed("approve", client, "POST", f"/api/evaluations/{applicant}/approval", payload, self.admin_token)
+
+    async def run(self, concurrency, duration=None, total_requests=None):
+        deadline = time.perf_counter() + duration if duration else None
+        remaining = [total_requests] if total_requests else None
+
+        async def client_loop():
+            client = HttpClient(self.base_url, self.timeout)
+            try:
+                while True:
+                    if deadline and time.perf_counter() >= deadline:
+                        return
+                    if remaining is not None:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                    name = self.rng.choices(self.operations, self.weights)[0]
+                    await self._run_operation(name, client, self.rng.choice(self.users))
+            finally:
+                await client.close()
+
+        self.stats.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        return elapsed, {label: stats.summary(elapsed) for label, stats in sorted(self.stats.items())}
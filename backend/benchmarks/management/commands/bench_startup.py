@@ -0,0 +1,118 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter per sample: boot the WSGI app, then time two requests through it.
+_CHILD = r"""
+import json, os, sys, time
+started = time.perf_counter()
+os.environ["DJANGO_SETTINGS_MODULE"] = sys.argv[1]
+from core.wsgi import application
+booted = time.perf_counter()
+
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+
+def call(target, host):
+    path, _, query = target.partition("?")
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "REMOTE_ADDR": "127.0.0.1",
+        "HTTP_HOST": host,
+        "wsgi.input": BytesIO(),
+    }
+    setup_testing_defaults(environ)
+    statuses = []
+    began = time.perf_counter()
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    b"".join(response)
+    getattr(response, "close", lambda: None)()
+    return time.perf_counter() - began, statuses[0]
+
+
+first, status = call(sys.argv[2], sys.argv[3])
+second, _ = call(sys.argv[2], sys.argv[3])
+print(json.dumps({"boot": booted - started, "first": first, "second": second, "status": status, "modules": len(sys.modules)}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare cold starts of settings profiles: interpreter-to-ready time, WSGI app import (including "
+        "warm-up), first and second request latency, and modules loaded. Each sample is a fresh process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default="core.settings,core.settings_api", help="Comma-separated settings modules.")
+        parser.add_argument("--runs", type=int, default=7)
+        parser.add_argument("--path", default="/api/dashboard/", help="Request path (and query) to time.")
+        parser.add_argument("--host", default=None, help="Host header; defaults to the first ALLOWED_HOSTS entry.")
+        parser.add_argument("--no-warmup", action="store_true", help="Set WARMUP_ON_BOOT=False in every profile.")
+        parser.add_argument("--output", help="Write the medians as JSON to this path.")
+
+    def handle(self, *args, **options):
+        if options["runs"] <= 0:
+            raise CommandError("--runs must be greater than 0.")
+        profiles = [name.strip() for name in options["profiles"].split(",") if name.strip()]
+        host = options["host"] or next((item for item in settings.ALLOWED_HOSTS if item and item != "*"), "localhost")
+        env = dict(os.environ)
+        if options["no_warmup"]:
+            env["WARMUP_ON_BOOT"] = "False"
+
+        results = {}
+        for profile in profiles:
+            samples = []
+            for _ in range(options["runs"]):
+                began = time.perf_counter()
+                completed = subprocess.run(
+                    [sys.executable, "-c", _CHILD, profile, options["path"], host],
+                    cwd=settings.BASE_DIR,
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                )
+                wall = time.perf_counter() - began
+                if completed.returncode != 0:
+                    raise CommandError(f"{profile} failed to start:\n{completed.stderr.strip()}")
+                sample = json.loads(completed.stdout.strip().splitlines()[-1])
+                sample["process"] = wall
+                samples.append(sample)
+            results[profile] = {
+                "process_ms": statistics.median(item["process"] for item in samples) * 1000,
+                "boot_ms": statistics.median(item["boot"] for item in samples) * 1000,
+                "first_request_ms": statistics.median(item["first"] for item in samples) * 1000,
+                "second_request_ms": statistics.median(item["second"] for item in samples) * 1000,
+                "modules": samples[-1]["modules"],
+                "status": samples[-1]["status"],
+            }
+
+        self.stdout.write(
+            f"\n{'profile':<24} {'process ms':>11} {'boot ms':>9} {'1st req ms':>11} {'2nd req ms':>11} {'modules':>8}  status"
+        )
+        for profile, item in results.items():
+            self.stdout.write(
+                f"{profile:<24} {item['process_ms']:>11.1f} {item['boot_ms']:>9.1f} {item['first_request_ms']:>11.2f} "
+                f"{item['second_request_ms']:>11.2f} {item['modules']:>8}  {item['status']}"
+            )
+        if len(results) > 1:
+            baseline = results[profiles[0]]
+            for profile in profiles[1:]:
+                item = results[profile]
+                ready = (baseline["boot_ms"] + baseline["first_request_ms"]) - (item["boot_ms"] + item["first_request_ms"])
+                self.stdout.write(
+                    f"{profile}: first response ready {abs(ready):.1f}ms {'sooner' if ready >= 0 else 'later'} "
+                    f"than with {profiles[0]}"
+                )
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
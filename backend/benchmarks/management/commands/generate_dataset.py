@@ -0,0 +1,193 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from benchmarks import dataset
+from core.db import partitions
+from core.db.copy import copy_rows
+
+TABLES = ("users", "credit_accounts", "payments", "score_history")
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def _load_chunk(task):
+    """COPY one contiguous range of users and everything they own; runs inside a worker process."""
+    start, count, base = task["start"], task["count"], task["base"]
+    plans = [
+        dataset.plan_user(
+            task["seed"],
+            base["user"] + offset,
+            base["account"],
+            offset,
+            f"{task['prefix']}{base['user'] + offset}",
+            task["password_hash"],
+            task["as_of"],
+            task["max_installments"],
+            task["snapshots"],
+        )
+        for offset in range(start, start + count)
+    ]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Losing the tail of a synthetic load on a crash is fine; the WAL flush per chunk is not.
+            cursor.execute("SET LOCAL synchronous_commit = off")
+            copy_rows(cursor, "users", dataset.USER_COLUMNS, (plan[0] for plan in plans))
+            copy_rows(cursor, "credit_accounts", dataset.ACCOUNT_COLUMNS, (row for plan in plans for row in plan[1]))
+            payments = copy_rows(cursor, "payments", dataset.PAYMENT_COLUMNS, (row for plan in plans for row in plan[2]))
+            copy_rows(cursor, "score_history", dataset.SCORE_COLUMNS, (row for plan in plans for row in plan[3]))
+    return count, sum(len(plan[1]) for plan in plans), payments
+
+
+def _deferrable_objects(cursor):
+    cursor.execute(
+        """
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = current_schema()
+          AND i.tablename = ANY(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+        """,
+        [list(TABLES)],
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE contype = 'f' AND conrelid::regclass::text = ANY(%s)
+        """,
+        [list(TABLES)],
+    )
+    return indexes, cursor.fetchall()
+
+
+class Command(BaseCommand):
+    help = "Stream a synthetic applicant population (users, accounts, installments, score history) into PostgreSQL via COPY."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, required=True)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Users per COPY transaction.")
+        parser.add_argument("--max-installments", type=int, default=12, help="Newest installments kept per account.")
+        parser.add_argument("--snapshots", type=int, default=6, help="Monthly score_history rows per user.")
+        parser.add_argument("--prefix", default="lt_", help="Username prefix; usernames are <prefix><user_id>.")
+        parser.add_argument("--password", default="LoadTest#2024", help="Shared password for every generated user.")
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Drop secondary indexes and foreign keys during the load and rebuild them afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("users", "workers", "chunk_size", "snapshots"):
+            if options[name] <= 0:
+                raise CommandError(f"--{name.replace('_', '-')} must be greater than 0.")
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COALESCE(MAX(user_id), 0) + 1 FROM users")
+            user_base = cursor.fetchone()[0]
+            cursor.execute("SELECT COALESCE(MAX(account_id), 0) + 1 FROM credit_accounts")
+            account_base = cursor.fetchone()[0]
+
+        # One PBKDF2 hash shared by every row; hashing millions of passwords would dominate the run.
+        template = {
+            "seed": options["seed"],
+            "base": {"user": user_base, "account": account_base},
+            "prefix": options["prefix"],
+            "password_hash": make_password(options["password"]),
+            "as_of": date.today(),
+            "max_installments": options["max_installments"],
+            "snapshots": options["snapshots"],
+        }
+        total, chunk_size = options["users"], options["chunk_size"]
+        tasks = [
+            {**template, "start": start, "count": min(chunk_size, total - start)}
+            for start in range(0, total, chunk_size)
+        ]
+
+        # Accounts open up to ten years back; give every month its partition up front so COPY
+        # does not pile rows into the default partitions.
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for table in partitions.PARTITIONED_TABLES:
+                    if partitions.is_partitioned(cursor, table):
+                        partitions.ensure_partitions(
+                            cursor,
+                            table,
+                            partitions.add_months(template["as_of"], -121),
+                            partitions.add_months(template["as_of"], getattr(settings, "PARTITION_MONTHS_AHEAD", 3)),
+                        )
+
+        deferred = ([], [])
+        if options["defer_indexes"]:
+            with connection.cursor() as cursor:
+                deferred = _deferrable_objects(cursor)
+                for table, name, _ in deferred[1]:
+                    cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+                for name, _ in deferred[0]:
+                    cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+            self.stdout.write(f"Deferred {len(deferred[0])} indexes and {len(deferred[1])} foreign keys.")
+
+        # Forked workers must not share the parent's socket.
+        connections.close_all()
+        started = time.perf_counter()
+        users = accounts = payments = 0
+        try:
+            with ProcessPoolExecutor(
+                max_workers=options["workers"],
+                initializer=_init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "core.settings"),),
+            ) as pool:
+                for loaded_users, loaded_accounts, loaded_payments in pool.map(_load_chunk, tasks):
+                    users += loaded_users
+                    accounts += loaded_accounts
+                    payments += loaded_payments
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"  {users}/{total} users, {accounts} accounts, {payments} payments "
+                        f"({users / elapsed:,.0f} users/s, {payments / elapsed:,.0f} payments/s)"
+                    )
+        finally:
+            with connection.cursor() as cursor:
+                for name, definition in deferred[0]:
+                    self.stdout.write(f"  rebuilding {name}")
+                    # pg_indexes reports partitioned indexes as ON ONLY; rebuild them on every partition.
+                    cursor.execute(definition.replace(" ON ONLY ", " ON ", 1))
+                for table, name, definition in deferred[1]:
+                    self.stdout.write(f"  restoring {name}")
+                    if partitions.is_partitioned(cursor, table):
+                        # NOT VALID is not accepted on partitioned tables; the check runs inline.
+                        cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+                        continue
+                    cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition} NOT VALID')
+                    cursor.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT "{name}"')
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence('users', 'user_id'), COALESCE((SELECT MAX(user_id) FROM users), 1))"
+            )
+            cursor.execute(
+                "SELECT setval(pg_get_serial_sequence('credit_accounts', 'account_id'), "
+                "COALESCE((SELECT MAX(account_id) FROM credit_accounts), 1))"
+            )
+            for table in TABLES:
+                cursor.execute(f"ANALYZE {table}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {users} users ({options['prefix']}{user_base}..{options['prefix']}{user_base + total - 1}), "
+                f"{accounts} accounts and {payments} payments in {time.perf_counter() - started:.1f}s."
+            )
+        )
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.loadtest import DEFAULT_MIX, LoadTest, VirtualUser, parse_mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a running server with logged-in synthetic users (see generate_dataset) and report per-endpoint "
+        "latency percentiles, error rates and SQL counts. Raise LOGIN_IP_BURST on the server for large user pools."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--users", type=int, default=200, help="Synthetic users to log in.")
+        parser.add_argument("--prefix", default="lt_")
+        parser.add_argument("--password", default="LoadTest#2024")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run; ignored with --requests.")
+        parser.add_argument("--requests", type=int, help="Stop after this many operations instead of a duration.")
+        parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of unrecorded traffic first.")
+        parser.add_argument("--mix", default=DEFAULT_MIX, help="Comma-separated operation=weight pairs.")
+        parser.add_argument(
+            "--async-reads",
+            action="store_true",
+            help="Send dashboard/loans/history/evaluation reads to the /api/async/ routes.",
+        )
+        parser.add_argument("--no-admin", action="store_true", help="Skip admin login; drops approve operations.")
+        parser.add_argument("--timeout", type=float, default=30.0)
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--output", help="Write the report as JSON to this path.")
+
+    def handle(self, *args, **options):
+        if options["users"] <= 0 or options["concurrency"] <= 0:
+            raise CommandError("--users and --concurrency must be greater than 0.")
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT username, user_id FROM users WHERE username LIKE %s ORDER BY user_id LIMIT %s",
+                [options["prefix"].replace("_", "\\_") + "%", options["users"]],
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            raise CommandError(f"No users named {options['prefix']}*; run generate_dataset first.")
+
+        admin = None
+        if not options["no_admin"] and getattr(settings, "ADMIN_USERNAME", None) and getattr(settings, "ADMIN_PASSWORD", None):
+            admin = (settings.ADMIN_USERNAME, settings.ADMIN_PASSWORD)
+        if admin is None:
+            mix.pop("approve", None)
+
+        test = LoadTest(
+            options["base_url"],
+            [VirtualUser(username, user_id) for username, user_id in rows],
+            options["password"],
+            mix,
+            admin=admin,
+            async_reads=options["async_reads"],
+            timeout=options["timeout"],
+            seed=options["seed"],
+        )
+        report = asyncio.run(self._run(test, options))
+
+        self.stdout.write(
+            f"\n{'endpoint':<20} {'reqs':>8} {'rps':>9} {'err%':>6} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} "
+            f"{'maxms':>9} {'q/req':>6} {'dbms':>7}"
+        )
+        for label, item in report["endpoints"].items():
+            queries = f"{item['queries_per_request']:.1f}" if item["queries_per_request"] is not None else "-"
+            db_ms = f"{item['db_ms_per_request']:.2f}" if item["db_ms_per_request"] is not None else "-"
+            self.stdout.write(
+                f"{label:<20} {item['requests']:>8} {item['rps']:>9.1f} {item['error_rate'] * 100:>5.1f}% "
+                f"{item['p50_ms']:>9.2f} {item['p95_ms']:>9.2f} {item['p99_ms']:>9.2f} {item['max_ms']:>9.2f} "
+                f"{queries:>6} {db_ms:>7}"
+            )
+        self.stdout.write(f"\n{report['total_requests']} requests in {report['elapsed']:.1f}s ({report['rps']:.1f} req/s)")
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+    async def _run(self, test, options):
+        logged_in = await test.login_all(options["concurrency"])
+        if not logged_in:
+            raise CommandError("No synthetic user could log in; check --password and the server URL.")
+        self.stdout.write(f"Logged in {logged_in} users{' and the admin' if test.admin_token else ''}.")
+
+        if options["warmup"] > 0:
+            await test.run(options["concurrency"], duration=options["warmup"])
+        duration = None if options["requests"] else options["duration"]
+        elapsed, endpoints = await test.run(options["concurrency"], duration=duration, total_requests=options["requests"])
+        total = sum(item["requests"] for item in endpoints.values())
+        return {
+            "base_url": options["base_url"],
+            "concurrency": options["concurrency"],
+            "async_reads": options["async_reads"],
+            "mix": options["mix"],
+            "elapsed": elapsed,
+            "total_requests": total,
+            "rps": total / elapsed if elapsed else 0.0,
+            "endpoints": endpoints,
+        }
@@ -0,0 +1,141 @@
+import gc
+import json
+import math
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.cases import CASES
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / "baseline.json"
+
+
+def _timed_round(run, batch, loops):
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            run(batch)
+        return time.perf_counter() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _calibrate(run, batch, min_time):
+    """Loops per round so that one round takes at least ``min_time`` seconds."""
+    # Untimed first call: lazy imports, caches and first-call allocations would inflate it.
+    _timed_round(run, batch, 1)
+    loops = 1
+    while True:
+        elapsed = _timed_round(run, batch, loops)
+        if elapsed >= min_time:
+            return loops
+        # Aim a little past the target, growing at most tenfold per step while rounds are tiny.
+        wanted = math.ceil(loops * min_time / max(elapsed, 1e-9) * 1.1)
+        loops = max(loops + 1, min(wanted, loops * 10))
+
+
+def _measure(run, batch, rounds, min_time):
+    # Repeat small batches inside a round so the timer resolution does not dominate.
+    loops = _calibrate(run, batch, min_time)
+    per_op_ns = [_timed_round(run, batch, loops) / (loops * len(batch)) * 1e9 for _ in range(rounds)]
+    return {
+        "ns_per_op": round(statistics.median(per_op_ns), 1),
+        "ns_per_op_min": round(min(per_op_ns), 1),
+        "rounds": rounds,
+        "loops": loops,
+        "batch": len(batch),
+    }
+
+
+def _host():
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(), "machine": platform.machine()}
+
+
+class Command(BaseCommand):
+    help = "Time the scoring, PD, lookup and evaluation-payload hot paths and compare with a stored baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1,1000,1000000", help="Comma-separated user counts per batch.")
+        parser.add_argument("--case", action="append", choices=sorted(CASES), help="Limit to these cases.")
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timed round.")
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=getattr(settings, "BENCHMARK_REGRESSION_THRESHOLD", 0.10),
+            help="Allowed slowdown against the baseline as a fraction (0.10 = 10%%).",
+        )
+        parser.add_argument("--update-baseline", action="store_true", help="Write these results as the new baseline.")
+        parser.add_argument("--output", help="Also write the results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",") if size.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers.")
+        if not sizes or min(sizes) <= 0 or options["rounds"] <= 0:
+            raise CommandError("--sizes and --rounds must be greater than 0.")
+
+        results = {}
+        for name in options["case"] or sorted(CASES):
+            make_inputs, run = CASES[name]
+            for size in sizes:
+                batch = make_inputs(size)
+                key = f"{name}[{size}]"
+                results[key] = _measure(run, batch, options["rounds"], options["min_time"])
+                del batch
+                self.stdout.write(f"  measured {key}: {results[key]['ns_per_op']:.1f} ns/op")
+
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "host": _host(),
+            "results": results,
+        }
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+        baseline_path = Path(options["baseline"])
+        if options["update_baseline"]:
+            baseline_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}."))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(f"No baseline at {baseline_path}; run with --update-baseline on this machine to record one."))
+            return
+
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get("host") != report["host"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Baseline at {baseline_path} was recorded on {baseline.get('host')}, not {report['host']}; "
+                    "not comparing. Run with --update-baseline on this machine to record one."
+                )
+            )
+            return
+
+        limit = 1 + options["threshold"]
+        regressions = []
+        self.stdout.write(f"{'case':<36} {'ns/op':>12} {'baseline':>12} {'change':>8}")
+        for key, result in results.items():
+            previous = baseline.get("results", {}).get(key)
+            if not previous:
+                self.stdout.write(f"{key:<36} {result['ns_per_op']:>12.1f} {'-':>12} {'new':>8}")
+                continue
+            ratio = result["ns_per_op"] / previous["ns_per_op"] if previous["ns_per_op"] else 1.0
+            self.stdout.write(f"{key:<36} {result['ns_per_op']:>12.1f} {previous['ns_per_op']:>12.1f} {(ratio - 1) * 100:>+7.1f}%")
+            if ratio > limit:
+                regressions.append(f"{key} {(ratio - 1) * 100:+.1f}%")
+
+        if regressions:
+            raise CommandError(f"Regressions beyond {options['threshold']:.0%}: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
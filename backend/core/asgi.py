@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+if settings.WARMUP_ON_BOOT:
+    from core.warmup import warm_up
+
+    # Sync DB work runs on executor threads under ASGI; a connection opened here would sit unused.
+    warm_up(connect=False, async_views=True)
@@ -0,0 +1,101 @@
+"""Async PostgreSQL access for the ASGI read endpoints.
+
+Uses psycopg 3's AsyncConnectionPool with the same connection settings as the
+Django ``default`` alias. One pool is kept per event loop; under ASGI that is a
+single pool per alias per worker process. Statements come from
+``core.db.queries`` and use psycopg's own server-side prepare cache; read
+statements follow ``core.db.routing`` like the sync path.
+"""
+
+import asyncio
+import time
+import weakref
+
+from django.conf import settings
+from psycopg import InterfaceError, OperationalError
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+
+from core import metrics
+from core.db import queries, routing
+
+_pools = weakref.WeakKeyDictionary()
+
+
+def _conninfo(alias="default"):
+    database = settings.DATABASES[alias]
+    params = {
+        "dbname": database.get("NAME"),
+        "user": database.get("USER"),
+        "password": database.get("PASSWORD"),
+        "host": database.get("HOST"),
+        "port": database.get("PORT"),
+    }
+    params.update(database.get("OPTIONS", {}))
+    return make_conninfo(**{key: value for key, value in params.items() if value not in (None, "")})
+
+
+async def get_pool(alias="default"):
+    loop = asyncio.get_running_loop()
+    pools = _pools.setdefault(loop, {})
+    pool = pools.get(alias)
+    if pool is None:
+        pool = AsyncConnectionPool(
+            _conninfo(alias),
+            min_size=getattr(settings, "ASYNC_DB_POOL_MIN", 2),
+            max_size=getattr(settings, "ASYNC_DB_POOL_MAX", 20),
+            timeout=getattr(settings, "ASYNC_DB_POOL_TIMEOUT", 10),
+            kwargs={"autocommit": True},
+            open=False,
+        )
+        pools[alias] = pool
+    if pool.closed:
+        await pool.open()
+    return pool
+
+
+async def _execute(cursor, name, params):
+    statement = queries.get(name)
+    prepare = getattr(settings, "QUERY_REGISTRY_PREPARE", True)
+    started = time.perf_counter()
+    try:
+        await cursor.execute(statement.sql, list(params), prepare=prepare)
+    finally:
+        elapsed = time.perf_counter() - started
+        queries.record(name, elapsed)
+        metrics.record_query(statement.sql, elapsed)
+
+
+async def _fetch(alias, name, params, one):
+    pool = await get_pool(alias)
+    async with pool.connection() as conn:
+        async with conn.cursor() as cursor:
+            await _execute(cursor, name, params)
+            return await (cursor.fetchone() if one else cursor.fetchall())
+
+
+async def _routed(name, params, one):
+    alias = routing.read_alias() if queries.get(name).kind == "read" else "default"
+    if alias != "default":
+        try:
+            return await _fetch(alias, name, params, one)
+        except (InterfaceError, OperationalError) as exc:
+            routing.replica_health.mark_down(exc)
+    elif queries.get(name).kind == "write":
+        routing.note_write()
+    return await _fetch("default", name, params, one)
+
+
+async def fetchall(name, params=()):
+    return await _routed(name, params, one=False)
+
+
+async def fetchone(name, params=()):
+    return await _routed(name, params, one=True)
+
+
+async def close_pools():
+    for pools in list(_pools.values()):
+        for pool in pools.values():
+            await pool.close()
+    _pools.clear()
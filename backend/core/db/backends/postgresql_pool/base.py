@@ -0,0 +1,57 @@
+"""PostgreSQL backend that checks connections out of a per-process pool.
+
+Configure with ``ENGINE = "core.db.backends.postgresql_pool"`` and an optional
+``POOL`` dict (min_size, max_size, timeout, pre_ping) on the database alias.
+Keep ``CONN_MAX_AGE = 0`` so Django hands the connection back at the end of
+every request instead of pinning it to a thread.
+"""
+
+import threading
+
+from django.db.backends.postgresql import base
+
+from core.db.pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _get_pool(self, conn_params):
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None:
+                options = self.settings_dict.get("POOL", {})
+                pool = ConnectionPool(
+                    lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+                    min_size=options.get("min_size", 1),
+                    max_size=options.get("max_size", 10),
+                    timeout=options.get("timeout", 5.0),
+                    pre_ping=options.get("pre_ping", True),
+                )
+                _pools[self.alias] = pool
+                created = True
+            else:
+                created = False
+        if created:
+            pool.fill()
+        return pool
+
+    def get_new_connection(self, conn_params):
+        return self._get_pool(conn_params).acquire()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+        with self.wrap_database_errors:
+            if pool is None:
+                return self.connection.close()
+            pool.release(self.connection)
@@ -0,0 +1,56 @@
+"""Streaming helpers for PostgreSQL ``COPY ... FROM STDIN`` (text format) over psycopg 3."""
+
+import io
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_field(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def copy_line(values):
+    return "\t".join(copy_field(value) for value in values) + "\n"
+
+
+class IteratorFile(io.TextIOBase):
+    """Read-only file object over an iterator of COPY lines, so rows never materialize as a list."""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        buffered = len(self._buffer)
+        while size < 0 or buffered < size:
+            try:
+                line = next(self._lines)
+            except StopIteration:
+                break
+            chunks.append(line)
+            buffered += len(line)
+
+        data = "".join(chunks)
+        if size < 0:
+            self._buffer = ""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def copy_rows(cursor, table, columns, rows, chunk_size=65536):
+    """Stream an iterable of row tuples into table with a single COPY; returns the rows copied."""
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    source = IteratorFile(copy_line(row) for row in rows)
+    with cursor.copy(statement) as copy:
+        while chunk := source.read(chunk_size):
+            copy.write(chunk)
+    return cursor.rowcount
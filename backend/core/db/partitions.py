@@ -0,0 +1,283 @@
+"""Monthly range partitions for ``payments`` (by due_date) and ``score_history`` (by calculated_at).
+
+Partitions are named ``<table>_pYYYYMM``; each table also has a ``<table>_default``
+partition so writes never fail when maintenance falls behind. Creating a month
+that already has rows in the default partition moves those rows into it.
+
+score_history months older than the retention window are folded into
+``score_history_monthly`` (one row per user and month) and dropped; payments
+are never dropped. ``manage_partitions`` drives all of this.
+"""
+
+import re
+from datetime import date, datetime, timezone
+
+from django.db import transaction
+
+PARTITIONED_TABLES = {
+    "payments": "due_date",
+    "score_history": "calculated_at",
+}
+PRIMARY_KEYS = {
+    "payments": "payment_id",
+    "score_history": "score_id",
+}
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+_ROLLUP_SQL = """
+    INSERT INTO score_history_monthly (
+        user_id, month, snapshots, score_min, score_max, score_avg,
+        last_score, last_risk_level, last_factors, last_calculated_at
+    )
+    SELECT
+        user_id,
+        date_trunc('month', calculated_at AT TIME ZONE 'UTC')::date,
+        COUNT(*),
+        MIN(score),
+        MAX(score),
+        ROUND(AVG(score), 2),
+        (array_agg(score ORDER BY calculated_at DESC))[1],
+        (array_agg(risk_level ORDER BY calculated_at DESC))[1],
+        (array_agg(factors ORDER BY calculated_at DESC))[1],
+        MAX(calculated_at)
+    FROM {source}
+    WHERE calculated_at < %s::timestamptz
+    GROUP BY 1, 2
+    ON CONFLICT (user_id, month) DO UPDATE
+    SET snapshots = score_history_monthly.snapshots + EXCLUDED.snapshots,
+        score_min = LEAST(score_history_monthly.score_min, EXCLUDED.score_min),
+        score_max = GREATEST(score_history_monthly.score_max, EXCLUDED.score_max),
+        score_avg = ROUND(
+            (score_history_monthly.score_avg * score_history_monthly.snapshots + EXCLUDED.score_avg * EXCLUDED.snapshots)
+            / (score_history_monthly.snapshots + EXCLUDED.snapshots),
+            2
+        ),
+        last_score = CASE WHEN EXCLUDED.last_calculated_at >= score_history_monthly.last_calculated_at
+                          THEN EXCLUDED.last_score ELSE score_history_monthly.last_score END,
+        last_risk_level = CASE WHEN EXCLUDED.last_calculated_at >= score_history_monthly.last_calculated_at
+                               THEN EXCLUDED.last_risk_level ELSE score_history_monthly.last_risk_level END,
+        last_factors = CASE WHEN EXCLUDED.last_calculated_at >= score_history_monthly.last_calculated_at
+                            THEN EXCLUDED.last_factors ELSE score_history_monthly.last_factors END,
+        last_calculated_at = GREATEST(score_history_monthly.last_calculated_at, EXCLUDED.last_calculated_at)
+"""
+
+
+def month_start(value):
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first, last):
+    """Month starts from first through last inclusive."""
+    current = month_start(first)
+    while current <= last:
+        yield current
+        current = add_months(current, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month.year}{month.month:02d}"
+
+
+def partition_month(name):
+    match = _PARTITION_SUFFIX.search(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _bound(table, month):
+    # calculated_at is timestamptz; pin bounds to UTC so they do not follow the session time zone.
+    return f"'{month.isoformat()} 00:00:00+00'" if PARTITIONED_TABLES[table] == "calculated_at" else f"'{month.isoformat()}'"
+
+
+def is_partitioned(cursor, table):
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))", [table])
+    return cursor.fetchone()[0]
+
+
+def existing_partitions(cursor, table):
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits i
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        [table],
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def ensure_default_partition(cursor, table):
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+
+
+def create_month_partition(cursor, table, month):
+    """Create one month; rows already sitting in the default partition for that month are moved in.
+
+    Run inside a transaction: the default partition is briefly detached.
+    """
+    name = partition_name(table, month)
+    column = PARTITIONED_TABLES[table]
+    lower, upper = _bound(table, month), _bound(table, add_months(month, 1))
+
+    cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {column} >= {lower} AND {column} < {upper})")
+    if not cursor.fetchone()[0]:
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES FROM ({lower}) TO ({upper})")
+        return name, 0
+
+    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {table}_default")
+    cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ({lower}) TO ({upper})")
+    cursor.execute(
+        f"""
+        WITH moved AS (
+            DELETE FROM {table}_default
+            WHERE {column} >= {lower} AND {column} < {upper}
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+        """
+    )
+    moved = cursor.rowcount
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {table}_default DEFAULT")
+    return name, moved
+
+
+def ensure_partitions(cursor, table, first_month, last_month):
+    """Create every missing month partition in [first_month, last_month]; returns [(name, moved_rows)]."""
+    ensure_default_partition(cursor, table)
+    present = existing_partitions(cursor, table)
+    created = []
+    for month in month_range(first_month, last_month):
+        if partition_name(table, month) not in present:
+            created.append(create_month_partition(cursor, table, month))
+    return created
+
+
+def split_default_partition(cursor, table, not_before=None):
+    """Give every month that has rows in the default partition its own partition."""
+    column = PARTITIONED_TABLES[table]
+    cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM {table}_default")
+    low, high = cursor.fetchone()
+    if low is None:
+        return []
+    first = month_start(low)
+    if not_before is not None and first < not_before:
+        first = not_before
+    return ensure_partitions(cursor, table, first, month_start(high))
+
+
+def convert_to_partitioned(cursor, table, last_month):
+    """Rebuild a plain table as its partitioned equivalent, keeping indexes, foreign keys and the id sequence.
+
+    Holds an ACCESS EXCLUSIVE lock for the whole copy; run inside a transaction in a maintenance window.
+    Returns the number of rows copied.
+    """
+    column, key = PARTITIONED_TABLES[table], PRIMARY_KEYS[table]
+    legacy = f"{table}_unpartitioned"
+
+    cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+    cursor.execute(
+        """
+        SELECT i.indexname, i.indexdef, EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+        FROM pg_indexes i
+        WHERE i.schemaname = current_schema() AND i.tablename = %s
+        """,
+        [table],
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [table, key])
+    sequence = cursor.fetchone()[0]
+
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    for name, _, _ in indexes:
+        cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{name[:50]}_unpartitioned"')
+
+    cursor.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE ({column})")
+    cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({key}, {column})")
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+    if sequence:
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{key}")
+
+    cursor.execute(f"SELECT MIN({column}) FROM {legacy}")
+    low = cursor.fetchone()[0]
+    ensure_partitions(cursor, table, month_start(low) if low is not None else last_month, last_month)
+    cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    copied = cursor.rowcount
+
+    for _, definition, is_constraint in indexes:
+        if not is_constraint:
+            cursor.execute(definition)
+    cursor.execute(f"DROP TABLE {legacy}")
+    return copied
+
+
+def roll_up_score_history(cursor, before):
+    """Fold score_history rows older than the month ``before`` into score_history_monthly and remove them.
+
+    Whole month partitions are dropped; stragglers in the default partition (or in an
+    unpartitioned table) are deleted. Each month commits on its own, so the ACCESS
+    EXCLUSIVE lock a DROP TABLE takes on score_history is held for one month's roll-up
+    at a time; call it outside a transaction. Returns (dropped_partitions, deleted_rows).
+    """
+    cutoff = f"{before.isoformat()} 00:00:00+00"
+    dropped = []
+    source = "score_history"
+    if is_partitioned(cursor, "score_history"):
+        for name in sorted(existing_partitions(cursor, "score_history")):
+            month = partition_month(name)
+            if month is None or month >= before:
+                continue
+            with transaction.atomic(using=cursor.db.alias):
+                cursor.execute(_ROLLUP_SQL.format(source=name), [cutoff])
+                cursor.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+        source = "score_history_default"
+    with transaction.atomic(using=cursor.db.alias):
+        cursor.execute(_ROLLUP_SQL.format(source=source), [cutoff])
+        cursor.execute(f"DELETE FROM {source} WHERE calculated_at < %s::timestamptz", [cutoff])
+    return dropped, cursor.rowcount
+
+
+def create_index(cursor, table, name, spec):
+    """Idempotent ``CREATE INDEX CONCURRENTLY name ON table spec``; run outside a transaction.
+
+    Partitioned tables cannot be indexed concurrently in one statement, so the
+    parent gets an index ``ON ONLY`` itself and each partition is indexed
+    concurrently and attached; later partitions inherit the index on creation.
+    Partitions that already have a child attached (e.g. the auto-named ones a
+    data.sql load creates, or ones from an interrupted run) are skipped.
+    """
+    if not is_partitioned(cursor, table):
+        cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {spec}")
+        return
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} {spec}")
+    cursor.execute(
+        """
+        SELECT child_table.relname
+        FROM pg_inherits i
+        JOIN pg_index x ON x.indexrelid = i.inhrelid
+        JOIN pg_class child_table ON child_table.oid = x.indrelid
+        WHERE i.inhparent = %s::regclass
+        """,
+        [name],
+    )
+    attached = {row[0] for row in cursor.fetchall()}
+    for partition in sorted(existing_partitions(cursor, table)):
+        if partition in attached:
+            continue
+        child = f"{name}_{partition[len(table) + 1:]}"
+        cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {spec}")
+        cursor.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
@@ -0,0 +1,151 @@
+"""Thread-safe psycopg 3 connection pool used by the ``postgresql_pool`` backend."""
+
+import threading
+import time
+from collections import deque
+
+import psycopg
+from psycopg.pq import TransactionStatus
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the checkout timeout."""
+
+
+class ConnectionPool:
+    def __init__(self, connect, min_size=1, max_size=10, timeout=5.0, pre_ping=True):
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._counters = {
+            "created": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "ping_failures": 0,
+        }
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._counters["created"] += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._counters["discarded"] += 1
+            self._cond.notify()
+
+    def _ping(self, conn):
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not conn.autocommit:
+                # Without autocommit the SELECT opened a transaction; hand the connection over idle.
+                conn.rollback()
+            return True
+        except psycopg.Error:
+            return False
+
+    def fill(self):
+        """Open connections up to min_size; called once when the pool is created."""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._open()
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+
+    def acquire(self):
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            conn = None
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise PoolTimeout(f"No database connection available within {self.timeout}s.")
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    conn = self._idle.pop()
+                else:
+                    self._size += 1
+
+            if conn is None:
+                conn = self._open()
+            elif conn.closed or (self.pre_ping and not self._ping(conn)):
+                # Stale after a failover or server-side timeout: replace it and try again.
+                with self._cond:
+                    self._counters["ping_failures"] += 1
+                self._discard(conn)
+                continue
+
+            wait_seconds = time.perf_counter() - started
+            with self._cond:
+                self._counters["checkouts"] += 1
+                if waited:
+                    self._counters["waits"] += 1
+                self._wait_seconds_total += wait_seconds
+                self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+            return conn
+
+    def release(self, conn):
+        if conn.closed:
+            self._discard(conn)
+            return
+        if conn.info.transaction_status != TransactionStatus.IDLE:
+            try:
+                conn.rollback()
+            except psycopg.Error:
+                self._discard(conn)
+                return
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._counters["checkouts"]
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                **self._counters,
+                "wait_seconds_total": round(self._wait_seconds_total, 6),
+                "wait_seconds_avg": round(self._wait_seconds_total / checkouts, 6) if checkouts else 0.0,
+                "wait_seconds_max": round(self._wait_seconds_max, 6),
+            }
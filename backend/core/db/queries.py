@@ -0,0 +1,820 @@
+"""Named SQL statements for the request path.
+
+Every hot statement is defined here once and run through ``execute`` (sync,
+Django cursor) or ``core.db.aio`` (async). On PostgreSQL each statement is
+PREPAREd once per connection and then EXECUTEd, so it is parsed and planned
+once per session instead of on every call. Each execution lands in a
+per-statement latency histogram; ``query_stats()`` ranks them by total time.
+"""
+
+import re
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connections
+
+from core.db import routing
+
+# Histogram bucket upper bounds in milliseconds.
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+_PLACEHOLDER = re.compile(r"%s")
+
+
+class Statement:
+    def __init__(self, name, sql, kind="read"):
+        self.name = name
+        self.sql = sql
+        self.kind = kind
+        self.param_count = len(_PLACEHOLDER.findall(sql))
+        counter = iter(range(1, self.param_count + 1))
+        self.prepare_sql = _PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+        self.prepared_name = "q_" + re.sub(r"[^a-z0-9_]", "_", name.lower())
+        placeholders = ", ".join(["%s"] * self.param_count)
+        self.execute_sql = f"EXECUTE {self.prepared_name}" + (f" ({placeholders})" if placeholders else "")
+
+
+class _Histogram:
+    __slots__ = ("counts", "calls", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms):
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.counts[index] += 1
+                break
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def quantile(self, fraction):
+        target = fraction * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+_registry = {}
+_histograms = {}
+_histograms_lock = threading.Lock()
+_prepared = weakref.WeakKeyDictionary()
+
+
+def register(name, sql, kind="read"):
+    if name in _registry:
+        raise ValueError(f"Query {name!r} is already registered.")
+    _registry[name] = Statement(name, sql, kind)
+    return name
+
+
+def get(name):
+    return _registry[name]
+
+
+def registered():
+    return dict(_registry)
+
+
+def record(name, elapsed_seconds):
+    with _histograms_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = _Histogram()
+        histogram.observe(elapsed_seconds * 1000)
+
+
+def query_stats():
+    """Per-statement latency summary, hottest (largest total time) first."""
+    with _histograms_lock:
+        snapshot = [
+            {
+                "name": name,
+                "calls": histogram.calls,
+                "total_ms": round(histogram.total_ms, 3),
+                "mean_ms": round(histogram.total_ms / histogram.calls, 3) if histogram.calls else 0.0,
+                "p50_ms": histogram.quantile(0.50),
+                "p95_ms": histogram.quantile(0.95),
+                "p99_ms": histogram.quantile(0.99),
+                "max_ms": round(histogram.max_ms, 3),
+                "buckets": list(zip(LATENCY_BUCKETS_MS, histogram.counts)),
+            }
+            for name, histogram in _histograms.items()
+        ]
+    return sorted(snapshot, key=lambda item: item["total_ms"], reverse=True)
+
+
+def reset_stats():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def _prepared_names(raw_connection):
+    names = _prepared.get(raw_connection)
+    if names is None:
+        names = _prepared[raw_connection] = set()
+    return names
+
+
+def _is_missing_prepared_statement(exc):
+    # Django re-raises driver errors with the original as __cause__: psycopg 3 exposes the
+    # SQLSTATE as ``sqlstate``, psycopg2 as ``pgcode``.
+    cause = exc.__cause__
+    return (getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)) == "26000"
+
+
+def execute(cursor, name, params=()):
+    """Run a registered statement on a Django cursor and return the cursor."""
+    statement = _registry[name]
+    if statement.kind == "write":
+        routing.note_write()
+    started = time.perf_counter()
+    try:
+        if not getattr(settings, "QUERY_REGISTRY_PREPARE", True) or cursor.db.vendor != "postgresql":
+            cursor.execute(statement.sql, list(params))
+            return cursor
+
+        raw_connection = cursor.db.connection
+        names = _prepared_names(raw_connection)
+        if statement.prepared_name not in names:
+            cursor.execute(f"PREPARE {statement.prepared_name} AS {statement.prepare_sql}")
+            names.add(statement.prepared_name)
+        try:
+            cursor.execute(statement.execute_sql, list(params))
+        except Exception as exc:
+            # The session lost its prepared statements (e.g. DISCARD ALL from a pooler).
+            # Only recoverable outside a transaction, where the failed EXECUTE left nothing aborted.
+            if not _is_missing_prepared_statement(exc) or not cursor.db.get_autocommit():
+                raise
+            names.clear()
+            cursor.execute(f"PREPARE {statement.prepared_name} AS {statement.prepare_sql}")
+            names.add(statement.prepared_name)
+            cursor.execute(statement.execute_sql, list(params))
+        return cursor
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def prepare_all(cursor, kind="read"):
+    """PREPARE every registered statement of ``kind`` on this connection ahead of its first use."""
+    if not getattr(settings, "QUERY_REGISTRY_PREPARE", True) or cursor.db.vendor != "postgresql":
+        return 0
+    names = _prepared_names(cursor.db.connection)
+    prepared = 0
+    for statement in _registry.values():
+        if statement.kind == kind and statement.prepared_name not in names:
+            cursor.execute(f"PREPARE {statement.prepared_name} AS {statement.prepare_sql}")
+            names.add(statement.prepared_name)
+            prepared += 1
+    return prepared
+
+
+def _fetch(cursor, name, params, fetch):
+    alias = routing.read_alias() if _registry[name].kind == "read" else cursor.db.alias
+    if alias != cursor.db.alias and not cursor.db.in_atomic_block:
+        try:
+            with connections[alias].cursor() as routed_cursor:
+                return fetch(execute(routed_cursor, name, params))
+        except (InterfaceError, OperationalError) as exc:
+            # Replica unreachable: serve this read from the caller's connection and stop routing for a while.
+            connections[alias].close()
+            routing.replica_health.mark_down(exc)
+    return fetch(execute(cursor, name, params))
+
+
+def fetchone(cursor, name, params=()):
+    """Fetch one row; read statements follow core.db.routing to the replica when it applies."""
+    return _fetch(cursor, name, params, lambda routed: routed.fetchone())
+
+
+def fetchall(cursor, name, params=()):
+    return _fetch(cursor, name, params, lambda routed: routed.fetchall())
+
+
+# --- users -----------------------------------------------------------------
+
+USERS_SYNC_SEQUENCE = register(
+    "users.sync_sequence",
+    """
+    SELECT setval(
+        pg_get_serial_sequence('users', 'user_id'),
+        COALESCE((SELECT MAX(user_id) FROM users), 1),
+        true
+    )
+    """,
+    kind="write",
+)
+
+USERS_EXISTS = register(
+    "users.exists",
+    "SELECT 1 FROM users WHERE username = %s OR email = %s",
+)
+
+USERS_INSERT = register(
+    "users.insert",
+    """
+    INSERT INTO users (
+        full_name,
+        username,
+        email,
+        password_hash,
+        employment_type,
+        monthly_income,
+        address,
+        dob,
+        phone
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """,
+    kind="write",
+)
+
+USERS_TOKEN_USER_BY_USERNAME = register(
+    "users.token_user_by_username",
+    """
+    SELECT u.user_id, u.full_name
+    FROM users u
+    WHERE u.username = %s
+      AND NOT EXISTS (SELECT 1 FROM revoked_tokens r WHERE r.jti = %s)
+    """,
+)
+
+USERS_TOKEN_USER = register(
+    "users.token_user",
+    """
+    SELECT u.user_id, u.full_name
+    FROM users u
+    WHERE u.user_id = %s
+      AND NOT EXISTS (SELECT 1 FROM revoked_tokens r WHERE r.jti = %s)
+    """,
+)
+
+USERS_CREDENTIALS = register(
+    "users.credentials",
+    "SELECT user_id, full_name, password_hash FROM users WHERE username = %s",
+)
+
+USERS_UPDATE_PASSWORD_HASH = register(
+    "users.update_password_hash",
+    "UPDATE users SET password_hash = %s WHERE user_id = %s",
+    kind="write",
+)
+
+USERS_UPDATE_EMPLOYMENT = register(
+    "users.update_employment",
+    """
+    UPDATE users
+    SET employment_type = %s, monthly_income = %s
+    WHERE user_id = %s
+    """,
+    kind="write",
+)
+
+USERS_RESOLVE_APPLICANT = register(
+    "users.resolve_applicant",
+    """
+    SELECT user_id, full_name, username, dob, phone, address, monthly_income, employment_type
+    FROM users
+    WHERE user_id = %s::bigint
+       OR LOWER(username) = LOWER(%s::text)
+    LIMIT 1
+    """,
+)
+
+USERS_MONTHLY_INCOME = register(
+    "users.monthly_income",
+    """
+    SELECT COALESCE(monthly_income, 0)
+    FROM users
+    WHERE user_id = %s
+    """,
+)
+
+TOKENS_IS_REVOKED = register(
+    "tokens.is_revoked",
+    "SELECT EXISTS (SELECT 1 FROM revoked_tokens WHERE jti = %s)",
+)
+
+TOKENS_PRUNE_REVOKED = register(
+    "tokens.prune_revoked",
+    "DELETE FROM revoked_tokens WHERE expires_at < NOW()",
+    kind="write",
+)
+
+TOKENS_REVOKE = register(
+    "tokens.revoke",
+    """
+    INSERT INTO revoked_tokens (jti, expires_at)
+    VALUES (%s, to_timestamp(%s))
+    ON CONFLICT (jti) DO NOTHING
+    """,
+    kind="write",
+)
+
+# --- score history -----------------------------------------------------------
+
+SCORES_RECENT = register(
+    "scores.recent",
+    """
+    WITH target AS (SELECT %s::bigint AS user_id)
+    SELECT score, risk_level, factors, calculated_at
+    FROM (
+        (SELECT h.score, h.risk_level, h.factors, h.calculated_at
+         FROM score_history h, target t
+         WHERE h.user_id = t.user_id
+         ORDER BY h.calculated_at DESC
+         LIMIT 6)
+        UNION ALL
+        (SELECT m.last_score, m.last_risk_level, m.last_factors, m.last_calculated_at
+         FROM score_history_monthly m, target t
+         WHERE m.user_id = t.user_id
+         ORDER BY m.month DESC
+         LIMIT 6)
+    ) recent
+    ORDER BY calculated_at DESC
+    LIMIT 6
+    """,
+)
+
+SCORES_LATEST = register(
+    "scores.latest",
+    """
+    WITH target AS (SELECT %s::bigint AS user_id)
+    SELECT score, risk_level, factors, calculated_at
+    FROM (
+        (SELECT h.score, h.risk_level, h.factors, h.calculated_at
+         FROM score_history h, target t
+         WHERE h.user_id = t.user_id
+         ORDER BY h.calculated_at DESC
+         LIMIT 1)
+        UNION ALL
+        (SELECT m.last_score, m.last_risk_level, m.last_factors, m.last_calculated_at
+         FROM score_history_monthly m, target t
+         WHERE m.user_id = t.user_id
+         ORDER BY m.month DESC
+         LIMIT 1)
+    ) recent
+    ORDER BY calculated_at DESC
+    LIMIT 1
+    """,
+)
+
+SCORES_INSERT = register(
+    "scores.insert",
+    """
+    INSERT INTO score_history (user_id, score, risk_level, factors)
+    VALUES (%s, %s, %s, %s::jsonb)
+    """,
+    kind="write",
+)
+
+# --- credit accounts ---------------------------------------------------------
+
+ACCOUNTS_ACTIVE_TOTALS = register(
+    "accounts.active_totals",
+    """
+    SELECT
+        COALESCE(SUM(credit_limit), 0) AS total_limit,
+        COALESCE(SUM(current_balance), 0) AS total_balance
+    FROM credit_accounts
+    WHERE user_id = %s AND status = 'active'
+    """,
+)
+
+ACCOUNTS_SCORING_SUMMARY = register(
+    "accounts.scoring_summary",
+    """
+    SELECT
+        COALESCE(SUM(credit_limit), 0) AS total_limit,
+        COALESCE(SUM(current_balance), 0) AS total_balance,
+        COALESCE(AVG(current_balance), 0) AS avg_balance,
+        COUNT(*) AS total_accounts,
+        COUNT(*) FILTER (WHERE status = 'active') AS active_accounts
+    FROM credit_accounts
+    WHERE user_id = %s
+    """,
+)
+
+ACCOUNTS_QUOTE_FEATURES = register(
+    "accounts.quote_features",
+    """
+    SELECT
+        u.monthly_income,
+        u.employment_type,
+        a.total_limit,
+        a.total_balance,
+        a.monthly_obligations
+    FROM users u,
+    LATERAL (
+        SELECT
+            COALESCE(SUM(credit_limit) FILTER (WHERE status = 'active'), 0) AS total_limit,
+            COALESCE(SUM(current_balance) FILTER (WHERE status = 'active'), 0) AS total_balance,
+            -- Term loans repay their balance over the tenure; revolving balances at a minimum-payment rate.
+            -- Pending requests count too: approving one adds its installment.
+            COALESCE(SUM(
+                CASE
+                    WHEN tenure_months > 0 THEN current_balance / tenure_months
+                    ELSE current_balance * %s
+                END
+            ), 0) AS monthly_obligations
+        FROM credit_accounts
+        WHERE user_id = u.user_id AND status IN ('active', 'pending_approval')
+    ) a
+    WHERE u.user_id = %s
+    """,
+)
+
+ACCOUNTS_ACTIVE_LOANS = register(
+    "accounts.active_loans",
+    """
+    SELECT
+        ca.account_id,
+        ca.account_type,
+        ca.current_balance,
+        ca.status,
+        COALESCE(SUM(GREATEST(p.amount_due - p.amount_paid, 0)), 0) AS outstanding
+    FROM credit_accounts ca
+    LEFT JOIN payments p ON p.account_id = ca.account_id
+    WHERE ca.user_id = %s AND ca.status = 'active'
+    GROUP BY ca.account_id, ca.account_type, ca.current_balance, ca.status
+    ORDER BY ca.account_id DESC
+    """,
+)
+
+ACCOUNTS_ACTIVE_FOR_USER = register(
+    "accounts.active_for_user",
+    """
+    SELECT account_id, current_balance
+    FROM credit_accounts
+    WHERE account_id = %s AND user_id = %s AND status = 'active'
+    """,
+)
+
+ACCOUNTS_PENDING_FOR_USER = register(
+    "accounts.pending_for_user",
+    """
+    SELECT account_id, account_type, purpose, current_balance, opened_date
+    FROM credit_accounts
+    WHERE user_id = %s AND status = 'pending_approval'
+    ORDER BY account_id DESC
+    """,
+)
+
+ACCOUNTS_PENDING_BY_ID = register(
+    "accounts.pending_by_id",
+    """
+    SELECT account_id, current_balance, account_type
+    FROM credit_accounts
+    WHERE account_id = %s AND user_id = %s AND status = 'pending_approval'
+    """,
+)
+
+ACCOUNTS_SYNC_SEQUENCE = register(
+    "accounts.sync_sequence",
+    """
+    SELECT setval(
+        pg_get_serial_sequence('credit_accounts', 'account_id'),
+        COALESCE((SELECT MAX(account_id) FROM credit_accounts), 1),
+        true
+    )
+    """,
+    kind="write",
+)
+
+ACCOUNTS_INSERT_PENDING = register(
+    "accounts.insert_pending",
+    """
+    INSERT INTO credit_accounts (
+        user_id,
+        account_type,
+        purpose,
+        tenure_months,
+        credit_limit,
+        current_balance,
+        opened_date,
+        status
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, CURRENT_DATE, 'pending_approval')
+    RETURNING account_id
+    """,
+    kind="write",
+)
+
+ACCOUNTS_SET_STATUS = register(
+    "accounts.set_status",
+    """
+    UPDATE credit_accounts
+    SET status = %s
+    WHERE account_id = %s
+    """,
+    kind="write",
+)
+
+ACCOUNTS_UPDATE_BALANCE = register(
+    "accounts.update_balance",
+    """
+    UPDATE credit_accounts
+    SET current_balance = %s,
+        status = %s
+    WHERE account_id = %s
+    """,
+    kind="write",
+)
+
+# --- payments ----------------------------------------------------------------
+
+PAYMENTS_RECENT_FOR_USER = register(
+    "payments.recent_for_user",
+    """
+    SELECT
+        p.due_date,
+        ca.account_type,
+        p.amount_due,
+        p.status,
+        p.paid_date
+    FROM payments p
+    JOIN credit_accounts ca ON ca.account_id = p.account_id
+    WHERE ca.user_id = %s
+    ORDER BY p.due_date DESC
+    LIMIT 8
+    """,
+)
+
+PAYMENTS_HISTORY_FOR_USER = register(
+    "payments.history_for_user",
+    """
+    SELECT
+        p.payment_id,
+        p.due_date,
+        p.paid_date,
+        p.amount_due,
+        p.amount_paid,
+        p.status,
+        ca.account_type
+    FROM credit_accounts ca
+    CROSS JOIN LATERAL (
+        SELECT payment_id, due_date, paid_date, amount_due, amount_paid, status
+        FROM payments
+        WHERE account_id = ca.account_id
+        ORDER BY COALESCE(paid_date, due_date) DESC, payment_id DESC
+        LIMIT 30
+    ) p
+    WHERE ca.user_id = %s
+    ORDER BY COALESCE(p.paid_date, p.due_date) DESC, p.payment_id DESC
+    LIMIT 30
+    """,
+)
+
+PAYMENTS_FOR_SCORING = register(
+    "payments.for_scoring",
+    """
+    SELECT
+        p.due_date,
+        p.paid_date,
+        p.status,
+        p.amount_due,
+        p.amount_paid,
+        p.days_past_due,
+        ca.opened_date,
+        ca.account_type
+    FROM payments p
+    JOIN credit_accounts ca ON ca.account_id = p.account_id
+    WHERE ca.user_id = %s
+    """,
+)
+
+PAYMENTS_PENDING_FOR_USER = register(
+    "payments.pending_for_user",
+    """
+    SELECT p.payment_id, p.account_id, p.amount_due, p.due_date, ca.account_type
+    FROM payments p
+    JOIN credit_accounts ca ON ca.account_id = p.account_id
+    WHERE ca.user_id = %s AND p.status = 'pending_approval'
+    ORDER BY p.payment_id DESC
+    """,
+)
+
+PAYMENTS_PENDING_SETTLEMENT_BY_ID = register(
+    "payments.pending_settlement_by_id",
+    """
+    SELECT p.payment_id, p.account_id, p.amount_due, ca.current_balance
+    FROM payments p
+    JOIN credit_accounts ca ON ca.account_id = p.account_id
+    WHERE p.payment_id = %s
+      AND p.status = 'pending_approval'
+      AND ca.user_id = %s
+      AND ca.status = 'active'
+    """,
+)
+
+PAYMENTS_OLDEST_OPEN_INSTALLMENT = register(
+    "payments.oldest_open_installment",
+    """
+    SELECT payment_id, due_date, amount_due, amount_paid
+    FROM payments
+    WHERE account_id = %s
+      AND status IN ('due', 'late')
+      AND amount_paid < amount_due
+    ORDER BY due_date ASC, payment_id ASC
+    LIMIT 1
+    """,
+)
+
+PAYMENTS_INSERT_SETTLEMENT_REQUEST = register(
+    "payments.insert_settlement_request",
+    """
+    INSERT INTO payments (account_id, due_date, amount_due, amount_paid, status)
+    VALUES (%s, CURRENT_DATE, %s, 0, 'pending_approval')
+    """,
+    kind="write",
+)
+
+PAYMENTS_INSERT_DUE = register(
+    "payments.insert_due",
+    """
+    INSERT INTO payments (account_id, due_date, amount_due, amount_paid, status)
+    VALUES (%s, %s, %s, 0, 'due')
+    """,
+    kind="write",
+)
+
+PAYMENTS_APPLY_INSTALLMENT = register(
+    "payments.apply_installment",
+    """
+    UPDATE payments
+    SET paid_date = CURRENT_DATE,
+        amount_paid = %s,
+        status = %s,
+        days_past_due = %s,
+        dpd_bucket = %s
+    WHERE payment_id = %s
+      AND due_date = %s
+    """,
+    kind="write",
+)
+
+PAYMENTS_APPROVE_SETTLEMENT = register(
+    "payments.approve_settlement",
+    """
+    UPDATE payments
+    SET paid_date = CURRENT_DATE,
+        amount_paid = amount_due,
+        status = 'approved'
+    WHERE payment_id = %s
+    """,
+    kind="write",
+)
+
+PAYMENTS_REJECT = register(
+    "payments.reject",
+    "UPDATE payments SET status = 'rejected' WHERE payment_id = %s",
+    kind="write",
+)
+
+# --- idempotency keys --------------------------------------------------------
+
+IDEMPOTENCY_LOCK = register(
+    "idempotency.lock",
+    "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))",
+    kind="write",
+)
+
+IDEMPOTENCY_GET = register(
+    "idempotency.get",
+    """
+    SELECT request_hash, status_code, response
+    FROM idempotency_keys
+    WHERE user_id = %s AND scope = %s AND idem_key = %s AND expires_at > NOW()
+    """,
+)
+
+IDEMPOTENCY_STORE = register(
+    "idempotency.store",
+    """
+    INSERT INTO idempotency_keys (user_id, scope, idem_key, request_hash, status_code, response, expires_at)
+    VALUES (%s, %s, %s, %s, %s, %s::jsonb, NOW() + make_interval(secs => %s))
+    ON CONFLICT (user_id, scope, idem_key) DO UPDATE
+    SET request_hash = EXCLUDED.request_hash,
+        status_code = EXCLUDED.status_code,
+        response = EXCLUDED.response,
+        created_at = NOW(),
+        expires_at = EXCLUDED.expires_at
+    WHERE idempotency_keys.expires_at <= NOW()
+    """,
+    kind="write",
+)
+
+IDEMPOTENCY_PRUNE = register(
+    "idempotency.prune",
+    """
+    DELETE FROM idempotency_keys
+    WHERE ctid = ANY(ARRAY(
+        SELECT ctid FROM idempotency_keys WHERE expires_at <= NOW() LIMIT %s
+    ))
+    """,
+    kind="write",
+)
+
+# --- velocity counters -------------------------------------------------------
+
+# One row per (scope, subject, window): the hits in the current fixed window and the one
+# before it, enough for a sliding estimate. Each worker adds its hits since the last sync
+# (0 just to read back) and gets the cluster-wide row back; the CASEs roll windows forward.
+VELOCITY_SYNC = register(
+    "velocity.sync",
+    """
+    INSERT INTO velocity_counters AS v (scope, subject, window_seconds, window_start, current_hits, expires_at)
+    SELECT
+        d.scope,
+        d.subject,
+        d.window_seconds,
+        to_timestamp(d.window_start),
+        d.hits,
+        to_timestamp(d.window_start) + make_interval(secs => 2 * d.window_seconds)
+    FROM unnest(%s::text[], %s::text[], %s::int[], %s::float8[], %s::int[])
+        AS d(scope, subject, window_seconds, window_start, hits)
+    ON CONFLICT (scope, subject, window_seconds) DO UPDATE
+    SET previous_hits = CASE
+            WHEN v.window_start = EXCLUDED.window_start THEN v.previous_hits
+            WHEN v.window_start + make_interval(secs => v.window_seconds) = EXCLUDED.window_start THEN v.current_hits
+            -- A worker still on the previous window: its hits belong there.
+            WHEN v.window_start - make_interval(secs => v.window_seconds) = EXCLUDED.window_start
+                THEN v.previous_hits + EXCLUDED.current_hits
+            WHEN v.window_start > EXCLUDED.window_start THEN v.previous_hits
+            ELSE 0
+        END,
+        current_hits = CASE
+            WHEN v.window_start = EXCLUDED.window_start THEN v.current_hits + EXCLUDED.current_hits
+            WHEN v.window_start > EXCLUDED.window_start THEN v.current_hits
+            ELSE EXCLUDED.current_hits
+        END,
+        window_start = GREATEST(v.window_start, EXCLUDED.window_start),
+        expires_at = GREATEST(v.expires_at, EXCLUDED.expires_at)
+    RETURNING scope, subject, window_seconds, EXTRACT(EPOCH FROM window_start)::float8, current_hits, previous_hits
+    """,
+    kind="write",
+)
+
+VELOCITY_PRUNE = register(
+    "velocity.prune",
+    """
+    DELETE FROM velocity_counters
+    WHERE ctid = ANY(ARRAY(
+        SELECT ctid FROM velocity_counters WHERE expires_at <= NOW() LIMIT %s
+    ))
+    """,
+    kind="write",
+)
+
+# --- read-your-writes pins ----------------------------------------------------
+
+# Run on the primary by core.db.routing; the clock is the primary's, so workers' clocks do not matter.
+PINS_ACTIVE = register(
+    "pins.active",
+    "SELECT 1 FROM primary_pins WHERE subject = %s AND pinned_until > NOW()",
+)
+
+PINS_SET = register(
+    "pins.set",
+    """
+    INSERT INTO primary_pins (subject, pinned_until)
+    VALUES (%s, NOW() + make_interval(secs => %s))
+    ON CONFLICT (subject) DO UPDATE SET pinned_until = EXCLUDED.pinned_until
+    RETURNING pinned_until
+    """,
+    kind="write",
+)
+
+# --- notifications -----------------------------------------------------------
+
+NOTIFY_USER_EVENT = register(
+    "notify.user_event",
+    "SELECT pg_notify(%s, %s)",
+    kind="write",
+)
+
+# --- portfolio analytics -----------------------------------------------------
+
+PORTFOLIO_SUMMARY = register(
+    "portfolio.summary",
+    "SELECT summary, refreshed_at FROM portfolio_summary WHERE summary_id = 1",
+)
+
+PORTFOLIO_TREND = register(
+    "portfolio.trend",
+    """
+    SELECT month, users, snapshots, avg_score, low_users, medium_users, high_users
+    FROM portfolio_monthly_trend
+    ORDER BY month DESC
+    LIMIT %s
+    """,
+)
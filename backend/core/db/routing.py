@@ -0,0 +1,220 @@
+"""Replica routing for registry reads.
+
+When ``DATABASE_REPLICA_URL`` is set there is a ``replica`` alias. GET/HEAD
+requests send their ``read`` statements (``core.db.queries``) to it unless:
+
+* the replica is down or lagging beyond ``REPLICA_MAX_LAG_SECONDS`` (a
+  background monitor checks every ``REPLICA_CHECK_SECONDS``; a connection error
+  on the request path also marks it down for ``REPLICA_RETRY_SECONDS``), or
+* the caller wrote recently. A request that ran any ``write`` statement pins
+  its user to the primary for ``READ_YOUR_WRITES_SECONDS``. The pin is a row in
+  ``primary_pins`` on the primary, so every worker sees it; authenticated reads
+  look it up there (one primary-key read) before going to the replica. A write
+  inside a GET also sends the rest of that request to the primary.
+
+Outside a request (management commands, jobs) every read goes to ``default``.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = "replica"
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+class _Route:
+    __slots__ = ("read_alias", "request", "wrote")
+
+    def __init__(self, read_alias, request):
+        self.read_alias = read_alias
+        self.request = request
+        self.wrote = False
+
+
+_route = ContextVar("db_route", default=None)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class _ReplicaHealth:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self.lag_seconds = None
+        self.last_error = None
+        self._monitor = None
+
+    def mark_down(self, error=None):
+        with self._lock:
+            self._down_until = time.monotonic() + getattr(settings, "REPLICA_RETRY_SECONDS", 30)
+            self.last_error = repr(error) if error else "marked down"
+
+    def healthy(self):
+        self._ensure_monitor()
+        if time.monotonic() < self._down_until:
+            return False
+        max_lag = getattr(settings, "REPLICA_MAX_LAG_SECONDS", 10)
+        return self.lag_seconds is None or self.lag_seconds <= max_lag
+
+    def check(self):
+        """Measure replay lag; a standalone server (no replication) reports no lag."""
+        connection = connections[REPLICA_ALIAS]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT CASE WHEN pg_is_in_recovery() "
+                    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                )
+                lag = cursor.fetchone()[0]
+        except Exception as exc:
+            connection.close()
+            self.mark_down(exc)
+            return False
+        with self._lock:
+            self.lag_seconds = float(lag) if lag is not None else None
+            self._down_until = 0.0
+            self.last_error = None
+        return True
+
+    def _run_monitor(self):
+        interval = getattr(settings, "REPLICA_CHECK_SECONDS", 5)
+        while True:
+            self.check()
+            time.sleep(interval)
+
+    def _ensure_monitor(self):
+        if self._monitor is not None:
+            return
+        with self._lock:
+            if self._monitor is None:
+                self._monitor = threading.Thread(target=self._run_monitor, name="replica-health", daemon=True)
+                self._monitor.start()
+
+    def stats(self):
+        return {
+            "healthy": self.healthy(),
+            "lag_seconds": self.lag_seconds,
+            "down_for_seconds": max(0.0, self._down_until - time.monotonic()),
+            "last_error": self.last_error,
+        }
+
+
+replica_health = _ReplicaHealth()
+
+
+def _pin_subject(request):
+    from authentication.services import decode_token, extract_bearer_token
+
+    token = extract_bearer_token(request)
+    claims = decode_token(token) if token else None
+    if not claims:
+        return None
+    if claims.get("user_id") is not None:
+        return f"user:{claims['user_id']}"
+    # Tokens issued before user_id was embedded carry only the username.
+    return f"username:{claims['sub']}" if claims.get("sub") else None
+
+
+def _wants_replica(request):
+    return request.method in READ_METHODS and replica_configured() and replica_health.healthy()
+
+
+# The pin statements run before the request's route is set and after it is reset, so they
+# go to the primary and do not count as writes of the request itself.
+
+
+def choose_read_alias(request):
+    if not _wants_replica(request):
+        return DEFAULT_DB_ALIAS
+    subject = _pin_subject(request)
+    if subject is not None:
+        from core.db import queries
+
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            if queries.fetchone(cursor, queries.PINS_ACTIVE, [subject]):
+                return DEFAULT_DB_ALIAS
+    return REPLICA_ALIAS
+
+
+async def achoose_read_alias(request):
+    if not _wants_replica(request):
+        return DEFAULT_DB_ALIAS
+    subject = _pin_subject(request)
+    if subject is not None:
+        from core.db import aio, queries
+
+        if await aio.fetchone(queries.PINS_ACTIVE, [subject]):
+            return DEFAULT_DB_ALIAS
+    return REPLICA_ALIAS
+
+
+def _pin_params(route):
+    """[subject, seconds] when the request wrote and its user should read from the primary for a while."""
+    if not route.wrote or not replica_configured():
+        return None
+    subject = _pin_subject(route.request)
+    if subject is None:
+        return None
+    return [subject, getattr(settings, "READ_YOUR_WRITES_SECONDS", 5)]
+
+
+def read_alias():
+    route = _route.get()
+    return route.read_alias if route is not None else DEFAULT_DB_ALIAS
+
+
+def note_write():
+    """Called for every write statement; keeps the writer on the primary for the read-your-writes window."""
+    route = _route.get()
+    if route is None or route.wrote:
+        return
+    route.wrote = True
+    route.read_alias = DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        route = _Route(choose_read_alias(request), request)
+        token = _route.set(route)
+        try:
+            response = self.get_response(request)
+        finally:
+            _route.reset(token)
+        params = _pin_params(route)
+        if params is not None:
+            from core.db import queries
+
+            with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                queries.execute(cursor, queries.PINS_SET, params)
+        return response
+
+    async def __acall__(self, request):
+        route = _Route(await achoose_read_alias(request), request)
+        token = _route.set(route)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _route.reset(token)
+        params = _pin_params(route)
+        if params is not None:
+            from core.db import aio, queries
+
+            await aio.fetchone(queries.PINS_SET, params)
+        return response
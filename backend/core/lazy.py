@@ -0,0 +1,19 @@
+"""Views that import their module on first use, for routes most processes never serve."""
+
+from asgiref.sync import markcoroutinefunction
+from django.utils.module_loading import import_string
+
+
+def lazy_async_view(dotted_path):
+    """Route to an async view without importing it (and e.g. psycopg 3) at URLconf load."""
+    view = None
+
+    async def proxy(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path)
+        return await view(request, *args, **kwargs)
+
+    proxy.__name__ = proxy.__qualname__ = dotted_path.rpartition(".")[2]
+    proxy.__module__ = dotted_path.rpartition(".")[0]
+    return markcoroutinefunction(proxy)
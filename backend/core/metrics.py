@@ -0,0 +1,237 @@
+"""Per-request SQL accounting and per-endpoint latency aggregation.
+
+A ``RequestTrace`` lives in a context variable for the duration of a request.
+Django cursors report into it through an execute wrapper installed on every
+connection, and ``core.db.aio`` reports its statements directly, so sync and
+async views are counted the same way. ``RequestMetricsMiddleware`` turns the
+trace into response headers and feeds the endpoint summaries exposed by
+``metrics_view``.
+"""
+
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from core.timing import percentile
+
+# Statements kept per request for the slow-request log; counts and totals are not capped.
+MAX_TRACED_STATEMENTS = 200
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current_trace = ContextVar("request_trace", default=None)
+
+
+class RequestTrace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.statements = []
+        self.serialize_started = None
+        self.serialize_seconds = 0.0
+
+    def add_query(self, sql, seconds):
+        self.query_count += 1
+        self.db_seconds += seconds
+        if len(self.statements) < MAX_TRACED_STATEMENTS:
+            self.statements.append((seconds, sql))
+
+    def start_serialization(self):
+        self.serialize_started = time.perf_counter()
+
+    def finish_serialization(self):
+        if self.serialize_started is not None:
+            self.serialize_seconds += time.perf_counter() - self.serialize_started
+            self.serialize_started = None
+
+
+def begin_trace():
+    trace = RequestTrace()
+    return trace, _current_trace.set(trace)
+
+
+def end_trace(token):
+    _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def record_query(sql, seconds):
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_query(sql, seconds)
+
+
+def instrument_query(execute, sql, params, many, context):
+    """Django execute wrapper; a no-op outside of a traced request."""
+    trace = _current_trace.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        trace.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_instrumentation(sender=None, connection=None, **kwargs):
+    """connection_created receiver; wrappers stay on the per-thread DatabaseWrapper across reconnects."""
+    if connection is not None and instrument_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(instrument_query)
+
+
+class _EndpointStats:
+    __slots__ = ("durations", "count", "seconds_total", "errors", "queries_total", "db_seconds_total")
+
+    def __init__(self, window):
+        self.durations = deque(maxlen=window)
+        self.count = 0
+        self.seconds_total = 0.0
+        self.errors = 0
+        self.queries_total = 0
+        self.db_seconds_total = 0.0
+
+
+_endpoints = {}
+_endpoints_lock = threading.Lock()
+
+
+def observe_request(method, endpoint, status_code, seconds, trace):
+    window = getattr(settings, "REQUEST_METRICS_WINDOW", 2048)
+    with _endpoints_lock:
+        stats = _endpoints.get((method, endpoint))
+        if stats is None:
+            stats = _endpoints[(method, endpoint)] = _EndpointStats(window)
+        stats.durations.append(seconds)
+        stats.count += 1
+        stats.seconds_total += seconds
+        stats.queries_total += trace.query_count
+        stats.db_seconds_total += trace.db_seconds
+        if status_code >= 500:
+            stats.errors += 1
+
+
+def endpoint_stats():
+    """Snapshot of per-endpoint summaries; quantiles cover the most recent REQUEST_METRICS_WINDOW requests."""
+    with _endpoints_lock:
+        items = [
+            (method, endpoint, sorted(stats.durations), stats.count, stats.seconds_total, stats.errors,
+             stats.queries_total, stats.db_seconds_total)
+            for (method, endpoint), stats in _endpoints.items()
+        ]
+    return [
+        {
+            "method": method,
+            "endpoint": endpoint,
+            "quantiles": {fraction: percentile(durations, fraction) for fraction in QUANTILES},
+            "count": count,
+            "seconds_total": seconds_total,
+            "errors": errors,
+            "queries_total": queries_total,
+            "db_seconds_total": db_seconds_total,
+        }
+        for method, endpoint, durations, count, seconds_total, errors, queries_total, db_seconds_total in items
+    ]
+
+
+def reset_endpoint_stats():
+    with _endpoints_lock:
+        _endpoints.clear()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def _metric(lines, name, metric_type, help_text, samples):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {metric_type}")
+    for suffix, labels, value in samples:
+        lines.append(f"{name}{suffix}{_labels(**labels)} {value:.6g}")
+
+
+def render_prometheus():
+    from authentication.hashing import hashing_stats
+    from core.db import queries, routing
+
+    lines = []
+    endpoints = endpoint_stats()
+
+    latency = []
+    for item in endpoints:
+        labels = {"method": item["method"], "endpoint": item["endpoint"]}
+        for fraction, value in item["quantiles"].items():
+            latency.append(("", {**labels, "quantile": fraction}, value))
+        latency.append(("_sum", labels, item["seconds_total"]))
+        latency.append(("_count", labels, item["count"]))
+    _metric(lines, "http_request_duration_seconds", "summary", "Request latency per endpoint.", latency)
+
+    for name, key, help_text in (
+        ("http_request_errors_total", "errors", "Responses with a 5xx status."),
+        ("http_request_db_queries_total", "queries_total", "SQL statements executed while serving requests."),
+        ("http_request_db_seconds_total", "db_seconds_total", "Time spent in SQL while serving requests."),
+    ):
+        _metric(
+            lines,
+            name,
+            "counter",
+            help_text,
+            [("", {"method": item["method"], "endpoint": item["endpoint"]}, item[key]) for item in endpoints],
+        )
+
+    statements = []
+    for item in queries.query_stats():
+        labels = {"statement": item["name"]}
+        for fraction, key in zip(QUANTILES, ("p50_ms", "p95_ms", "p99_ms")):
+            statements.append(("", {**labels, "quantile": fraction}, item[key] / 1000))
+        statements.append(("_sum", labels, item["total_ms"] / 1000))
+        statements.append(("_count", labels, item["calls"]))
+    _metric(lines, "db_statement_duration_seconds", "summary", "Latency per registered SQL statement.", statements)
+
+    hashing = hashing_stats()
+    _metric(lines, "password_hashing_in_flight", "gauge", "Hashes currently running.", [("", {}, hashing["in_flight"])])
+    _metric(lines, "password_hashing_queue_depth", "gauge", "Hashes waiting for a worker.", [("", {}, hashing["queue_depth"])])
+    _metric(
+        lines,
+        "password_hashing_rejected_total",
+        "counter",
+        "Hashes refused because the backlog was full.",
+        [("", {}, hashing["rejected"])],
+    )
+
+    if any(db.get("ENGINE") == "core.db.backends.postgresql_pool" for db in settings.DATABASES.values()):
+        from core.db.backends.postgresql_pool.base import pool_stats
+
+        pools = pool_stats()
+        for name, key, metric_type, help_text in (
+            ("db_pool_in_use", "in_use", "gauge", "Connections checked out."),
+            ("db_pool_idle", "idle", "gauge", "Idle pooled connections."),
+            ("db_pool_waits_total", "waits", "counter", "Checkouts that had to wait."),
+            ("db_pool_timeouts_total", "timeouts", "counter", "Checkouts that timed out."),
+        ):
+            _metric(lines, name, metric_type, help_text, [("", {"alias": alias}, stats[key]) for alias, stats in pools.items()])
+
+    if routing.replica_configured():
+        health = routing.replica_health.stats()
+        _metric(lines, "db_replica_healthy", "gauge", "1 while GET reads may use the replica.", [("", {}, int(health["healthy"]))])
+        if health["lag_seconds"] is not None:
+            _metric(lines, "db_replica_lag_seconds", "gauge", "Replica replay lag.", [("", {}, health["lag_seconds"])])
+
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint, answered only for METRICS_ALLOWED_IPS."""
+    if request.META.get("REMOTE_ADDR") not in getattr(settings, "METRICS_ALLOWED_IPS", ["127.0.0.1", "::1"]):
+        raise Http404()
+    return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,103 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.middleware.gzip import GZipMiddleware
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_STATEMENTS = 5
+
+
+class RequestMetricsMiddleware:
+    """Count SQL per request, emit Server-Timing/X-Query-Count and feed the endpoint metrics.
+
+    Keep it first in MIDDLEWARE so the python phase covers the rest of the stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_seconds = getattr(settings, "REQUEST_SLOW_MS", 500) / 1000
+        connection_created.connect(metrics.install_query_instrumentation, dispatch_uid="core.metrics.instrument_query")
+        for connection in connections.all(initialized_only=True):
+            metrics.install_query_instrumentation(connection=connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trace, token = metrics.begin_trace()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_trace(token)
+        return self._finish(request, response, trace)
+
+    async def __acall__(self, request):
+        trace, token = metrics.begin_trace()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_trace(token)
+        return self._finish(request, response, trace)
+
+    def process_template_response(self, request, response):
+        # DRF responses render after every process_template_response hook, so this brackets serialization.
+        trace = metrics.current_trace()
+        if trace is not None:
+            trace.start_serialization()
+            response.add_post_render_callback(lambda rendered: trace.finish_serialization())
+        return response
+
+    def _finish(self, request, response, trace):
+        total = time.perf_counter() - trace.started
+        python = max(0.0, total - trace.db_seconds - trace.serialize_seconds)
+        timing = (
+            f'db;dur={trace.db_seconds * 1000:.2f};desc="{trace.query_count} queries", '
+            f"serialization;dur={trace.serialize_seconds * 1000:.2f}, "
+            f"python;dur={python * 1000:.2f}, "
+            f"total;dur={total * 1000:.2f}"
+        )
+        if response.has_header("Server-Timing"):
+            timing = f'{response["Server-Timing"]}, {timing}'
+        response["Server-Timing"] = timing
+        response["X-Query-Count"] = str(trace.query_count)
+
+        match = getattr(request, "resolver_match", None)
+        endpoint = match.route if match else "unmatched"
+        metrics.observe_request(request.method, endpoint, response.status_code, total, trace)
+
+        if total >= self.slow_seconds:
+            slowest = sorted(trace.statements, key=lambda item: item[0], reverse=True)[:SLOW_REQUEST_STATEMENTS]
+            logger.warning(
+                "Slow request %s %s -> %s: %.1fms total, %.1fms in %d queries%s",
+                request.method,
+                request.path,
+                response.status_code,
+                total * 1000,
+                trace.db_seconds * 1000,
+                trace.query_count,
+                "".join(f"\n  {seconds * 1000:.2f}ms {' '.join(sql.split())[:500]}" for seconds, sql in slowest),
+            )
+        return response
+
+
+class LargeResponseGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves responses under GZIP_MIN_BYTES alone; small bodies only pay the CPU."""
+
+    def process_response(self, request, response):
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            # Compressing would buffer events until the compressor flushes.
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, "GZIP_MIN_BYTES", 1024):
+            return response
+        return super().process_response(request, response)
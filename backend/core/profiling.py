@@ -0,0 +1,283 @@
+"""On-demand and sampled request profiling.
+
+An admin (``is_admin`` claim) can profile a single request by sending
+``X-Profile: 1`` or ``?profile=1`` (statistical sampler) or ``cprofile``
+instead of ``1``. The result is written to ``PROFILE_DIR`` and named in the
+``X-Profile-File`` response header, or returned as the response body with
+``X-Profile-Output: inline`` / ``?profile_output=inline``.
+
+With ``PROFILE_SAMPLE_EVERY = N`` every Nth request per endpoint is sampled and
+its stacks are merged into an in-memory aggregate served by
+``profile_aggregate_view``. Sampler output is collapsed-stack text that
+flamegraph.pl and speedscope read directly.
+
+The sampler follows the thread that entered the middleware. Under ASGI that is
+the event loop thread, so async profiles also contain any coroutines that ran
+on the loop during the request.
+"""
+
+import io
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.urls import Resolver404, resolve
+from django.views.decorators.csrf import csrf_exempt
+
+from authentication.services import has_admin_claim
+
+TRUNCATED_STACK = "[truncated]"
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    base_dir = str(settings.BASE_DIR)
+    if filename.startswith(base_dir):
+        filename = os.path.relpath(filename, base_dir)
+    else:
+        filename = "/".join(filename.replace("\\", "/").split("/")[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+def collapse_stack(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def render_collapsed(stacks):
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class StackSampler:
+    """Samples one thread's Python stack every ``interval`` seconds from a helper thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[collapse_stack(frame)] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+class _Aggregate:
+    __slots__ = ("requests", "samples", "stacks")
+
+    def __init__(self):
+        self.requests = 0
+        self.samples = 0
+        self.stacks = Counter()
+
+
+class SampledProfiles:
+    """Per-endpoint 1-in-N selection and merged stacks, bounded to ``max_stacks`` distinct stacks each."""
+
+    def __init__(self, every, max_stacks):
+        self.every = every
+        self.max_stacks = max_stacks
+        self._lock = threading.Lock()
+        self._seen = Counter()
+        self._aggregates = {}
+
+    def should_sample(self, endpoint):
+        if self.every <= 0:
+            return False
+        with self._lock:
+            self._seen[endpoint] += 1
+            return self._seen[endpoint] % self.every == 0
+
+    def add(self, endpoint, stacks, samples):
+        with self._lock:
+            aggregate = self._aggregates.get(endpoint)
+            if aggregate is None:
+                aggregate = self._aggregates[endpoint] = _Aggregate()
+            aggregate.requests += 1
+            aggregate.samples += samples
+            for stack, count in stacks.items():
+                if stack in aggregate.stacks or len(aggregate.stacks) < self.max_stacks:
+                    aggregate.stacks[stack] += count
+                else:
+                    aggregate.stacks[TRUNCATED_STACK] += count
+
+    def summary(self):
+        with self._lock:
+            return {
+                endpoint: {"requests": aggregate.requests, "samples": aggregate.samples, "stacks": len(aggregate.stacks)}
+                for endpoint, aggregate in self._aggregates.items()
+            }
+
+    def collapsed(self, endpoint):
+        with self._lock:
+            aggregate = self._aggregates.get(endpoint)
+            return render_collapsed(aggregate.stacks) if aggregate else None
+
+    def reset(self):
+        with self._lock:
+            self._seen.clear()
+            self._aggregates.clear()
+
+
+sampled_profiles = SampledProfiles(
+    every=getattr(settings, "PROFILE_SAMPLE_EVERY", 0),
+    max_stacks=getattr(settings, "PROFILE_MAX_STACKS", 5000),
+)
+
+
+def _requested_mode(request):
+    value = (request.headers.get("X-Profile") or request.GET.get("profile") or "").strip().lower()
+    if value in {"1", "true", "sample"}:
+        return "sample"
+    if value == "cprofile":
+        return "cprofile"
+    return None
+
+
+def _wants_inline(request):
+    return (request.headers.get("X-Profile-Output") or request.GET.get("profile_output") or "").lower() == "inline"
+
+
+def _route(request):
+    # URL resolution runs after middleware, so resolve here to key on the route pattern, not the raw path.
+    try:
+        return resolve(request.path_info).route
+    except Resolver404:
+        return "unmatched"
+
+
+class _RequestProfile:
+    def __init__(self, mode, thread_id, endpoint=None):
+        self.mode = mode
+        self.endpoint = endpoint
+        self.sampler = None
+        self.profiler = None
+        if mode == "cprofile":
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            interval = getattr(settings, "PROFILE_SAMPLE_INTERVAL_MS", 5) / 1000
+            self.sampler = StackSampler(thread_id, interval).start()
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+        else:
+            self.sampler.stop()
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _start(self, request):
+        mode = _requested_mode(request)
+        if mode and has_admin_claim(request):
+            return _RequestProfile(mode, threading.get_ident()), True
+        if sampled_profiles.every > 0:
+            endpoint = _route(request)
+            if sampled_profiles.should_sample(endpoint):
+                return _RequestProfile("sample", threading.get_ident(), endpoint), False
+        return None, False
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile, on_demand = self._start(request)
+        if profile is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.stop()
+        return self._finish(request, response, profile, on_demand)
+
+    async def __acall__(self, request):
+        profile, on_demand = self._start(request)
+        if profile is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            profile.stop()
+        return self._finish(request, response, profile, on_demand)
+
+    def _finish(self, request, response, profile, on_demand):
+        if not on_demand:
+            sampled_profiles.add(profile.endpoint, profile.sampler.stacks, profile.sampler.samples)
+            return response
+
+        if profile.profiler is not None:
+            import pstats
+
+            stream = io.StringIO()
+            pstats.Stats(profile.profiler, stream=stream).sort_stats("cumulative").print_stats(60)
+            body, extension = stream.getvalue(), "pstats.txt"
+        else:
+            body, extension = render_collapsed(profile.sampler.stacks), "collapsed"
+
+        if _wants_inline(request):
+            inline = HttpResponse(body, content_type="text/plain; charset=utf-8")
+            inline["X-Profiled-Status"] = str(response.status_code)
+            return inline
+
+        profile_dir = getattr(settings, "PROFILE_DIR", "profiles")
+        os.makedirs(profile_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-") or "root"
+        filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method}-{slug}-{uuid.uuid4().hex[:6]}.{extension}"
+        with open(os.path.join(profile_dir, filename), "w", encoding="utf-8") as handle:
+            handle.write(body)
+        response["X-Profile-File"] = filename
+        return response
+
+
+@csrf_exempt
+def profile_aggregate_view(request):
+    """Admin-only view of the 1-in-N aggregates: JSON summary, ``?endpoint=`` for collapsed stacks, DELETE to reset."""
+    if not has_admin_claim(request):
+        return JsonResponse({"detail": "Admin authorization required."}, status=403)
+
+    if request.method == "DELETE":
+        sampled_profiles.reset()
+        return JsonResponse({"message": "Profile aggregates cleared."})
+
+    endpoint = request.GET.get("endpoint")
+    if endpoint:
+        collapsed = sampled_profiles.collapsed(endpoint)
+        if collapsed is None:
+            return JsonResponse({"detail": "No samples for this endpoint."}, status=404)
+        return HttpResponse(collapsed, content_type="text/plain; charset=utf-8")
+
+    return JsonResponse({"sampleEvery": sampled_profiles.every, "endpoints": sampled_profiles.summary()})
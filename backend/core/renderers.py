@@ -0,0 +1,43 @@
+"""JSON rendering for API responses.
+
+Uses orjson (pinned in requirements.txt) and falls back to the stdlib encoder
+when it is missing. Both paths emit what DRF's ``JSONRenderer`` emits for our
+payloads: compact, UTF-8, with dates, datetimes and Decimals encoded by DRF's
+encoder. NaN and infinities are not valid JSON: the fallback rejects them like
+DRF's strict mode, while orjson writes them as null.
+"""
+
+import json
+
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # keep serving if the wheel is unavailable
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def dumps(data):
+    if orjson is not None:
+        # Datetimes go through DRF's encoder so their format matches the stdlib path.
+        return orjson.dumps(data, default=_encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def json_response(data, status=200):
+    """JsonResponse equivalent for plain Django (async) views."""
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # Indented output (?indent= / Accept: ...; indent=) is for humans; keep DRF's path for it.
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -0,0 +1,268 @@
+"""Production entry point: ``python -m core.server``.
+
+Runs gunicorn with the application preloaded in the master, so imports and
+lookup tables (the PD table, the URLconf) are built once and shared with the
+workers copy-on-write. Database connections are never opened in the master;
+each worker connects, PREPAREs the registered reads and sends itself a few
+GETs (``SERVER_WARMUP_PATHS``, plus ``SERVER_WARMUP_AUTH_PATHS`` as
+``SERVER_WARMUP_USER`` when one is configured) before it accepts traffic.
+
+``--sweep`` starts the server once per worker class / worker count / thread
+count candidate, drives it with the load harness (``benchmarks.loadtest``) and
+recommends the configuration with the best throughput inside the latency
+budget.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ASGI_WORKER = "uvicorn.workers.UvicornWorker"
+
+
+def _django_setup(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+def _post_worker_init(worker):
+    from django.conf import settings
+    from django.db import connections
+
+    from core.warmup import synthetic_requests, warm_up, warmup_token
+
+    asgi = worker.cfg.worker_class_str == ASGI_WORKER
+    # Only the sync worker serves from the thread that warms; pooled connections go back to the pool.
+    keep_connections = worker.cfg.worker_class_str == "sync"
+    warm_up(connect=True, keep_connections=keep_connections)
+    if asgi or settings.SERVER_WARMUP_REPEAT <= 0:
+        return
+    host = next((item for item in settings.ALLOWED_HOSTS if item and item != "*"), "localhost")
+    if settings.SERVER_WARMUP_PATHS:
+        synthetic_requests(worker.wsgi, settings.SERVER_WARMUP_PATHS, host, settings.SERVER_WARMUP_REPEAT)
+    token = warmup_token(settings.SERVER_WARMUP_USER) if settings.SERVER_WARMUP_USER else None
+    if token and settings.SERVER_WARMUP_AUTH_PATHS:
+        synthetic_requests(
+            worker.wsgi, settings.SERVER_WARMUP_AUTH_PATHS, host, settings.SERVER_WARMUP_REPEAT, token=token
+        )
+    if not keep_connections:
+        # The token lookup and the requests reconnected on this thread, which never serves one.
+        connections.close_all()
+
+
+def serve(options):
+    from gunicorn.app.base import BaseApplication
+
+    class APIServer(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            # Preloaded in the master: build tables and import views, but leave the database alone.
+            if options["worker_class"] == ASGI_WORKER:
+                from core.asgi import application
+            else:
+                from core.wsgi import application
+            from django.db import connections
+
+            connections.close_all()
+            return application
+
+    APIServer().run()
+
+
+def server_options(args):
+    from django.conf import settings
+
+    cores = os.cpu_count() or 1
+    worker_class = args.worker_class or settings.SERVER_WORKER_CLASS
+    return {
+        "bind": args.bind or f"0.0.0.0:{os.environ.get('PORT', '8000')}",
+        "workers": args.workers or settings.SERVER_WORKERS or 2 * cores + 1,
+        "worker_class": worker_class,
+        "threads": (args.threads or settings.SERVER_THREADS) if worker_class == "gthread" else 1,
+        "timeout": settings.SERVER_TIMEOUT,
+        "keepalive": 5,
+        "preload_app": not args.no_preload,
+        "post_worker_init": _post_worker_init,
+        "accesslog": args.access_log,
+        "errorlog": "-",
+    }
+
+
+def _candidates(cores, worker_classes, thread_counts):
+    worker_counts = sorted({cores, 2 * cores + 1})
+    for worker_class in worker_classes:
+        for workers in worker_counts:
+            threads = thread_counts if worker_class == "gthread" else (1,)
+            for count in threads:
+                yield worker_class, workers, count
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def _wait_ready(base_url, timeout):
+    from benchmarks.loadtest import HttpClient
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        client = HttpClient(base_url, 2.0)
+        try:
+            response = await client.request("GET", "/api/metrics/")
+            if response.status < 500:
+                return True
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            await client.close()
+        await asyncio.sleep(0.25)
+    return False
+
+
+def _summarise(test, elapsed):
+    from core.timing import percentile
+
+    latencies = sorted(latency for stats in test.stats.values() for latency in stats.latencies)
+    errors = sum(stats.errors for stats in test.stats.values())
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "error_rate": errors / len(latencies) if latencies else 1.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def sweep(args):
+    from django.conf import settings
+    from django.db import connection
+
+    from benchmarks.loadtest import DEFAULT_MIX, LoadTest, VirtualUser, parse_mix
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT username, user_id FROM users WHERE username LIKE %s ORDER BY user_id LIMIT %s",
+            [args.prefix.replace("_", "\\_") + "%", args.users],
+        )
+        rows = cursor.fetchall()
+    connection.close()
+    if not rows:
+        sys.exit(f"No users named {args.prefix}*; run generate_dataset first.")
+
+    mix = parse_mix(args.mix or DEFAULT_MIX)
+    admin = (settings.ADMIN_USERNAME, settings.ADMIN_PASSWORD) if settings.ADMIN_USERNAME else None
+    if admin is None:
+        mix.pop("approve", None)
+    test = LoadTest("http://127.0.0.1", [VirtualUser(username, user_id) for username, user_id in rows], args.password, mix, admin=admin)
+
+    cores = os.cpu_count() or 1
+    worker_classes = [name.strip() for name in args.worker_classes.split(",") if name.strip()]
+    thread_counts = [int(value) for value in args.thread_counts.split(",") if value.strip()]
+    results = []
+    for worker_class, workers, threads in _candidates(cores, worker_classes, thread_counts):
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        command = [
+            sys.executable, "-m", "core.server",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--worker-class", worker_class,
+            "--threads", str(threads),
+            "--access-log", "",
+        ]
+        label = f"{worker_class} workers={workers} threads={threads}"
+        process = subprocess.Popen(command, cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not asyncio.run(_wait_ready(base_url, args.ready_timeout)):
+                print(f"{label}: not ready after {args.ready_timeout}s, skipped")
+                continue
+            test.base_url = base_url
+            test.async_reads = worker_class == ASGI_WORKER
+            if not any(user.token for user in test.users):
+                # JWTs are stateless: log in once and reuse the tokens for every candidate.
+                if not asyncio.run(test.login_all(args.concurrency)):
+                    sys.exit("No synthetic user could log in; check --password.")
+            if args.warmup > 0:
+                asyncio.run(test.run(args.concurrency, duration=args.warmup))
+            elapsed, _ = asyncio.run(test.run(args.concurrency, duration=args.duration))
+            result = {"worker_class": worker_class, "workers": workers, "threads": threads, **_summarise(test, elapsed)}
+            results.append(result)
+            print(
+                f"{label:<48} {result['rps']:>9.1f} rps  p95 {result['p95_ms']:>8.1f}ms  "
+                f"p99 {result['p99_ms']:>8.1f}ms  errors {result['error_rate'] * 100:.2f}%"
+            )
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    eligible = [item for item in results if item["error_rate"] <= args.max_error_rate and item["p95_ms"] <= args.p95_budget_ms]
+    best = max(eligible or results, key=lambda item: item["rps"], default=None)
+    if best is None:
+        sys.exit("No candidate finished a run.")
+    note = "" if eligible else " (no candidate met the latency/error budget; showing the fastest)"
+    print(
+        f"\nRecommended for {cores} cores{note}:\n"
+        f"  SERVER_WORKER_CLASS={best['worker_class']} SERVER_WORKERS={best['workers']} SERVER_THREADS={best['threads']}"
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps({"cores": cores, "results": results, "recommended": best}, indent=2) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.server", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--settings", default="core.settings_api", help="Settings module unless DJANGO_SETTINGS_MODULE is set.")
+    parser.add_argument("--bind")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--worker-class", help=f"sync, gthread or {ASGI_WORKER}.")
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--no-preload", action="store_true")
+    parser.add_argument("--access-log", default="-", help="Access log path; empty disables it.")
+
+    parser.add_argument("--sweep", action="store_true", help="Benchmark worker configurations and recommend one.")
+    parser.add_argument("--worker-classes", default="sync,gthread")
+    parser.add_argument("--thread-counts", default="2,4,8", help="Threads per gthread worker to try.")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of measured load per candidate.")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--prefix", default="lt_")
+    parser.add_argument("--password", default="LoadTest#2024")
+    parser.add_argument("--mix")
+    parser.add_argument("--p95-budget-ms", type=float, default=500.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write sweep results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    if args.sweep:
+        _django_setup(args.settings)
+        sweep(args)
+        return
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", args.settings)
+    # Read before settings load: the master must not connect, and workers warm up in post_worker_init.
+    os.environ["WARMUP_CONNECT"] = "False"
+    options = server_options(args)
+    options["accesslog"] = options["accesslog"] or None
+    serve(options)
+
+
+if __name__ == "__main__":
+    main()
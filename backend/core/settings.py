@@ -1,7 +1,8 @@
 from pathlib import Path
 import os
 import dj_database_url
-from decouple import config
+from corsheaders.defaults import default_headers
+from decouple import Csv, config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -18,6 +19,9 @@ INSTALLED_APPS = [
     'dashboard',
     'creditscore_calculator',
     'daulterprobability',
+    'notifications',
+    'analytics',
+    'benchmarks',
     'rest_framework',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -28,6 +32,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.LargeResponseGZipMiddleware',
+    'core.profiling.ProfilingMiddleware',
+    'core.db.routing.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -61,18 +69,168 @@ RENDER_HOST = os.environ.get("RENDER_EXTERNAL_HOSTNAME")
 if RENDER_HOST and RENDER_HOST not in ALLOWED_HOSTS:
     ALLOWED_HOSTS.append(RENDER_HOST)
     
+DB_POOL_ENABLED = config("DB_POOL_ENABLED", default=False, cast=bool)
+
 DATABASES = {
     "default": dj_database_url.parse(
         config("DATABASE_URL"),
-        conn_max_age=600,
-        ssl_require=True
+        conn_max_age=0 if DB_POOL_ENABLED else 600,
+        ssl_require=config("DB_SSL_REQUIRE", default=True, cast=bool)
     )
 }
 
+if DB_POOL_ENABLED:
+    # Connections go back to a per-process pool at the end of each request.
+    DATABASES["default"]["ENGINE"] = "core.db.backends.postgresql_pool"
+    DATABASES["default"]["POOL"] = {
+        "min_size": config("DB_POOL_MIN", default=1, cast=int),
+        "max_size": config("DB_POOL_MAX", default=10, cast=int),
+        "timeout": config("DB_POOL_TIMEOUT", default=5.0, cast=float),
+        "pre_ping": config("DB_POOL_PRE_PING", default=True, cast=bool),
+    }
+
+# Optional streaming replica for GET reads; see core.db.routing.
+DATABASE_REPLICA_URL = config("DATABASE_REPLICA_URL", default="")
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=0 if DB_POOL_ENABLED else 600,
+        ssl_require=config("DB_SSL_REQUIRE", default=True, cast=bool)
+    )
+    if DB_POOL_ENABLED:
+        DATABASES["replica"]["ENGINE"] = DATABASES["default"]["ENGINE"]
+        DATABASES["replica"]["POOL"] = dict(DATABASES["default"]["POOL"])
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+READ_YOUR_WRITES_SECONDS = config("READ_YOUR_WRITES_SECONDS", default=5, cast=float)
+REPLICA_MAX_LAG_SECONDS = config("REPLICA_MAX_LAG_SECONDS", default=10, cast=float)
+REPLICA_CHECK_SECONDS = config("REPLICA_CHECK_SECONDS", default=5, cast=float)
+REPLICA_RETRY_SECONDS = config("REPLICA_RETRY_SECONDS", default=30, cast=float)
+
+ASYNC_DB_POOL_MIN = config("ASYNC_DB_POOL_MIN", default=2, cast=int)
+ASYNC_DB_POOL_MAX = config("ASYNC_DB_POOL_MAX", default=20, cast=int)
+ASYNC_DB_POOL_TIMEOUT = config("ASYNC_DB_POOL_TIMEOUT", default=10, cast=float)
+
+# notifications: the LISTEN/NOTIFY channel behind /api/events/ (ASGI only), the keep-alive comment
+# interval, how long one stream stays open before the browser reconnects, and per-stream backlog.
+NOTIFY_CHANNEL = config("NOTIFY_CHANNEL", default="user_events")
+SSE_HEARTBEAT_SECONDS = config("SSE_HEARTBEAT_SECONDS", default=15, cast=float)
+SSE_MAX_STREAM_SECONDS = config("SSE_MAX_STREAM_SECONDS", default=300, cast=float)
+SSE_RETRY_MS = config("SSE_RETRY_MS", default=3000, cast=int)
+SSE_QUEUE_SIZE = config("SSE_QUEUE_SIZE", default=32, cast=int)
+
+# PREPARE each registered statement once per connection (core.db.queries); disable behind
+# transaction-mode poolers that do not keep session state.
+QUERY_REGISTRY_PREPARE = config("QUERY_REGISTRY_PREPARE", default=True, cast=bool)
+
+# core.wsgi / core.asgi: build lookup tables at import, and (WSGI) open and prime DB connections.
+# Turn WARMUP_CONNECT off when the app is loaded in a parent process that forks workers.
+WARMUP_ON_BOOT = config("WARMUP_ON_BOOT", default=False, cast=bool)
+WARMUP_CONNECT = config("WARMUP_CONNECT", default=True, cast=bool)
+
+# core.server (gunicorn launcher) defaults; SERVER_WORKERS=0 means 2 x cores + 1.
+SERVER_WORKERS = config("SERVER_WORKERS", default=0, cast=int)
+SERVER_WORKER_CLASS = config("SERVER_WORKER_CLASS", default="gthread")
+SERVER_THREADS = config("SERVER_THREADS", default=4, cast=int)
+SERVER_TIMEOUT = config("SERVER_TIMEOUT", default=30, cast=int)
+# GETs each worker sends itself after forking, before it accepts traffic. SERVER_WARMUP_AUTH_PATHS are
+# sent with a five-minute token for SERVER_WARMUP_USER (e.g. a seeded demo applicant) and skipped without one.
+SERVER_WARMUP_PATHS = [path for path in config("SERVER_WARMUP_PATHS", default="/api/metrics/").split(",") if path]
+SERVER_WARMUP_AUTH_PATHS = [
+    path
+    for path in config(
+        "SERVER_WARMUP_AUTH_PATHS", default="/api/dashboard/,/api/payments/loans/,/api/payments/history/"
+    ).split(",")
+    if path
+]
+SERVER_WARMUP_USER = config("SERVER_WARMUP_USER", default="")
+SERVER_WARMUP_REPEAT = config("SERVER_WARMUP_REPEAT", default=3, cast=int)
+
+# Responses smaller than this are sent uncompressed.
+GZIP_MIN_BYTES = config("GZIP_MIN_BYTES", default=1024, cast=int)
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+REQUEST_SLOW_MS = config("REQUEST_SLOW_MS", default=500, cast=float)
+REQUEST_METRICS_WINDOW = config("REQUEST_METRICS_WINDOW", default=2048, cast=int)
+METRICS_ALLOWED_IPS = config("METRICS_ALLOWED_IPS", default="127.0.0.1,::1").split(",")
+
+PROFILE_DIR = config("PROFILE_DIR", default=str(BASE_DIR / "profiles"))
+PROFILE_SAMPLE_INTERVAL_MS = config("PROFILE_SAMPLE_INTERVAL_MS", default=5, cast=float)
+# Sample 1 in N requests per endpoint into the in-memory aggregate; 0 disables.
+PROFILE_SAMPLE_EVERY = config("PROFILE_SAMPLE_EVERY", default=0, cast=int)
+PROFILE_MAX_STACKS = config("PROFILE_MAX_STACKS", default=5000, cast=int)
+
+# manage_partitions: future monthly partitions to keep created, and raw score_history months kept
+# before older snapshots are rolled up into score_history_monthly (0 keeps everything).
+PARTITION_MONTHS_AHEAD = config("PARTITION_MONTHS_AHEAD", default=3, cast=int)
+SCORE_HISTORY_RETAIN_MONTHS = config("SCORE_HISTORY_RETAIN_MONTHS", default=24, cast=int)
+
+# Allowed slowdown for run_benchmarks against benchmarks/baseline.json.
+BENCHMARK_REGRESSION_THRESHOLD = config("BENCHMARK_REGRESSION_THRESHOLD", default=0.10, cast=float)
+
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 CORS_ALLOWED_ORIGINS = config("CORS_ALLOWED_ORIGINS").split(",")
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
 
 ADMIN_USERNAME = config("ADMIN_USERNAME", default="admin")
-ADMIN_PASSWORD = config("ADMIN_PASSWORD", default="admin")
\ No newline at end of file
+ADMIN_PASSWORD = config("ADMIN_PASSWORD", default="admin")
+
+AUTH_CLAIMS_CACHE_SIZE = config("AUTH_CLAIMS_CACHE_SIZE", default=4096, cast=int)
+AUTH_CLAIMS_CACHE_TTL = config("AUTH_CLAIMS_CACHE_TTL", default=60, cast=int)
+
+# Idempotency-Key replays for loan requests and settlements: how long a key is honoured, and how
+# many recent keys each process answers from memory before asking idempotency_keys.
+IDEMPOTENCY_KEY_TTL_SECONDS = config("IDEMPOTENCY_KEY_TTL_SECONDS", default=86400, cast=int)
+IDEMPOTENCY_CACHE_SIZE = config("IDEMPOTENCY_CACHE_SIZE", default=2048, cast=int)
+
+# Decision rules and loan limits for evaluations (see evaluation/policy.py); the file is checked for
+# a new version at most this often, so a policy change needs no redeploy.
+CREDIT_POLICY_PATH = config("CREDIT_POLICY_PATH", default=str(BASE_DIR / "evaluation" / "policy.json"))
+CREDIT_POLICY_RELOAD_SECONDS = config("CREDIT_POLICY_RELOAD_SECONDS", default=5, cast=float)
+
+# Pre-approval quotes (payments/quote.py): how long each process reuses a user's score and account
+# totals, the share of monthly income all installments may take, and the minimum monthly payment
+# assumed on revolving balances.
+QUOTE_FEATURE_CACHE_SIZE = config("QUOTE_FEATURE_CACHE_SIZE", default=8192, cast=int)
+QUOTE_FEATURE_CACHE_TTL = config("QUOTE_FEATURE_CACHE_TTL", default=30, cast=float)
+QUOTE_MAX_DTI = config("QUOTE_MAX_DTI", default=0.5, cast=float)
+QUOTE_REVOLVING_PAYMENT_RATE = config("QUOTE_REVOLVING_PAYMENT_RATE", default=0.05, cast=float)
+
+# Velocity checks on the loan POSTs (payments/velocity.py): allowed requests per 1 minute, 1 hour
+# and 24 hours for each user and each client IP (0 turns a window off), and how often each process
+# shares its counts through velocity_counters.
+VELOCITY_TAKE_LOAN_USER = config("VELOCITY_TAKE_LOAN_USER", default="3,10,20", cast=Csv(int))
+VELOCITY_TAKE_LOAN_IP = config("VELOCITY_TAKE_LOAN_IP", default="10,60,200", cast=Csv(int))
+VELOCITY_SETTLE_LOAN_USER = config("VELOCITY_SETTLE_LOAN_USER", default="5,30,100", cast=Csv(int))
+VELOCITY_SETTLE_LOAN_IP = config("VELOCITY_SETTLE_LOAN_IP", default="20,120,500", cast=Csv(int))
+VELOCITY_SYNC_SECONDS = config("VELOCITY_SYNC_SECONDS", default=2, cast=float)
+VELOCITY_MAX_SUBJECTS = config("VELOCITY_MAX_SUBJECTS", default=100000, cast=int)
+
+PASSWORD_HASHERS = [
+    "authentication.hashers.ConfigurablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASH_ITERATIONS = config("PASSWORD_HASH_ITERATIONS", default=600000, cast=int)
+PASSWORD_HASHING_WORKERS = config("PASSWORD_HASHING_WORKERS", default=2, cast=int)
+PASSWORD_HASHING_QUEUE_SIZE = config("PASSWORD_HASHING_QUEUE_SIZE", default=8, cast=int)
+PASSWORD_HASHING_TIMEOUT = config("PASSWORD_HASHING_TIMEOUT", default=10, cast=int)
+
+# Reverse proxies in front of the app that append to X-Forwarded-For; 0 trusts only REMOTE_ADDR.
+# Per-IP login and velocity limits key on the address the outermost trusted proxy saw.
+TRUSTED_PROXY_COUNT = config("TRUSTED_PROXY_COUNT", default=0, cast=int)
+
+LOGIN_USER_BURST = config("LOGIN_USER_BURST", default=5, cast=int)
+LOGIN_USER_REFILL_SECONDS = config("LOGIN_USER_REFILL_SECONDS", default=12, cast=float)
+LOGIN_IP_BURST = config("LOGIN_IP_BURST", default=20, cast=int)
+LOGIN_IP_REFILL_SECONDS = config("LOGIN_IP_REFILL_SECONDS", default=3, cast=float)
@@ -0,0 +1,44 @@
+"""Lean runtime profile for the JSON API: ``DJANGO_SETTINGS_MODULE=core.settings_api``.
+
+The API authenticates with bearer JWTs and keeps no server-side session, so the
+admin, sessions, messages, static files, templates and the middleware that
+serves them are dropped. Management commands (migrations, benchmarks) keep
+using ``core.settings``.
+"""
+
+from core.settings import *  # noqa: F401,F403
+from core.settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, config
+
+_UNUSED_APPS = {
+    "django.contrib.admin",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "benchmarks",
+}
+# auth and contenttypes stay: the password hashers and DRF's fallbacks import from them.
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in _UNUSED_APPS]
+
+_UNUSED_MIDDLEWARE = {
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+}
+MIDDLEWARE = [name for name in MIDDLEWARE if name not in _UNUSED_MIDDLEWARE]
+
+TEMPLATES = []
+ROOT_URLCONF = "core.urls_api"
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    "DEFAULT_RENDERER_CLASSES": ["core.renderers.FastJSONRenderer"],
+    # Views read the bearer token themselves; skip DRF's session/basic authenticators.
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
+    "UNAUTHENTICATED_USER": None,
+}
+
+WARMUP_ON_BOOT = config("WARMUP_ON_BOOT", default=True, cast=bool)
@@ -0,0 +1,251 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest import mock, skipIf
+
+import psycopg
+from django.db.utils import ProgrammingError
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from psycopg.pq import TransactionStatus
+
+from authentication.services import generate_token
+from core import renderers, server
+from core.db import queries, routing
+from core.db.copy import copy_rows
+from core.db.pool import ConnectionPool
+
+
+def _connection(status=TransactionStatus.IDLE, autocommit=False):
+    conn = mock.create_autospec(psycopg.Connection, instance=True)
+    conn.closed = False
+    conn.autocommit = autocommit
+    conn.info = mock.Mock(transaction_status=status)
+    return conn
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def pool(self, *connections, pre_ping=True):
+        return ConnectionPool(mock.Mock(side_effect=connections), min_size=0, max_size=2, pre_ping=pre_ping)
+
+    def test_release_returns_an_idle_connection(self):
+        conn = _connection()
+        pool = self.pool(conn, pre_ping=False)
+        pool.release(pool.acquire())
+        conn.rollback.assert_not_called()
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_release_rolls_back_an_open_transaction(self):
+        for status in (TransactionStatus.INTRANS, TransactionStatus.INERROR):
+            with self.subTest(status=status):
+                conn = _connection()
+                pool = self.pool(conn, pre_ping=False)
+                pool.acquire()
+                conn.info.transaction_status = status
+                pool.release(conn)
+                conn.rollback.assert_called_once_with()
+                self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_release_discards_a_connection_that_cannot_roll_back(self):
+        conn = _connection()
+        pool = self.pool(conn, pre_ping=False)
+        pool.acquire()
+        conn.info.transaction_status = TransactionStatus.UNKNOWN
+        conn.rollback.side_effect = psycopg.OperationalError("server closed the connection")
+        pool.release(conn)
+        conn.close.assert_called_once_with()
+        stats = pool.stats()
+        self.assertEqual((stats["size"], stats["idle"], stats["discarded"]), (0, 0, 1))
+
+    def test_release_discards_a_closed_connection(self):
+        conn = _connection()
+        pool = self.pool(conn, pre_ping=False)
+        pool.acquire()
+        conn.closed = True
+        pool.release(conn)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    def test_ping_rolls_back_outside_autocommit(self):
+        conn = _connection()
+        self.assertTrue(ConnectionPool(mock.Mock())._ping(conn))
+        conn.cursor.return_value.__enter__.return_value.execute.assert_called_once_with("SELECT 1")
+        conn.rollback.assert_called_once_with()
+
+        conn = _connection(autocommit=True)
+        self.assertTrue(ConnectionPool(mock.Mock())._ping(conn))
+        conn.rollback.assert_not_called()
+
+    def test_acquire_replaces_a_connection_that_fails_the_ping(self):
+        stale, fresh = _connection(), _connection()
+        stale.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg.OperationalError("terminated")
+        pool = ConnectionPool(mock.Mock(side_effect=[stale, fresh]), min_size=1, max_size=1)
+        pool.fill()
+        self.assertIs(pool.acquire(), fresh)
+        stats = pool.stats()
+        self.assertEqual((stats["ping_failures"], stats["discarded"], stats["size"]), (1, 1, 1))
+
+
+def _wrapped(driver_error):
+    """The error as Django's cursor raises it: a django.db exception caused by the driver's."""
+    try:
+        raise ProgrammingError(str(driver_error)) from driver_error
+    except ProgrammingError as exc:
+        return exc
+
+
+@mock.patch.dict(queries._registry, {"tests.lookup": queries.Statement("tests.lookup", "SELECT %s")})
+class PreparedStatementTests(SimpleTestCase):
+    def cursor(self, *results):
+        cursor = mock.Mock()
+        cursor.db.vendor = "postgresql"
+        cursor.db.connection = _connection()
+        cursor.db.get_autocommit.return_value = True
+        cursor.execute.side_effect = results
+        return cursor
+
+    def test_missing_prepared_statement(self):
+        missing = _wrapped(psycopg.errors.InvalidSqlStatementName('prepared statement "q_x" does not exist'))
+        self.assertTrue(queries._is_missing_prepared_statement(missing))
+        self.assertFalse(queries._is_missing_prepared_statement(_wrapped(psycopg.errors.UndefinedTable("x"))))
+        self.assertFalse(queries._is_missing_prepared_statement(ProgrammingError("no cause")))
+
+    def test_execute_prepares_again_after_the_session_lost_its_statements(self):
+        missing = _wrapped(psycopg.errors.InvalidSqlStatementName("q_tests_lookup"))
+        cursor = self.cursor(None, missing, None, None)
+        queries.execute(cursor, "tests.lookup", [1])
+        self.assertEqual(
+            [call.args[0] for call in cursor.execute.call_args_list],
+            [
+                "PREPARE q_tests_lookup AS SELECT $1",
+                "EXECUTE q_tests_lookup (%s)",
+                "PREPARE q_tests_lookup AS SELECT $1",
+                "EXECUTE q_tests_lookup (%s)",
+            ],
+        )
+
+    def test_execute_does_not_retry_inside_a_transaction(self):
+        missing = _wrapped(psycopg.errors.InvalidSqlStatementName("q_tests_lookup"))
+        cursor = self.cursor(None, missing)
+        cursor.db.get_autocommit.return_value = False
+        with self.assertRaises(ProgrammingError):
+            queries.execute(cursor, "tests.lookup", [1])
+
+
+class CopyRowsTests(SimpleTestCase):
+    def cursor(self):
+        cursor = mock.create_autospec(psycopg.Cursor, instance=True)
+        copy = mock.create_autospec(psycopg.Copy, instance=True)
+        cursor.copy.return_value.__enter__.return_value = copy
+        return cursor, copy
+
+    def test_streams_escaped_text_rows_through_cursor_copy(self):
+        cursor, copy = self.cursor()
+        cursor.rowcount = 3
+        rows = [(1, "a\tb", None), (2, "line\nbreak", True), (3, "back\\slash", False)]
+        copied = copy_rows(cursor, "users", ("user_id", "username", "is_active"), iter(rows), chunk_size=8)
+        self.assertEqual(copied, 3)
+        cursor.copy.assert_called_once_with("COPY users (user_id, username, is_active) FROM STDIN")
+        chunks = [call.args[0] for call in copy.write.call_args_list]
+        self.assertTrue(all(len(chunk) <= 8 for chunk in chunks))
+        self.assertEqual(
+            "".join(chunks),
+            "1\ta\\tb\t\\N\n2\tline\\nbreak\tt\n3\tback\\\\slash\tf\n",
+        )
+
+    def test_no_rows(self):
+        cursor, copy = self.cursor()
+        cursor.rowcount = 0
+        self.assertEqual(copy_rows(cursor, "users", ("user_id",), []), 0)
+        copy.write.assert_not_called()
+
+
+@mock.patch("core.db.routing.replica_health.healthy", return_value=True)
+@mock.patch("core.db.routing.replica_configured", return_value=True)
+@mock.patch("core.db.routing.connections", mock.MagicMock())
+class ReadYourWritesTests(SimpleTestCase):
+    def request(self, method="get", user_id=7):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {generate_token('ada', user_id=user_id)}"} if user_id else {}
+        return getattr(RequestFactory(), method)("/api/dashboard/", **headers)
+
+    def test_pinned_user_reads_from_the_primary(self, *_):
+        with mock.patch("core.db.queries.fetchone", return_value=(1,)) as fetchone:
+            self.assertEqual(routing.choose_read_alias(self.request()), "default")
+        self.assertEqual(fetchone.call_args.args[1:], (queries.PINS_ACTIVE, ["user:7"]))
+
+    def test_unpinned_and_anonymous_reads_use_the_replica(self, *_):
+        with mock.patch("core.db.queries.fetchone", return_value=None) as fetchone:
+            self.assertEqual(routing.choose_read_alias(self.request()), "replica")
+            self.assertEqual(routing.choose_read_alias(self.request(user_id=None)), "replica")
+        self.assertEqual(fetchone.call_count, 1)
+
+    def test_writes_go_to_the_primary_without_a_lookup(self, *_):
+        with mock.patch("core.db.queries.fetchone") as fetchone:
+            self.assertEqual(routing.choose_read_alias(self.request("post")), "default")
+        fetchone.assert_not_called()
+
+    async def test_async_lookup(self, *_):
+        with mock.patch("core.db.aio.fetchone", mock.AsyncMock(return_value=(1,))) as fetchone:
+            self.assertEqual(await routing.achoose_read_alias(self.request()), "default")
+        fetchone.assert_awaited_once_with(queries.PINS_ACTIVE, ["user:7"])
+
+    def test_a_request_that_wrote_pins_its_user_for_every_worker(self, *_):
+        def view(request):
+            routing.note_write()
+            return HttpResponse(routing.read_alias())
+
+        middleware = routing.ReplicaRoutingMiddleware(view)
+        with mock.patch("core.db.queries.fetchone", return_value=None), mock.patch("core.db.queries.execute") as execute:
+            response = middleware(self.request())
+        self.assertEqual(response.content, b"default")
+        self.assertEqual(execute.call_args.args[1:], (queries.PINS_SET, ["user:7", 5]))
+        self.assertNotIn("Set-Cookie", response.headers)
+
+    def test_a_read_only_request_sets_no_pin(self, *_):
+        middleware = routing.ReplicaRoutingMiddleware(lambda request: HttpResponse(routing.read_alias()))
+        with mock.patch("core.db.queries.fetchone", return_value=None), mock.patch("core.db.queries.execute") as execute:
+            response = middleware(self.request())
+        self.assertEqual(response.content, b"replica")
+        execute.assert_not_called()
+
+
+class RendererTests(SimpleTestCase):
+    payload = {
+        "name": "Sita Rāi",
+        "limit": Decimal("250000.50"),
+        "opened": date(2024, 1, 5),
+        "scoredAt": datetime(2024, 3, 1, 9, 30, tzinfo=timezone.utc),
+        "ratio": 0.25,
+        "factors": [1, None, True],
+    }
+
+    @skipIf(renderers.orjson is None, "orjson is not installed.")
+    def test_orjson_and_fallback_match(self):
+        fast = renderers.dumps(self.payload)
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(renderers.dumps(self.payload), fast)
+
+    def test_fallback_rejects_nan(self):
+        with mock.patch.object(renderers, "orjson", None), self.assertRaises(ValueError):
+            renderers.dumps({"ratio": float("nan")})
+
+
+@override_settings(SERVER_WARMUP_REPEAT=1, SERVER_WARMUP_PATHS=["/api/health/"], SERVER_WARMUP_USER="")
+@mock.patch("core.warmup.synthetic_requests")
+@mock.patch("core.warmup.warm_up")
+class PostWorkerInitTests(SimpleTestCase):
+    def run_hook(self, worker_class):
+        worker = mock.Mock()
+        worker.cfg.worker_class_str = worker_class
+        with mock.patch("django.db.connections.close_all") as close_all:
+            server._post_worker_init(worker)
+        return close_all
+
+    def test_threaded_workers_close_the_warm_up_connections(self, warm_up, synthetic_requests):
+        close_all = self.run_hook("gthread")
+        warm_up.assert_called_once_with(connect=True, keep_connections=False)
+        synthetic_requests.assert_called_once()
+        close_all.assert_called_once_with()
+
+    def test_sync_workers_keep_them(self, warm_up, synthetic_requests):
+        close_all = self.run_hook("sync")
+        warm_up.assert_called_once_with(connect=True, keep_connections=True)
+        close_all.assert_not_called()
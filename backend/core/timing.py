@@ -0,0 +1,23 @@
+import math
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize_ms(samples):
+    """p50/p95/p99/mean/max in milliseconds for a list of durations in seconds."""
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "count": count,
+        "p50": percentile(ordered, 0.50) * 1000,
+        "p95": percentile(ordered, 0.95) * 1000,
+        "p99": percentile(ordered, 0.99) * 1000,
+        "mean": (sum(ordered) / count * 1000) if count else 0.0,
+        "max": (ordered[-1] * 1000) if count else 0.0,
+    }
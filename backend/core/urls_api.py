@@ -0,0 +1,7 @@
+"""URLconf for core.settings_api: the API without the Django admin."""
+
+from django.urls import include, path
+
+urlpatterns = [
+    path("api/", include("api.urls")),
+]
@@ -0,0 +1,123 @@
+"""Boot-time warm-up so the first request does not pay for lazy initialisation.
+
+``warm_up`` builds the in-process lookup tables and, with ``connect=True``,
+opens this thread's database connections and PREPAREs the registered read
+statements on them. Servers that fork after loading the app (gunicorn
+``--preload``) must warm connections in each worker, never in the parent.
+"""
+
+import logging
+import time
+from importlib import import_module
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def warm_tables():
+    from django.urls import get_resolver
+
+    from daulterprobability.services import warm_pd_table
+    from evaluation.policy import get_policy
+
+    warm_pd_table()
+    get_policy()
+    # Imports the URLconf and every view module it references.
+    get_resolver().url_patterns
+
+
+def warm_connections(keep=True):
+    """Connect and PREPARE the registered reads; ``keep=False`` hands pooled connections back right away.
+
+    Django connections are per thread, so only keep them when this thread serves requests.
+    """
+    from core.db import queries
+
+    for alias in connections:
+        try:
+            with connections[alias].cursor() as cursor:
+                queries.prepare_all(cursor)
+        except Exception:
+            # A database that is down at boot must not keep the server from starting.
+            logger.warning("Warm-up could not connect to %r", alias, exc_info=True)
+            connections[alias].close()
+            continue
+        if not keep:
+            connections[alias].close()
+
+
+def warmup_token(username):
+    """A five-minute bearer token for ``username`` so warm-up GETs reach authenticated views; None if unknown."""
+    from datetime import timedelta
+
+    from authentication.services import generate_token
+    from core.db import queries
+
+    try:
+        with connections["default"].cursor() as cursor:
+            row = queries.fetchone(cursor, queries.USERS_CREDENTIALS, [username])
+    except Exception:
+        logger.warning("Warm-up could not look up %r", username, exc_info=True)
+        return None
+    if row is None:
+        logger.warning("Warm-up user %r does not exist; authenticated paths will answer 401", username)
+        return None
+    user_id, full_name, _ = row
+    return generate_token(username, user_id=user_id, full_name=full_name, lifetime=timedelta(minutes=5))
+
+
+def synthetic_requests(application, paths, host, repeat=1, token=None):
+    """Push GETs through the WSGI stack so middleware, URL resolution and rendering are warm.
+
+    ``token`` is sent as a bearer token. The warm-up traffic is dropped from the endpoint
+    and statement metrics afterwards.
+    """
+    from io import BytesIO
+    from wsgiref.util import setup_testing_defaults
+
+    from core import metrics
+    from core.db import queries
+
+    for _ in range(repeat):
+        for target in paths:
+            path, _, query = target.partition("?")
+            environ = {
+                "REQUEST_METHOD": "GET",
+                "PATH_INFO": path,
+                "QUERY_STRING": query,
+                "REMOTE_ADDR": "127.0.0.1",
+                "HTTP_HOST": host,
+                "wsgi.input": BytesIO(),
+            }
+            if token:
+                environ["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+            setup_testing_defaults(environ)
+            try:
+                response = application(environ, lambda status, headers, exc_info=None: None)
+                b"".join(response)
+                getattr(response, "close", lambda: None)()
+            except Exception:
+                logger.warning("Warm-up request to %s failed", target, exc_info=True)
+    metrics.reset_endpoint_stats()
+    queries.reset_stats()
+
+
+ASYNC_VIEW_MODULES = (
+    "dashboard.async_views",
+    "payments.async_views",
+    "evaluation.async_views",
+    "notifications.views",
+)
+
+
+def warm_up(connect=True, async_views=False, keep_connections=True):
+    started = time.perf_counter()
+    warm_tables()
+    if async_views:
+        # api.urls routes these lazily; an ASGI server is the one process that serves them.
+        for module in ASYNC_VIEW_MODULES:
+            import_module(module)
+    if connect:
+        warm_connections(keep=keep_connections)
+    logger.info("Warm-up finished in %.1fms", (time.perf_counter() - started) * 1000)
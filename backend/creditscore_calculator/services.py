@@ -1,7 +1,10 @@
 import json
 from datetime import date
 
-from django.db import connection
+from django.db import connection, transaction
+
+from core.db import queries
+from notifications.services import SCORE_UPDATED, notify_user
 
 
 SCORE_MIN = 300
@@ -20,64 +23,56 @@ def _risk_level_for_score(score):
     return "high"
 
 
+def load_factors(value):
+    """Normalize a score_history.factors value to a dict.
+
+    Django's PostgreSQL backend hands jsonb back as text while plain psycopg decodes it,
+    so callers on either path go through here.
+    """
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, (str, bytes)):
+        try:
+            decoded = json.loads(value)
+        except ValueError:
+            return {}
+        return decoded if isinstance(decoded, dict) else {}
+    return {}
+
+
 def record_score_snapshot(user_id, inquiry_penalty=0):
     with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT COALESCE(monthly_income, 0)
-            FROM users
-            WHERE user_id = %s
-            """,
-            [user_id],
-        )
-        user_income_row = cursor.fetchone()
+        user_income_row = queries.fetchone(cursor, queries.USERS_MONTHLY_INCOME, [user_id])
         monthly_income = float(user_income_row[0] or 0) if user_income_row else 0.0
 
-        cursor.execute(
-            """
-            SELECT
-                COALESCE(SUM(credit_limit), 0) AS total_limit,
-                COALESCE(SUM(current_balance), 0) AS total_balance,
-                COALESCE(AVG(current_balance), 0) AS avg_balance,
-                COUNT(*) AS total_accounts,
-                COUNT(*) FILTER (WHERE status = 'active') AS active_accounts
-            FROM credit_accounts
-            WHERE user_id = %s
-            """,
-            [user_id],
-        )
-        total_limit, total_balance, avg_balance, total_accounts, active_accounts = cursor.fetchone()
-
-        cursor.execute(
-            """
-            SELECT
-                p.due_date,
-                p.paid_date,
-                p.status,
-                p.amount_due,
-                p.amount_paid,
-                ca.opened_date,
-                ca.account_type
-            FROM payments p
-            JOIN credit_accounts ca ON ca.account_id = p.account_id
-            WHERE ca.user_id = %s
-            """,
-            [user_id],
+        total_limit, total_balance, avg_balance, total_accounts, active_accounts = queries.fetchone(
+            cursor, queries.ACCOUNTS_SCORING_SUMMARY, [user_id]
         )
-        payment_rows = cursor.fetchall()
-
-        cursor.execute(
-            """
-            SELECT score, factors
-            FROM score_history
-            WHERE user_id = %s
-            ORDER BY calculated_at DESC
-            LIMIT 1
-            """,
-            [user_id],
-        )
-        latest_snapshot = cursor.fetchone()
+        payment_rows = queries.fetchall(cursor, queries.PAYMENTS_FOR_SCORING, [user_id])
+        latest_snapshot = queries.fetchone(cursor, queries.SCORES_LATEST, [user_id])
+
+    previous_factors = load_factors(latest_snapshot[2]) if latest_snapshot else {}
+    score, risk_level, factors = build_score_snapshot(
+        monthly_income,
+        (total_limit, total_balance, avg_balance, total_accounts, active_accounts),
+        payment_rows,
+        previous_factors,
+        inquiry_penalty=inquiry_penalty,
+    )
 
+    with connection.cursor() as cursor:
+        queries.execute(cursor, queries.SCORES_INSERT, [user_id, score, risk_level, json.dumps(factors)])
+
+    notify_user(user_id, SCORE_UPDATED, {"score": score, "riskLevel": risk_level})
+
+
+def build_score_snapshot(monthly_income, account_summary, payment_rows, previous_factors, inquiry_penalty=0):
+    """Pure factor math behind record_score_snapshot; returns (score, risk_level, factors).
+
+    account_summary is (total_limit, total_balance, avg_balance, total_accounts, active_accounts)
+    and payment_rows follow the column order of record_score_snapshot's payments query.
+    """
+    total_limit, total_balance, avg_balance, total_accounts, active_accounts = account_summary
     total_limit = float(total_limit or 0)
     total_balance = float(total_balance or 0)
     avg_balance = float(avg_balance or 0)
@@ -95,7 +90,16 @@ def record_score_snapshot(user_id, inquiry_penalty=0):
     credit_age_days = []
 
     today = date.today()
-    for due_date, paid_date, payment_status, amount_due, amount_paid, opened_date, account_type in payment_rows:
+    for (
+        due_date,
+        paid_date,
+        payment_status,
+        amount_due,
+        amount_paid,
+        days_past_due,
+        opened_date,
+        account_type,
+    ) in payment_rows:
         if account_type:
             account_types.add(account_type)
         if opened_date:
@@ -108,7 +112,8 @@ def record_score_snapshot(user_id, inquiry_penalty=0):
 
             if paid_date and due_date and paid_date <= due_date:
                 on_time_payments += 1
-            if due_date and paid_date and (paid_date - due_date).days > 30:
+            # days_past_due is frozen at settlement and advanced nightly by age_delinquencies.
+            if (days_past_due or 0) > 30:
                 severe_late_payments += 1
 
     if completed_payments:
@@ -134,7 +139,6 @@ def record_score_snapshot(user_id, inquiry_penalty=0):
     credit_age = _clamp(45 + min(55, credit_age_years * 11))
 
     # Inquiries degrade with new approvals; gradual recovery handled through history.
-    previous_factors = latest_snapshot[1] if latest_snapshot and isinstance(latest_snapshot[1], dict) else {}
     previous_inquiries = int(previous_factors.get("inquiries", 80))
     inquiries = _clamp(previous_inquiries - inquiry_penalty, 35, 100)
 
@@ -178,12 +182,34 @@ def record_score_snapshot(user_id, inquiry_penalty=0):
     score = int(round(SCORE_MIN + (weighted_factor_score / 100) * (SCORE_MAX - SCORE_MIN)))
     score = max(SCORE_MIN, min(SCORE_MAX, score))
     risk_level = _risk_level_for_score(score)
-
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            INSERT INTO score_history (user_id, score, risk_level, factors)
-            VALUES (%s, %s, %s, %s::jsonb)
-            """,
-            [user_id, score, risk_level, json.dumps(factors)],
-        )
\ No newline at end of file
+    return score, risk_level, factors
+
+
+def rescore_queued_users(batch_size=500):
+    """Drain score_refresh_queue, taking one fresh snapshot per queued user."""
+    rescored = 0
+    while True:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    DELETE FROM score_refresh_queue
+                    WHERE user_id IN (
+                        SELECT user_id
+                        FROM score_refresh_queue
+                        ORDER BY queued_at
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING user_id
+                    """,
+                    [batch_size],
+                )
+                user_ids = [row[0] for row in cursor.fetchall()]
+
+            for user_id in user_ids:
+                record_score_snapshot(user_id)
+
+        if not user_ids:
+            return rescored
+        rescored += len(user_ids)
@@ -0,0 +1,31 @@
+import asyncio
+
+from django.http import HttpResponseNotAllowed
+from rest_framework import status
+
+from authentication.services import aget_authenticated_user
+from core.db import aio, queries
+from core.renderers import json_response
+
+from .views import build_dashboard_payload
+
+
+async def dashboard_async(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    username, user_data = await aget_authenticated_user(request)
+    if not username or not user_data:
+        return json_response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    user_id = user_data["user_id"]
+    score_rows, limit_row, payment_rows = await asyncio.gather(
+        aio.fetchall(queries.SCORES_RECENT, [user_id]),
+        aio.fetchone(queries.ACCOUNTS_ACTIVE_TOTALS, [user_id]),
+        aio.fetchall(queries.PAYMENTS_RECENT_FOR_USER, [user_id]),
+    )
+
+    return json_response(
+        build_dashboard_payload(username, user_data["full_name"], score_rows, limit_row, payment_rows),
+        status=status.HTTP_200_OK,
+    )
@@ -7,72 +7,21 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from authentication.services import get_authenticated_user
+from core.db import queries
+from creditscore_calculator.services import load_factors
 from django.db import connection
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def dashboard(request):
-    username, user_data = get_authenticated_user(request)
-    if not username or not user_data:
-        return Response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
-
-    user_id = user_data["user_id"]
-    full_name = user_data["full_name"]
-
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT score, risk_level, factors, calculated_at
-            FROM score_history
-            WHERE user_id = %s
-            ORDER BY calculated_at DESC
-            LIMIT 6
-            """,
-            [user_id],
-        )
-        score_rows = cursor.fetchall()
-
+def build_dashboard_payload(username, full_name, score_rows, limit_row, payment_rows):
     latest_score = score_rows[0][0] if score_rows else 0
     latest_risk = (score_rows[0][1] if score_rows else "unknown").title()
-    latest_factors = score_rows[0][2] if score_rows else {}
+    latest_factors = load_factors(score_rows[0][2]) if score_rows else {}
 
     score_trend = [{"label": row[3].strftime("%b"), "score": int(row[0])} for row in reversed(score_rows)]
 
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT
-                COALESCE(SUM(credit_limit), 0) AS total_limit,
-                COALESCE(SUM(current_balance), 0) AS total_balance
-            FROM credit_accounts
-            WHERE user_id = %s AND status = 'active'
-            """,
-            [user_id],  
-        )
-        total_limit, total_balance = cursor.fetchone()
-
+    total_limit, total_balance = limit_row
     utilization = float((total_balance / total_limit) * 100) if total_limit else 0.0
 
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT
-                p.due_date,
-                ca.account_type,
-                p.amount_due,
-                p.status,
-                p.paid_date
-            FROM payments p
-            JOIN credit_accounts ca ON ca.account_id = p.account_id
-            WHERE ca.user_id = %s
-            ORDER BY p.due_date DESC
-            LIMIT 8
-            """,
-            [user_id],
-        )
-        payment_rows = cursor.fetchall()
-
     completed_in_last_year = 0
     on_time_in_last_year = 0
     now = datetime.utcnow().date()
@@ -105,10 +54,9 @@ def dashboard(request):
         "inquiries": 82,
     }
     factor_values = defaultdict(int, default_factor_map)
-    if isinstance(latest_factors, dict):
-        for key, value in latest_factors.items():
-            if isinstance(value, (int, float)):
-                factor_values[key] = max(0, min(100, int(value)))
+    for key, value in latest_factors.items():
+        if isinstance(value, (int, float)):
+            factor_values[key] = max(0, min(100, int(value)))
 
     factor_payload = [
         {"label": "Payment History", "value": factor_values["payment_history"]},
@@ -125,20 +73,37 @@ def dashboard(request):
     if not alerts:
         alerts.append({"title": "Add payment records", "desc": "More payment history helps generate better risk insights.", "tone": "warn"})
 
-    return Response(
-        {
-            "user": {"username": username, "full_name": full_name},
-            "stats": {
-                "credit_score": int(latest_score),
-                "score_band": "Good" if latest_score >= 700 else "Fair" if latest_score >= 650 else "Needs work",
-                "risk_level": latest_risk,
-                "utilization": round(utilization, 1),
-                "on_time_payments": round(on_time_rate, 1),
-            },
-            "score_trend": score_trend,
-            "key_factors": factor_payload,
-            "recent_activity": recent_activity,
-            "alerts": alerts,
+    return {
+        "user": {"username": username, "full_name": full_name},
+        "stats": {
+            "credit_score": int(latest_score),
+            "score_band": "Good" if latest_score >= 700 else "Fair" if latest_score >= 650 else "Needs work",
+            "risk_level": latest_risk,
+            "utilization": round(utilization, 1),
+            "on_time_payments": round(on_time_rate, 1),
         },
+        "score_trend": score_trend,
+        "key_factors": factor_payload,
+        "recent_activity": recent_activity,
+        "alerts": alerts,
+    }
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def dashboard(request):
+    username, user_data = get_authenticated_user(request)
+    if not username or not user_data:
+        return Response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    user_id = user_data["user_id"]
+
+    with connection.cursor() as cursor:
+        score_rows = queries.fetchall(cursor, queries.SCORES_RECENT, [user_id])
+        limit_row = queries.fetchone(cursor, queries.ACCOUNTS_ACTIVE_TOTALS, [user_id])
+        payment_rows = queries.fetchall(cursor, queries.PAYMENTS_RECENT_FOR_USER, [user_id])
+
+    return Response(
+        build_dashboard_payload(username, user_data["full_name"], score_rows, limit_row, payment_rows),
         status=status.HTTP_200_OK,
     )
@@ -6,6 +6,57 @@ def _clamp(value: float, minimum: float, maximum: float) -> float:
     return max(minimum, min(maximum, value))
 
 
+_RISK_COMPONENTS = {
+    "LOW": -0.45,
+    "MEDIUM": 0.15,
+    "HIGH": 0.65,
+}
+# Every utilization component _utilization_component can return (None input -> 0.0).
+_UTILIZATION_COMPONENTS = (0.0, -0.15, -0.02, 0.18, 0.35)
+
+# (risk_component, utilization_component) -> probabilities indexed by score - 300.
+_pd_table = None
+
+
+def _utilization_component(utilization_pct: Optional[float]) -> float:
+    if utilization_pct is None:
+        return 0.0
+    util = _clamp(float(utilization_pct), 0.0, 100.0)
+    # Non-linear penalty beyond healthy utilization levels.
+    if util <= 30:
+        return -0.15
+    if util <= 50:
+        return -0.02
+    if util <= 75:
+        return 0.18
+    return 0.35
+
+
+def _probability(safe_score: int, risk_component: float, utilization_component: float) -> float:
+    # Score transformation: higher scores should rapidly reduce default odds.
+    # At ~650 score we get around neutral odds before other adjustments.
+    score_component = (650 - safe_score) / 58.0
+    linear_risk = score_component + risk_component + utilization_component
+    probability = 1.0 / (1.0 + math.exp(-linear_risk))
+
+    # Keep away from absolute 0/1 to reflect uncertainty in sparse data.
+    return round(_clamp(probability, 0.01, 0.95), 4)
+
+
+def warm_pd_table() -> dict:
+    """Precompute every probability the model can return (551 scores x 4 risk x 5 utilization inputs)."""
+    global _pd_table
+    if _pd_table is None:
+        _pd_table = {
+            (risk_component, utilization_component): tuple(
+                _probability(score, risk_component, utilization_component) for score in range(300, 851)
+            )
+            for risk_component in (0.0, *_RISK_COMPONENTS.values())
+            for utilization_component in _UTILIZATION_COMPONENTS
+        }
+    return _pd_table
+
+
 def calculate_default_probability(
     score: int,
     *,
@@ -16,38 +67,13 @@ def calculate_default_probability(
 
     Inputs are intentionally lightweight because this service is consumed by the
     evaluation API. We combine score, risk bucket, and utilization into a
-    bounded probability suitable for UI and lending workflow decisions.
+    bounded probability suitable for UI and lending workflow decisions. The
+    inputs collapse to a small grid, so results come from a precomputed table.
     """
     safe_score = int(_clamp(float(score), 300.0, 850.0))
-
-    # Score transformation: higher scores should rapidly reduce default odds.
-    # At ~650 score we get around neutral odds before other adjustments.
-    score_component = (650 - safe_score) / 58.0
-
-    risk_component = {
-        "LOW": -0.45,
-        "MEDIUM": 0.15,
-        "HIGH": 0.65,
-    }.get(str(risk_category or "").upper(), 0.0)
-
-    utilization_component = 0.0
-    if utilization_pct is not None:
-        util = _clamp(float(utilization_pct), 0.0, 100.0)
-        # Non-linear penalty beyond healthy utilization levels.
-        if util <= 30:
-            utilization_component = -0.15
-        elif util <= 50:
-            utilization_component = -0.02
-        elif util <= 75:
-            utilization_component = 0.18
-        else:
-            utilization_component = 0.35
-
-    linear_risk = score_component + risk_component + utilization_component
-    probability = 1.0 / (1.0 + math.exp(-linear_risk))
-
-    # Keep away from absolute 0/1 to reflect uncertainty in sparse data.
-    return round(_clamp(probability, 0.01, 0.95), 4)
+    risk_component = _RISK_COMPONENTS.get(str(risk_category or "").upper(), 0.0)
+    table = _pd_table if _pd_table is not None else warm_pd_table()
+    return table[(risk_component, _utilization_component(utilization_pct))][safe_score - 300]
 
 
 def as_percentage(probability: float) -> float:
@@ -0,0 +1,75 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed
+from rest_framework import status
+
+from core.db import aio, queries
+from core.renderers import json_response
+from creditscore_calculator.services import record_score_snapshot
+
+from .views import (
+    SCORED_SECTIONS,
+    UTILIZATION_SECTIONS,
+    _normalize_applicant_lookup,
+    build_evaluation_payload,
+    build_pending_items,
+    limit_params,
+    parse_evaluation_fields,
+    score_statement,
+)
+
+
+async def evaluation_async(request, applicant_id):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    try:
+        sections, compact = parse_evaluation_fields(request.GET)
+    except ValueError as exc:
+        return json_response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    normalized_user_id, normalized_username = _normalize_applicant_lookup(applicant_id)
+    user_row = await aio.fetchone(
+        queries.USERS_RESOLVE_APPLICANT,
+        [normalized_user_id, normalized_username],
+    )
+    if not user_row:
+        return json_response({"detail": "Evaluation not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    user_id = user_row[0]
+    scored = bool(SCORED_SECTIONS & sections)
+    pending = "pendingApprovals" in sections
+    reads = {
+        "scores": aio.fetchall(score_statement(sections), [user_id]) if scored else None,
+        "limits": (
+            aio.fetchone(queries.ACCOUNTS_QUOTE_FEATURES, limit_params(user_id)) if UTILIZATION_SECTIONS & sections else None
+        ),
+        "loans": aio.fetchall(queries.ACCOUNTS_PENDING_FOR_USER, [user_id]) if pending else None,
+        "settlements": aio.fetchall(queries.PAYMENTS_PENDING_FOR_USER, [user_id]) if pending else None,
+    }
+    wanted = [name for name, read in reads.items() if read is not None]
+    results = dict(zip(wanted, await asyncio.gather(*(reads[name] for name in wanted))))
+    score_rows = results.get("scores")
+
+    if scored and not score_rows:
+        # First evaluation of a new signup: take the initial snapshot on the sync path, then re-read.
+        await sync_to_async(record_score_snapshot)(user_id)
+        score_rows = await aio.fetchall(score_statement(sections), [user_id])
+
+        if not score_rows:
+            return json_response(
+                {"detail": "No score history available for this applicant."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+    return json_response(
+        build_evaluation_payload(
+            user_row,
+            score_rows,
+            results.get("limits"),
+            build_pending_items(results["loans"], results["settlements"]) if pending else None,
+            sections,
+            compact,
+        ),
+        status=status.HTTP_200_OK,
+    )
@@ -0,0 +1,277 @@
+"""Declarative credit policy: first-match rules for the decision and loan limits.
+
+The policy is a JSON file (``CREDIT_POLICY_PATH``, default ``evaluation/policy.json``)::
+
+    {"version": "...", "rules": [
+        {"name": "prime", "when": {"score": {"gte": 740}, "dti": {"lt": 0.35}},
+         "decision": "APPROVE", "limits": {"maxLoan": 500000, "maxTenureMonths": 48, "interestApr": 11.0}},
+        ...,
+        {"name": "fallback", "when": {}, "decision": "REVIEW", "limits": {...}}]}
+
+Conditions take ``gte``/``gt``/``lte``/``lt`` on the numeric inputs (score, pd,
+dti, utilization) and ``in``/``not_in`` on the categorical ones (risk,
+employment_type, compared case-insensitively). A condition on an input the
+caller does not have never matches. The last rule must have an empty ``when``.
+
+Rules are compiled once into tuples of bound checks; ``evaluate`` walks them
+for one applicant and ``evaluate_many`` builds one NumPy mask per rule for a
+whole batch. The file is re-read at most every CREDIT_POLICY_RELOAD_SECONDS
+when it changed on disk, and the new rules take over when ``version`` changes.
+"""
+
+import json
+import logging
+import math
+import operator
+import os
+import threading
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_INPUTS = ("score", "pd", "dti", "utilization")
+CATEGORY_INPUTS = ("risk", "employment_type")
+INPUTS = NUMERIC_INPUTS + CATEGORY_INPUTS
+DECISIONS = ("APPROVE", "REVIEW", "REJECT")
+LIMIT_KEYS = ("maxLoan", "maxTenureMonths", "interestApr")
+
+_BOUNDS = {
+    "gte": ("lower", operator.ge),
+    "gt": ("lower", operator.gt),
+    "lte": ("upper", operator.le),
+    "lt": ("upper", operator.lt),
+}
+_INDEX = {name: index for index, name in enumerate(INPUTS)}
+
+
+class PolicyError(ValueError):
+    pass
+
+
+class Decision(NamedTuple):
+    rule: str
+    decision: str
+    limits: dict
+
+
+def risk_category(score, stored_risk_level):
+    """The snapshot's risk level when it is one of LOW/MEDIUM/HIGH, else a band from the score."""
+    if stored_risk_level:
+        level = str(stored_risk_level).upper()
+        if level in {"LOW", "MEDIUM", "HIGH"}:
+            return level
+    if score >= 700:
+        return "LOW"
+    if score >= 650:
+        return "MEDIUM"
+    return "HIGH"
+
+
+def _category(value):
+    return None if value is None else str(value).strip().casefold()
+
+
+def _compile_rule(position, rule):
+    name = rule.get("name") or f"rule-{position}"
+    when = rule.get("when") or {}
+    if not isinstance(when, dict):
+        raise PolicyError(f"{name}: 'when' must be an object.")
+
+    numeric = []
+    categorical = []
+    for field, condition in when.items():
+        if field not in _INDEX:
+            raise PolicyError(f"{name}: unknown input {field!r}; expected one of {', '.join(INPUTS)}.")
+        if not isinstance(condition, dict) or not condition:
+            raise PolicyError(f"{name}: condition on {field!r} must be a non-empty object.")
+        if field in NUMERIC_INPUTS:
+            lower = (operator.ge, -math.inf)
+            upper = (operator.le, math.inf)
+            for op, bound in condition.items():
+                if op not in _BOUNDS or isinstance(bound, bool) or not isinstance(bound, (int, float)):
+                    raise PolicyError(f"{name}: {field} takes gte/gt/lte/lt with a number, got {op!r}: {bound!r}.")
+                side, compare = _BOUNDS[op]
+                if side == "lower":
+                    lower = (compare, float(bound))
+                else:
+                    upper = (compare, float(bound))
+            numeric.append((_INDEX[field], lower[0], lower[1], upper[0], upper[1]))
+        else:
+            for op, values in condition.items():
+                if op not in ("in", "not_in") or not isinstance(values, list):
+                    raise PolicyError(f"{name}: {field} takes in/not_in with a list, got {op!r}.")
+                categorical.append((_INDEX[field], op == "in", frozenset(_category(value) for value in values)))
+
+    decision = str(rule.get("decision", "")).upper()
+    if decision not in DECISIONS:
+        raise PolicyError(f"{name}: decision must be one of {', '.join(DECISIONS)}.")
+    limits = rule.get("limits") or {}
+    missing = [key for key in LIMIT_KEYS if key not in limits]
+    if missing or any(isinstance(limits[key], bool) or not isinstance(limits[key], (int, float)) for key in LIMIT_KEYS):
+        raise PolicyError(f"{name}: limits need numeric {', '.join(LIMIT_KEYS)}.")
+    outcome = Decision(name, decision, {key: limits[key] for key in LIMIT_KEYS})
+    return tuple(numeric), tuple(categorical), outcome
+
+
+class CompiledPolicy:
+    def __init__(self, version, rules):
+        self.version = version
+        self._rules = rules
+
+    @property
+    def rule_names(self):
+        return [outcome.rule for _, _, outcome in self._rules]
+
+    def evaluate(self, score=None, pd=None, dti=None, utilization=None, risk=None, employment_type=None):
+        """Decision for one applicant; inputs follow INPUTS and may be None when unknown."""
+        values = (score, pd, dti, utilization, _category(risk), _category(employment_type))
+        for numeric, categorical, outcome in self._rules:
+            for index, lower_op, lower, upper_op, upper in numeric:
+                value = values[index]
+                if value is None or not (lower_op(value, lower) and upper_op(value, upper)):
+                    break
+            else:
+                for index, inclusive, members in categorical:
+                    value = values[index]
+                    if value is None or (value in members) is not inclusive:
+                        break
+                else:
+                    return outcome
+        # compile_policy guarantees a catch-all last rule.
+        raise AssertionError("policy has no catch-all rule")
+
+    def evaluate_many(self, **columns):
+        """Decisions for a batch: each keyword is a sequence over applicants (None for unknown values).
+
+        Returns a dict of NumPy arrays: ``rule``, ``decision`` and one per LIMIT_KEYS entry.
+        """
+        import numpy as np
+
+        unknown = set(columns) - set(INPUTS)
+        if unknown:
+            raise PolicyError(f"Unknown inputs: {', '.join(sorted(unknown))}.")
+        sizes = {len(values) for values in columns.values()}
+        if len(sizes) > 1:
+            raise PolicyError("Every input column must have the same length.")
+        size = sizes.pop() if sizes else 0
+
+        arrays = {}
+        for field, values in columns.items():
+            if field in NUMERIC_INPUTS:
+                arrays[_INDEX[field]] = np.asarray(values, dtype=float)
+            else:
+                # Integer codes into the column's distinct values, so membership is one lookup per code.
+                vocabulary = {}
+                codes = np.fromiter(
+                    (vocabulary.setdefault(_category(value), len(vocabulary)) for value in values),
+                    dtype=np.int64,
+                    count=len(values),
+                )
+                arrays[_INDEX[field]] = (codes, list(vocabulary))
+
+        chosen = np.full(size, len(self._rules) - 1, dtype=np.int64)
+        undecided = np.ones(size, dtype=bool)
+        for position, (numeric, categorical, _) in enumerate(self._rules[:-1]):
+            mask = undecided.copy()
+            for index, lower_op, lower, upper_op, upper in numeric:
+                values = arrays.get(index)
+                if values is None:
+                    mask[:] = False
+                    break
+                # NaN (unknown) fails every comparison.
+                mask &= lower_op(values, lower) & upper_op(values, upper)
+            for index, inclusive, members in categorical:
+                column = arrays.get(index)
+                if column is None:
+                    mask[:] = False
+                    break
+                codes, vocabulary = column
+                matches = np.array(
+                    [value is not None and (value in members) is inclusive for value in vocabulary], dtype=bool
+                )
+                mask &= matches[codes]
+            chosen[mask] = position
+            undecided &= ~mask
+
+        outcomes = [outcome for _, _, outcome in self._rules]
+        result = {
+            "rule": np.array([outcome.rule for outcome in outcomes], dtype=object)[chosen],
+            "decision": np.array([outcome.decision for outcome in outcomes], dtype=object)[chosen],
+        }
+        for key in LIMIT_KEYS:
+            result[key] = np.array([outcome.limits[key] for outcome in outcomes])[chosen]
+        return result
+
+
+def compile_policy(spec):
+    if not isinstance(spec, dict) or not spec.get("version"):
+        raise PolicyError("A policy needs a 'version'.")
+    rules = spec.get("rules")
+    if not isinstance(rules, list) or not rules:
+        raise PolicyError("A policy needs a non-empty 'rules' list.")
+    compiled = [_compile_rule(position, rule) for position, rule in enumerate(rules)]
+    if compiled[-1][0] or compiled[-1][1]:
+        raise PolicyError("The last rule must have an empty 'when' so every applicant gets a decision.")
+    return CompiledPolicy(str(spec["version"]), compiled)
+
+
+def load_policy(path):
+    with open(path, encoding="utf-8") as handle:
+        return compile_policy(json.load(handle))
+
+
+class _PolicyStore:
+    """The active policy; checks the file's mtime at most every ``reload_seconds``."""
+
+    def __init__(self, path, reload_seconds):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self._policy = None
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._policy is None or time.monotonic() >= self._next_check:
+            with self._lock:
+                if self._policy is None or time.monotonic() >= self._next_check:
+                    self._refresh()
+                    self._next_check = time.monotonic() + self.reload_seconds
+        return self._policy
+
+    def _refresh(self):
+        try:
+            # A deploy can leave the file missing or half-written for a moment.
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+            policy = load_policy(self.path)
+            self._mtime = mtime
+        except (OSError, ValueError) as exc:
+            if self._policy is None:
+                raise
+            logger.error("Keeping credit policy %s; %s is unreadable or invalid: %s", self._policy.version, self.path, exc)
+            return
+        if self._policy is None or policy.version != self._policy.version:
+            if self._policy is not None:
+                logger.info("Credit policy %s replaced by %s", self._policy.version, policy.version)
+            self._policy = policy
+        else:
+            logger.warning("%s changed without a new version; still using %s", self.path, policy.version)
+
+
+_store = _PolicyStore(
+    getattr(settings, "CREDIT_POLICY_PATH", os.path.join(os.path.dirname(__file__), "policy.json")),
+    getattr(settings, "CREDIT_POLICY_RELOAD_SECONDS", 5),
+)
+
+
+def get_policy():
+    return _store.get()
+
+
+def evaluate(**inputs):
+    return _store.get().evaluate(**inputs)
@@ -0,0 +1,160 @@
+import random
+from datetime import date, datetime
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from evaluation.policy import PolicyError, compile_policy, load_policy, risk_category
+from evaluation.views import EVALUATION_SECTIONS, build_evaluation_payload, parse_evaluation_fields
+
+
+def _limits(max_loan):
+    return {"maxLoan": max_loan, "maxTenureMonths": 24, "interestApr": 14.0}
+
+
+SPEC = {
+    "version": "test",
+    "rules": [
+        {
+            "name": "prime",
+            "when": {"score": {"gte": 740}, "dti": {"lt": 0.35}},
+            "decision": "APPROVE",
+            "limits": _limits(500000),
+        },
+        {
+            "name": "no-students",
+            "when": {"employment_type": {"in": ["Student"]}},
+            "decision": "REJECT",
+            "limits": _limits(0),
+        },
+        {
+            "name": "near-prime",
+            "when": {"score": {"gt": 650, "lte": 740}, "risk": {"not_in": ["HIGH"]}, "pd": {"lt": 0.2}},
+            "decision": "REVIEW",
+            "limits": _limits(200000),
+        },
+        {"name": "fallback", "when": {}, "decision": "REJECT", "limits": _limits(0)},
+    ],
+}
+
+
+class CompilePolicyTests(SimpleTestCase):
+    def test_shipped_policy_compiles(self):
+        policy = load_policy(settings.CREDIT_POLICY_PATH)
+        self.assertTrue(policy.version)
+
+    def test_invalid_specs(self):
+        catch_all = {"name": "fallback", "when": {}, "decision": "REVIEW", "limits": _limits(0)}
+        cases = {
+            "no version": {"rules": [catch_all]},
+            "no rules": {"version": "v", "rules": []},
+            "no catch-all": {"version": "v", "rules": [dict(catch_all, when={"score": {"gte": 1}})]},
+            "unknown input": {"version": "v", "rules": [dict(catch_all, when={"age": {"gte": 18}}), catch_all]},
+            "bad operator": {"version": "v", "rules": [dict(catch_all, when={"score": {"eq": 700}}), catch_all]},
+            "bad bound": {"version": "v", "rules": [dict(catch_all, when={"score": {"gte": "700"}}), catch_all]},
+            "bad list": {"version": "v", "rules": [dict(catch_all, when={"risk": {"in": "LOW"}}), catch_all]},
+            "bad decision": {"version": "v", "rules": [dict(catch_all, decision="MAYBE")]},
+            "missing limits": {"version": "v", "rules": [dict(catch_all, limits={"maxLoan": 1})]},
+        }
+        for label, spec in cases.items():
+            with self.subTest(label):
+                with self.assertRaises(PolicyError):
+                    compile_policy(spec)
+
+
+class EvaluatePolicyTests(SimpleTestCase):
+    policy = compile_policy(SPEC)
+
+    def test_first_matching_rule_wins(self):
+        outcome = self.policy.evaluate(score=760, dti=0.2, employment_type="student")
+        self.assertEqual((outcome.rule, outcome.decision), ("prime", "APPROVE"))
+        self.assertEqual(outcome.limits, _limits(500000))
+
+    def test_bounds(self):
+        self.assertEqual(self.policy.evaluate(score=740, dti=0.35).rule, "fallback")
+        self.assertEqual(self.policy.evaluate(score=740, dti=0.3499).rule, "prime")
+        self.assertEqual(self.policy.evaluate(score=740, pd=0.1, risk="LOW").rule, "near-prime")
+        self.assertEqual(self.policy.evaluate(score=650, pd=0.1, risk="LOW").rule, "fallback")
+
+    def test_categories_are_case_insensitive(self):
+        self.assertEqual(self.policy.evaluate(employment_type=" STUDENT ").rule, "no-students")
+        self.assertEqual(self.policy.evaluate(score=700, pd=0.1, risk="high").rule, "fallback")
+
+    def test_unknown_inputs_never_match(self):
+        self.assertEqual(self.policy.evaluate(score=760).rule, "fallback")
+        self.assertEqual(self.policy.evaluate(score=700, pd=0.1).rule, "fallback")
+        self.assertEqual(self.policy.evaluate().rule, "fallback")
+
+    def test_evaluate_many_matches_evaluate(self):
+        rng = random.Random(7)
+        rows = [
+            {
+                "score": rng.choice([None, rng.randint(300, 850)]),
+                "pd": rng.choice([None, rng.random() * 0.4]),
+                "dti": rng.choice([None, rng.random() * 0.6]),
+                "utilization": rng.random() * 100,
+                "risk": rng.choice([None, "LOW", "medium", "HIGH"]),
+                "employment_type": rng.choice([None, "salaried", "Student", "self-employed"]),
+            }
+            for _ in range(2000)
+        ]
+        columns = {name: [row[name] for row in rows] for name in rows[0]}
+        result = self.policy.evaluate_many(**columns)
+        for index, row in enumerate(rows):
+            outcome = self.policy.evaluate(**row)
+            self.assertEqual(result["rule"][index], outcome.rule)
+            self.assertEqual(result["decision"][index], outcome.decision)
+            self.assertEqual(result["maxLoan"][index], outcome.limits["maxLoan"])
+
+    def test_evaluate_many_with_missing_columns(self):
+        result = self.policy.evaluate_many(score=[760, 700], employment_type=["student", "salaried"])
+        self.assertEqual(result["rule"].tolist(), ["no-students", "fallback"])
+
+    def test_evaluate_many_rejects_bad_columns(self):
+        with self.assertRaises(PolicyError):
+            self.policy.evaluate_many(age=[30])
+        with self.assertRaises(PolicyError):
+            self.policy.evaluate_many(score=[700, 710], pd=[0.1])
+
+
+class RiskCategoryTests(SimpleTestCase):
+    def test_stored_level_wins(self):
+        self.assertEqual(risk_category(820, "high"), "HIGH")
+
+    def test_score_bands_otherwise(self):
+        for score, level, expected in ((700, None, "LOW"), (650, "", "MEDIUM"), (649, "unknown", "HIGH")):
+            with self.subTest(score=score, level=level):
+                self.assertEqual(risk_category(score, level), expected)
+
+
+class ParseEvaluationFieldsTests(SimpleTestCase):
+    def test_defaults_to_every_section(self):
+        self.assertEqual(parse_evaluation_fields({}), (frozenset(EVALUATION_SECTIONS), False))
+
+    def test_selected_sections(self):
+        sections, compact = parse_evaluation_fields({"fields": " decision, history,,", "compact": "True"})
+        self.assertEqual(sections, {"decision", "history"})
+        self.assertTrue(compact)
+
+    def test_unknown_section(self):
+        with self.assertRaisesMessage(ValueError, "Unknown fields: score."):
+            parse_evaluation_fields({"fields": "decision,score"})
+
+
+@mock.patch("evaluation.policy._store.get", return_value=compile_policy(SPEC))
+class BuildEvaluationPayloadTests(SimpleTestCase):
+    score_rows = [(760, "low", "{}", datetime(2024, 3, 1, 12, 0))]
+
+    def decide(self, monthly_income, obligations):
+        user_row = (7, "Sita Rai", "sita", date(1995, 4, 2), "9800000000", "Pokhara", monthly_income, "Salaried")
+        # accounts.quote_features: income, employment type, total limit, total balance, monthly obligations.
+        limit_row = (monthly_income, "Salaried", 100000, 20000, obligations)
+        return build_evaluation_payload(user_row, self.score_rows, limit_row, None, sections=("decision",))["evaluation"]
+
+    def test_decision_uses_the_quote_dti(self, _):
+        self.assertEqual(self.decide(100000, 20000)["policyRule"], "prime")
+        self.assertEqual(self.decide(100000, 40000)["policyRule"], "fallback")
+
+    def test_unknown_income_fails_dti_conditions(self, _):
+        self.assertEqual(self.decide(None, 0)["policyRule"], "fallback")
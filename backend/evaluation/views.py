@@ -1,7 +1,6 @@
 from collections import defaultdict
 from datetime import datetime, timedelta
 
-import jwt
 from django.conf import settings
 from django.db import connection
 from rest_framework import status
@@ -9,8 +8,16 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from creditscore_calculator.services import record_score_snapshot
+from authentication.services import has_admin_claim
+from core.db import queries
+from creditscore_calculator.services import load_factors, record_score_snapshot
 from daulterprobability.services import as_percentage, calculate_default_probability
+from evaluation import policy
+from notifications.services import LOAN_APPROVED, LOAN_REJECTED, SETTLEMENT_APPROVED, SETTLEMENT_REJECTED, notify_user
+from payments import quote
+from payments.services import dpd_bucket
+
+MAX_USER_ID = 2**63 - 1
 
 
 def _normalize_applicant_lookup(applicant_id):
@@ -18,196 +25,115 @@ def _normalize_applicant_lookup(applicant_id):
     if not raw:
         return None, None
 
-    if raw.upper().startswith("APP-"):
-        suffix = raw[4:]
-        if suffix.isdigit():
-            return str(int(suffix)), raw
-
-    if raw.isdigit():
-        return str(int(raw)), raw
+    digits = raw[4:] if raw.upper().startswith("APP-") else raw
+    # Out-of-range ids cannot match a BIGINT user_id; fall back to the username lookup.
+    if digits.isdigit() and int(digits) <= MAX_USER_ID:
+        return str(int(digits)), raw
 
     return None, raw
 
 
-def _risk_category(score, stored_risk_level):
-    if stored_risk_level:
-        level = str(stored_risk_level).upper()
-        if level in {"LOW", "MEDIUM", "HIGH"}:
-            return level
-    if score >= 700:
-        return "LOW"
-    if score >= 650:
-        return "MEDIUM"
-    return "HIGH"
-
-
-def _decision_for_risk(risk_category):
-    return {
-        "LOW": "APPROVE",
-        "MEDIUM": "REVIEW",
-        "HIGH": "REJECT",
-    }.get(risk_category, "REVIEW")
-
-
 def _resolve_user(applicant_id):
     normalized_user_id, normalized_username = _normalize_applicant_lookup(applicant_id)
     with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT user_id, full_name, username, dob, phone, address, monthly_income, employment_type
-            FROM users
-            WHERE (%s IS NOT NULL AND CAST(user_id AS TEXT) = %s)
-               OR LOWER(username) = LOWER(%s)
-            LIMIT 1
-            """,
-            [normalized_user_id, normalized_user_id, normalized_username],
+        return queries.fetchone(
+            cursor,
+            queries.USERS_RESOLVE_APPLICANT,
+            [normalized_user_id, normalized_username],
         )
-        return cursor.fetchone()
 
 
 def _extract_admin_claim(request):
-    auth_header = request.headers.get("Authorization", "")
-    if not auth_header.startswith("Bearer "):
-        return False
-
-    token = auth_header.split(" ", 1)[1].strip()
-    if not token:
-        return False
-
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-    except jwt.InvalidTokenError:
-        return False
-
-    return bool(payload.get("is_admin"))
+    return has_admin_claim(request)
 
 
-def _pending_items_for_user(user_id):
+def build_pending_items(loan_rows, settlement_rows):
     pending = []
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT account_id, account_type, purpose, current_balance, opened_date
-            FROM credit_accounts
-            WHERE user_id = %s AND status = 'pending_approval'
-            ORDER BY account_id DESC
-            """,
-            [user_id],
+    for account_id, account_type, purpose, amount, opened_date in loan_rows:
+        pending.append(
+            {
+                "id": str(account_id),
+                "type": "LOAN",
+                "requestId": str(account_id),
+                "title": account_type.replace("_", " ").title(),
+                "purpose": purpose,
+                "amount": float(amount or 0),
+                "createdAt": opened_date.isoformat() if hasattr(opened_date, "isoformat") else str(opened_date),
+                "status": "PENDING_APPROVAL",
+            }
         )
-        for account_id, account_type, purpose, amount, opened_date in cursor.fetchall():
-            pending.append(
-                {
-                    "id": str(account_id),
-                    "type": "LOAN",
-                    "requestId": str(account_id),
-                    "title": account_type.replace("_", " ").title(),
-                    "purpose": purpose,
-                    "amount": float(amount or 0),
-                    "createdAt": opened_date.isoformat() if hasattr(opened_date, "isoformat") else str(opened_date),
-                    "status": "PENDING_APPROVAL",
-                }
-            )
 
-        cursor.execute(
-            """
-            SELECT p.payment_id, p.account_id, p.amount_due, p.due_date, ca.account_type
-            FROM payments p
-            JOIN credit_accounts ca ON ca.account_id = p.account_id
-            WHERE ca.user_id = %s AND p.status = 'pending_approval'
-            ORDER BY p.payment_id DESC
-            """,
-            [user_id],
+    for payment_id, account_id, amount_due, due_date, account_type in settlement_rows:
+        pending.append(
+            {
+                "id": str(payment_id),
+                "type": "SETTLEMENT",
+                "requestId": str(payment_id),
+                "loanId": str(account_id),
+                "title": f"{account_type.replace('_', ' ').title()} settlement",
+                "amount": float(amount_due or 0),
+                "createdAt": due_date.isoformat() if hasattr(due_date, "isoformat") else str(due_date),
+                "status": "PENDING_APPROVAL",
+            }
         )
-        for payment_id, account_id, amount_due, due_date, account_type in cursor.fetchall():
-            pending.append(
-                {
-                    "id": str(payment_id),
-                    "type": "SETTLEMENT",
-                    "requestId": str(payment_id),
-                    "loanId": str(account_id),
-                    "title": f"{account_type.replace('_', ' ').title()} settlement",
-                    "amount": float(amount_due or 0),
-                    "createdAt": due_date.isoformat() if hasattr(due_date, "isoformat") else str(due_date),
-                    "status": "PENDING_APPROVAL",
-                }
-            )
 
     return pending
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def evaluation(request, applicant_id):
-    user_row = _resolve_user(applicant_id)
-    if not user_row:
-        return Response({"detail": "Evaluation not found."}, status=status.HTTP_404_NOT_FOUND)
-
-    user_id, full_name, username, dob, phone, address, monthly_income, employment_type = user_row
-
+def _pending_items_for_user(user_id):
     with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT score, risk_level, factors, calculated_at
-            FROM score_history
-            WHERE user_id = %s
-            ORDER BY calculated_at DESC
-            LIMIT 1
-            """,
-            [user_id],
-        )
-        score_row = cursor.fetchone()
-
-        if not score_row:
-            # New signups may not have any score snapshots yet.
-            # Create an initial snapshot so the evaluation page can load.
-            record_score_snapshot(user_id)
-            cursor.execute(
-                """
-                SELECT score, risk_level, factors, calculated_at
-                FROM score_history
-                WHERE user_id = %s
-                ORDER BY calculated_at DESC
-                LIMIT 1
-                """,
-                [user_id],
+        loan_rows = queries.fetchall(cursor, queries.ACCOUNTS_PENDING_FOR_USER, [user_id])
+        settlement_rows = queries.fetchall(cursor, queries.PAYMENTS_PENDING_FOR_USER, [user_id])
+
+    return build_pending_items(loan_rows, settlement_rows)
+
+
+EVALUATION_SECTIONS = ("applicant", "decision", "breakdown", "history", "pendingApprovals")
+# Sections that read score snapshots, and the ones that also need account utilization.
+SCORED_SECTIONS = frozenset({"decision", "breakdown", "history"})
+UTILIZATION_SECTIONS = frozenset({"decision", "breakdown"})
+
+FACTOR_WEIGHTS = [
+    ("payment_history", "Payment History", 0.25),
+    ("credit_utilization", "Credit Utilization", 0.18),
+    ("credit_age", "Length of Credit History", 0.10),
+    ("credit_mix", "Credit Mix", 0.08),
+    ("inquiries", "Recent Credit Inquiries", 0.08),
+    ("debt_to_income", "Debt-to-Income Ratio", 0.10),
+    ("income_stability", "Income Stability", 0.08),
+    ("employment_history", "Employment History", 0.05),
+    ("delinquencies", "Delinquencies / Public Records", 0.05),
+    ("collateral_strength", "Collateral / Asset Strength", 0.03),
+]
+
+
+def parse_evaluation_fields(params):
+    """Read ``?fields=decision,history`` and ``?compact=1``; raises ValueError for an unknown section."""
+    sections = frozenset(EVALUATION_SECTIONS)
+    requested = {part.strip() for part in (params.get("fields") or "").split(",") if part.strip()}
+    if requested:
+        unknown = requested - sections
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(sorted(unknown))}. Expected any of {', '.join(EVALUATION_SECTIONS)}."
             )
-            score_row = cursor.fetchone()
+        sections = frozenset(requested)
+    compact = str(params.get("compact", "")).lower() in {"1", "true", "yes"}
+    return sections, compact
 
-        if not score_row:
-            return Response(
-                {"detail": "No score history available for this applicant."},
-                status=status.HTTP_404_NOT_FOUND,
-            )
 
-        score, risk_level, factors, calculated_at = score_row
-
-        cursor.execute(
-            """
-            SELECT score, calculated_at
-            FROM score_history
-            WHERE user_id = %s
-            ORDER BY calculated_at DESC
-            LIMIT 6
-            """,
-            [user_id],
-        )
-        history_rows = cursor.fetchall()
-
-        cursor.execute(
-            """
-            SELECT
-                COALESCE(SUM(credit_limit), 0) AS total_limit,
-                COALESCE(SUM(current_balance), 0) AS total_balance
-            FROM credit_accounts
-            WHERE user_id = %s AND status = 'active'
-            """,
-            [user_id],
-        )
-        total_limit, total_balance = cursor.fetchone()
+def score_statement(sections):
+    """History shows the recent snapshots; everything else only needs the latest one."""
+    return queries.SCORES_RECENT if "history" in sections else queries.SCORES_LATEST
 
-    utilization_pct = float((total_balance / total_limit) * 100) if total_limit else 0.0
 
-    latest_factors = factors if isinstance(factors, dict) else {}
+def limit_params(user_id):
+    """Params for accounts.quote_features: balances for utilization and the obligations behind DTI."""
+    return [settings.QUOTE_REVOLVING_PAYMENT_RATE, user_id]
+
+
+def _breakdown(factors, utilization_pct):
+    latest_factors = load_factors(factors)
     factor_values = defaultdict(
         int,
         {
@@ -224,21 +150,8 @@ def evaluation(request, applicant_id):
         },
     )
 
-    factor_weights = [
-        ("payment_history", "Payment History", 0.25),
-        ("credit_utilization", "Credit Utilization", 0.18),
-        ("credit_age", "Length of Credit History", 0.10),
-        ("credit_mix", "Credit Mix", 0.08),
-        ("inquiries", "Recent Credit Inquiries", 0.08),
-        ("debt_to_income", "Debt-to-Income Ratio", 0.10),
-        ("income_stability", "Income Stability", 0.08),
-        ("employment_history", "Employment History", 0.05),
-        ("delinquencies", "Delinquencies / Public Records", 0.05),
-        ("collateral_strength", "Collateral / Asset Strength", 0.03),
-    ]
-
     breakdown = []
-    for key, label, weight in factor_weights:
+    for key, label, weight in FACTOR_WEIGHTS:
         value = max(0, min(100, int(factor_values[key])))
         max_points = int(weight * 1000)
         points = round((value / 100) * max_points, 1)
@@ -251,73 +164,143 @@ def evaluation(request, applicant_id):
                 "maxPoints": max_points,
             }
         )
+    return breakdown
 
-    positives = [
-        f"{item['label']} is strong."
-        for item in breakdown
-        if item["maxPoints"] and (item["points"] / item["maxPoints"]) >= 0.75
-    ]
-    negatives = [
-        f"{item['label']} needs improvement."
-        for item in breakdown
-        if item["maxPoints"] and (item["points"] / item["maxPoints"]) < 0.55
-    ]
-
-    risk_category = _risk_category(int(score), risk_level)
-    default_probability = calculate_default_probability(
-        int(score), risk_category=risk_category, utilization_pct=utilization_pct
-    )
-    decision = _decision_for_risk(risk_category)
 
-    if risk_category == "LOW":
-        limits = {"maxLoan": 500000, "maxTenureMonths": 48, "interestApr": 12.5}
-    elif risk_category == "MEDIUM":
-        limits = {"maxLoan": 250000, "maxTenureMonths": 30, "interestApr": 16.0}
-    else:
-        limits = {"maxLoan": 100000, "maxTenureMonths": 18, "interestApr": 22.0}
+def build_evaluation_payload(user_row, score_rows, limit_row, pending_items, sections=EVALUATION_SECTIONS, compact=False):
+    """Assemble the requested sections; inputs a section does not need may be None.
 
-    history = [
-        {
-            "date": row[1].date().isoformat() if hasattr(row[1], "date") else str(row[1]),
-            "score": int(row[0]),
-            "event": "Evaluation snapshot",
+    score_rows are the newest-first snapshots from scores.recent (or scores.latest when
+    history is not requested); the first one is evaluated. limit_row is the
+    accounts.quote_features row (see limit_params), so the decision sees the
+    same DTI as a quote. ``compact`` drops the duplicate aliases (riskCategory,
+    loanApprovalRecommendation, creditScoreFactors).
+    """
+    user_id, full_name, username, dob, phone, address, monthly_income, employment_type = user_row
+    payload = {}
+    evaluation = {}
+
+    if "applicant" in sections:
+        payload["applicant"] = {
+            "id": f"APP-{int(user_id):05d}",
+            "fullName": full_name or username,
+            "dob": dob.isoformat() if hasattr(dob, "isoformat") else dob,
+            "phone": phone,
+            "address": address,
+            "monthlyIncome": float(monthly_income) if monthly_income is not None else None,
+            "employmentType": employment_type,
         }
-        for row in reversed(history_rows)
-    ]
 
-    canonical_applicant_id = f"APP-{int(user_id):05d}"
+    if SCORED_SECTIONS & set(sections):
+        score, risk_level, factors, calculated_at = score_rows[0]
+    if UTILIZATION_SECTIONS & set(sections):
+        _, _, total_limit, total_balance, monthly_obligations = limit_row
+        utilization_pct = float((total_balance / total_limit) * 100) if total_limit else 0.0
+
+    if "decision" in sections:
+        risk_category = policy.risk_category(int(score), risk_level)
+        default_probability = calculate_default_probability(
+            int(score), risk_category=risk_category, utilization_pct=utilization_pct
+        )
+        outcome = policy.evaluate(
+            score=int(score),
+            pd=default_probability,
+            dti=quote.debt_to_income(float(monthly_obligations), float(monthly_income or 0)),
+            utilization=utilization_pct,
+            risk=risk_category,
+            employment_type=employment_type,
+        )
+        decision = outcome.decision
+
+        evaluation["evaluationId"] = f"EVAL-{user_id}-{calculated_at.strftime('%Y%m%d%H%M%S')}"
+        evaluation["createdAt"] = calculated_at.isoformat() if hasattr(calculated_at, "isoformat") else str(calculated_at)
+        evaluation["creditScore"] = int(score)
+        evaluation["riskBand"] = risk_category
+        if not compact:
+            evaluation["riskCategory"] = risk_category
+        evaluation["probabilityOfDefault"] = default_probability
+        evaluation["defaultProbabilityPercent"] = as_percentage(default_probability)
+        evaluation["decision"] = decision
+        if not compact:
+            evaluation["loanApprovalRecommendation"] = decision
+        evaluation["notes"] = "Generated from latest score history and account utilization."
+        evaluation["limits"] = dict(outcome.limits)
+        if not compact:
+            evaluation["policyRule"] = outcome.rule
+
+    if "breakdown" in sections:
+        breakdown = _breakdown(factors, utilization_pct)
+        evaluation["breakdown"] = breakdown
+        if not compact:
+            evaluation["creditScoreFactors"] = breakdown
+        evaluation["positiveFactors"] = [
+            f"{item['label']} is strong."
+            for item in breakdown
+            if item["maxPoints"] and (item["points"] / item["maxPoints"]) >= 0.75
+        ]
+        evaluation["negativeFactors"] = [
+            f"{item['label']} needs improvement."
+            for item in breakdown
+            if item["maxPoints"] and (item["points"] / item["maxPoints"]) < 0.55
+        ]
+
+    if "history" in sections:
+        evaluation["history"] = [
+            {
+                "date": row[3].date().isoformat() if hasattr(row[3], "date") else str(row[3]),
+                "score": int(row[0]),
+                "event": "Evaluation snapshot",
+            }
+            for row in reversed(score_rows)
+        ]
+
+    if "pendingApprovals" in sections:
+        evaluation["pendingApprovals"] = pending_items
+
+    payload["evaluation"] = evaluation
+    return payload
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def evaluation(request, applicant_id):
+    """``?fields=`` limits the response to some of EVALUATION_SECTIONS; sections left out are not queried."""
+    try:
+        sections, compact = parse_evaluation_fields(request.query_params)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    user_row = _resolve_user(applicant_id)
+    if not user_row:
+        return Response({"detail": "Evaluation not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    user_id = user_row[0]
+    score_rows = limit_row = pending_items = None
+
+    with connection.cursor() as cursor:
+        if SCORED_SECTIONS & sections:
+            score_rows = queries.fetchall(cursor, score_statement(sections), [user_id])
+
+            if not score_rows:
+                # New signups may not have any score snapshots yet.
+                # Create an initial snapshot so the evaluation page can load.
+                record_score_snapshot(user_id)
+                score_rows = queries.fetchall(cursor, score_statement(sections), [user_id])
+
+            if not score_rows:
+                return Response(
+                    {"detail": "No score history available for this applicant."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+        if UTILIZATION_SECTIONS & sections:
+            limit_row = queries.fetchone(cursor, queries.ACCOUNTS_QUOTE_FEATURES, limit_params(user_id))
+
+    if "pendingApprovals" in sections:
+        pending_items = _pending_items_for_user(user_id)
 
     return Response(
-        {
-            "applicant": {
-                "id": canonical_applicant_id,
-                "fullName": full_name or username,
-                "dob": dob.isoformat() if hasattr(dob, "isoformat") else dob,
-                "phone": phone,
-                "address": address,
-                "monthlyIncome": float(monthly_income) if monthly_income is not None else None,
-                "employmentType": employment_type,
-            },
-            "evaluation": {
-                "evaluationId": f"EVAL-{user_id}-{calculated_at.strftime('%Y%m%d%H%M%S')}",
-                "createdAt": calculated_at.isoformat() if hasattr(calculated_at, "isoformat") else str(calculated_at),
-                "creditScore": int(score),
-                "riskBand": risk_category,
-                "riskCategory": risk_category,
-                "probabilityOfDefault": default_probability,
-                "defaultProbabilityPercent": as_percentage(default_probability),
-                "decision": decision,
-                "loanApprovalRecommendation": decision,
-                "notes": "Generated from latest score history and account utilization.",
-                "limits": limits,
-                "breakdown": breakdown,
-                "creditScoreFactors": breakdown,
-                "positiveFactors": positives,
-                "negativeFactors": negatives,
-                "history": history,
-                "pendingApprovals": _pending_items_for_user(user_id),
-            },
-        },
+        build_evaluation_payload(user_row, score_rows, limit_row, pending_items, sections, compact),
         status=status.HTTP_200_OK,
     )
 
@@ -348,63 +331,27 @@ def evaluation_approval(request, applicant_id):
 
     with connection.cursor() as cursor:
         if request_type == "LOAN":
-            cursor.execute(
-                """
-                SELECT account_id, current_balance, account_type
-                FROM credit_accounts
-                WHERE account_id = %s AND user_id = %s AND status = 'pending_approval'
-                """,
-                [request_id, user_id],
-            )
-            account_row = cursor.fetchone()
+            account_row = queries.fetchone(cursor, queries.ACCOUNTS_PENDING_BY_ID, [request_id, user_id])
             if not account_row:
                 return Response({"error": "Pending loan request not found."}, status=status.HTTP_404_NOT_FOUND)
 
             account_id, current_balance, _ = account_row
             if action == "REJECT":
-                cursor.execute(
-                    """
-                    UPDATE credit_accounts
-                    SET status = 'rejected'
-                    WHERE account_id = %s
-                    """,
-                    [account_id],
-                )
+                queries.execute(cursor, queries.ACCOUNTS_SET_STATUS, ["rejected", account_id])
+                quote.forget_user(user_id)
+                notify_user(user_id, LOAN_REJECTED, {"loanId": str(account_id)})
                 return Response({"message": "Loan request rejected."}, status=status.HTTP_200_OK)
 
             due_date = datetime.utcnow().date() + timedelta(days=30)
-            cursor.execute(
-                """
-                UPDATE credit_accounts
-                SET status = 'active'
-                WHERE account_id = %s
-                """,
-                [account_id],
-            )
-            cursor.execute(
-                """
-                INSERT INTO payments (account_id, due_date, amount_due, amount_paid, status)
-                VALUES (%s, %s, %s, 0, 'due')
-                """,
-                [account_id, due_date, float(current_balance or 0)],
-            )
+            queries.execute(cursor, queries.ACCOUNTS_SET_STATUS, ["active", account_id])
+            queries.execute(cursor, queries.PAYMENTS_INSERT_DUE, [account_id, due_date, float(current_balance or 0)])
 
+            quote.forget_user(user_id)
+            notify_user(user_id, LOAN_APPROVED, {"loanId": str(account_id)})
             record_score_snapshot(user_id, inquiry_penalty=8)
             return Response({"message": "Loan request approved."}, status=status.HTTP_200_OK)
 
-        cursor.execute(
-            """
-            SELECT p.payment_id, p.account_id, p.amount_due, ca.current_balance
-            FROM payments p
-            JOIN credit_accounts ca ON ca.account_id = p.account_id
-            WHERE p.payment_id = %s
-              AND p.status = 'pending_approval'
-              AND ca.user_id = %s
-              AND ca.status = 'active'
-            """,
-            [request_id, user_id],
-        )
-        settlement_row = cursor.fetchone()
+        settlement_row = queries.fetchone(cursor, queries.PAYMENTS_PENDING_SETTLEMENT_BY_ID, [request_id, user_id])
         if not settlement_row:
             return Response({"error": "Pending settlement request not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -413,7 +360,8 @@ def evaluation_approval(request, applicant_id):
         current_balance = float(current_balance or 0)
 
         if action == "REJECT":
-            cursor.execute("UPDATE payments SET status = 'rejected' WHERE payment_id = %s", [payment_id])
+            queries.execute(cursor, queries.PAYMENTS_REJECT, [payment_id])
+            notify_user(user_id, SETTLEMENT_REJECTED, {"requestId": str(payment_id), "loanId": str(account_id)})
             return Response({"message": "Settlement request rejected."}, status=status.HTTP_200_OK)
 
         if settle_amount - current_balance > eps:
@@ -426,17 +374,7 @@ def evaluation_approval(request, applicant_id):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cursor.execute(
-            """
-            SELECT payment_id, due_date, amount_due, amount_paid
-            FROM payments
-            WHERE account_id = %s AND status = 'due'
-            ORDER BY due_date ASC, payment_id ASC
-            LIMIT 1
-            """,
-            [account_id],
-        )
-        due_payment = cursor.fetchone()
+        due_payment = queries.fetchone(cursor, queries.PAYMENTS_OLDEST_OPEN_INSTALLMENT, [account_id])
 
         settled_on_time = True
         if due_payment:
@@ -447,20 +385,16 @@ def evaluation_approval(request, applicant_id):
             updated_paid = min(amount_due, amount_paid + settle_amount)
             remaining_due = max(0.0, amount_due - updated_paid)
 
-            if datetime.utcnow().date() > due_date:
-                payment_status = "late" if remaining_due <= eps else "due"
+            days_past_due = max(0, (datetime.utcnow().date() - due_date).days)
+            if days_past_due > 0:
+                payment_status = "late"
             else:
                 payment_status = "paid" if remaining_due <= eps else "due"
 
-            cursor.execute(
-                """
-                UPDATE payments
-                SET paid_date = CURRENT_DATE,
-                    amount_paid = %s,
-                    status = %s
-                WHERE payment_id = %s
-                """,
-                [updated_paid, payment_status, due_payment_id],
+            queries.execute(
+                cursor,
+                queries.PAYMENTS_APPLY_INSTALLMENT,
+                [updated_paid, payment_status, days_past_due, dpd_bucket(days_past_due), due_payment_id, due_date],
             )
             settled_on_time = payment_status != "late"
 
@@ -469,27 +403,20 @@ def evaluation_approval(request, applicant_id):
             new_balance = 0.0
         new_status = "closed" if new_balance == 0.0 else "active"
 
-        cursor.execute(
-            """
-            UPDATE credit_accounts
-            SET current_balance = %s,
-                status = %s
-            WHERE account_id = %s
-            """,
-            [new_balance, new_status, account_id],
-        )
-
-        cursor.execute(
-            """
-            UPDATE payments
-            SET paid_date = CURRENT_DATE,
-                amount_paid = amount_due,
-                status = 'approved'
-            WHERE payment_id = %s
-            """,
-            [payment_id],
-        )
+        queries.execute(cursor, queries.ACCOUNTS_UPDATE_BALANCE, [new_balance, new_status, account_id])
+        queries.execute(cursor, queries.PAYMENTS_APPROVE_SETTLEMENT, [payment_id])
 
+    quote.forget_user(user_id)
+    notify_user(
+        user_id,
+        SETTLEMENT_APPROVED,
+        {
+            "requestId": str(payment_id),
+            "loanId": str(account_id),
+            "remainingBalance": round(new_balance, 2),
+            "closed": new_status == "closed",
+        },
+    )
     recovery_points = 8 if new_balance == 0.0 and settled_on_time else 0
     record_score_snapshot(user_id, inquiry_penalty=-recovery_points)
     return Response({"message": "Settlement request approved."}, status=status.HTTP_200_OK)
@@ -0,0 +1,103 @@
+"""One LISTEN connection per process, fanned out to the open event streams.
+
+Streams subscribe with their user_id and get a bounded asyncio.Queue; the
+listener task starts with the first subscriber, parses each notification once
+and hands it to that user's queues only. A stream that falls behind loses its
+oldest events rather than holding memory. After a reconnect every stream gets
+a ``resync`` event, since notifications sent while disconnected are lost.
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+
+import psycopg
+from django.conf import settings
+from psycopg import sql
+
+from core.db.aio import _conninfo
+
+logger = logging.getLogger(__name__)
+
+RESYNC = "resync"
+
+
+class Broker:
+    def __init__(self, channel):
+        self.channel = channel
+        self._subscribers = {}
+        self._task = None
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=max(1, settings.SSE_QUEUE_SIZE))
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    @property
+    def stream_count(self):
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, user_id, event, data):
+        for queue in self._subscribers.get(user_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait((event, data))
+
+    def broadcast(self, event, data):
+        for user_id in list(self._subscribers):
+            self.publish(user_id, event, data)
+
+    def dispatch(self, payload):
+        try:
+            message = json.loads(payload)
+            user_id = int(message["user_id"])
+            event = str(message["event"])
+        except (ValueError, TypeError, KeyError):
+            logger.warning("Ignoring malformed notification %r", payload[:200])
+            return
+        if user_id in self._subscribers:
+            self.publish(user_id, event, message.get("data") or {})
+
+    async def _listen(self):
+        delay = 0.5
+        connected_before = False
+        # Stops once the last stream closes; the next subscriber starts a fresh task.
+        while self._subscribers:
+            try:
+                # NOTIFY is not replicated, so always listen on the primary.
+                async with await psycopg.AsyncConnection.connect(_conninfo("default"), autocommit=True) as conn:
+                    await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                    if connected_before:
+                        self.broadcast(RESYNC, {})
+                    connected_before = True
+                    delay = 0.5
+                    while self._subscribers:
+                        async for notify in conn.notifies(timeout=settings.SSE_HEARTBEAT_SECONDS):
+                            self.dispatch(notify.payload)
+            except (psycopg.OperationalError, psycopg.InterfaceError):
+                logger.warning("Notification listener lost its connection; retrying in %.1fs", delay, exc_info=True)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+
+_brokers = weakref.WeakKeyDictionary()
+
+
+def get_broker():
+    """The broker for the running event loop; under ASGI that is one per worker process."""
+    loop = asyncio.get_running_loop()
+    broker = _brokers.get(loop)
+    if broker is None:
+        broker = _brokers[loop] = Broker(settings.NOTIFY_CHANNEL)
+    return broker
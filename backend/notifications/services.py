@@ -0,0 +1,25 @@
+"""Per-user events for the SSE stream, raised with pg_notify.
+
+NOTIFY is transactional: inside ``transaction.atomic()`` the event goes out on
+commit and is dropped on rollback, so listeners never see a change that did
+not happen. Payloads stay small (Postgres caps them at 8000 bytes); clients
+refetch the details they need.
+"""
+
+from django.conf import settings
+from django.db import connection
+
+from core.db import queries
+from core.renderers import dumps
+
+LOAN_APPROVED = "loan.approved"
+LOAN_REJECTED = "loan.rejected"
+SETTLEMENT_APPROVED = "settlement.approved"
+SETTLEMENT_REJECTED = "settlement.rejected"
+SCORE_UPDATED = "score.updated"
+
+
+def notify_user(user_id, event, data=None):
+    payload = dumps({"user_id": user_id, "event": event, "data": data or {}}).decode()
+    with connection.cursor() as cursor:
+        queries.execute(cursor, queries.NOTIFY_USER_EVENT, [settings.NOTIFY_CHANNEL, payload])
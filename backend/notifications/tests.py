@@ -0,0 +1,19 @@
+from io import BytesIO
+from unittest import mock
+
+from django.core.handlers.asgi import ASGIRequest
+from django.test import RequestFactory, SimpleTestCase
+
+from notifications.views import event_stream
+
+
+class EventStreamTests(SimpleTestCase):
+    async def test_refused_under_wsgi(self):
+        response = await event_stream(RequestFactory().get("/api/events/"))
+        self.assertEqual(response.status_code, 501)
+
+    @mock.patch("notifications.views.aget_authenticated_user", mock.AsyncMock(return_value=(None, None)))
+    async def test_asgi_requests_reach_authentication(self):
+        scope = {"type": "http", "method": "GET", "path": "/api/events/", "query_string": b"", "headers": []}
+        response = await event_stream(ASGIRequest(scope, BytesIO()))
+        self.assertEqual(response.status_code, 401)
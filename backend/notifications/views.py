@@ -0,0 +1,61 @@
+"""``GET /api/events/``: Server-Sent Events for the signed-in user (ASGI only).
+
+The browser's EventSource cannot send an Authorization header, so the JWT may
+also come as ``?token=``. Streams end after SSE_MAX_STREAM_SECONDS and the
+browser reconnects on its own; that bounds how long a stream whose client went
+away unnoticed can hold a subscription.
+"""
+
+import asyncio
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseNotAllowed, StreamingHttpResponse
+from rest_framework import status
+
+from authentication.services import aget_authenticated_user
+from core.renderers import dumps, json_response
+
+from .listener import get_broker
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+async def _stream(user_id):
+    broker = get_broker()
+    queue = broker.subscribe(user_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SSE_MAX_STREAM_SECONDS
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=min(settings.SSE_HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from timing the stream out.
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event, data)
+    finally:
+        broker.unsubscribe(user_id, queue)
+
+
+async def event_stream(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not isinstance(request, ASGIRequest):
+        # Under WSGI the stream would hold a worker thread for its whole lifetime. EventSource
+        # does not reconnect after an error status, so the browser stops asking.
+        return json_response({"error": "Live events need the ASGI server."}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+    username, user_data = await aget_authenticated_user(request, allow_query_token=True)
+    if not username or not user_data:
+        return json_response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    response = StreamingHttpResponse(_stream(user_data["user_id"]), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # nginx buffers proxied responses by default, which would hold events back.
+    response["X-Accel-Buffering"] = "no"
+    return response
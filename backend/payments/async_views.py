@@ -0,0 +1,32 @@
+from django.http import HttpResponseNotAllowed
+from rest_framework import status
+
+from authentication.services import aget_authenticated_user
+from core.db import aio, queries
+from core.renderers import json_response
+
+from .views import build_history_payload, build_loans_payload
+
+
+async def payment_loans_async(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    username, user_data = await aget_authenticated_user(request)
+    if not username or not user_data:
+        return json_response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    rows = await aio.fetchall(queries.ACCOUNTS_ACTIVE_LOANS, [user_data["user_id"]])
+    return json_response({"loans": build_loans_payload(rows)}, status=status.HTTP_200_OK)
+
+
+async def payment_history_async(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    username, user_data = await aget_authenticated_user(request)
+    if not username or not user_data:
+        return json_response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    rows = await aio.fetchall(queries.PAYMENTS_HISTORY_FOR_USER, [user_data["user_id"]])
+    return json_response({"history": build_history_payload(rows)}, status=status.HTTP_200_OK)
@@ -0,0 +1,191 @@
+"""Idempotency-Key support for the loan POSTs.
+
+A client that retries a request with the same ``Idempotency-Key`` gets the
+first response back (with ``Idempotent-Replayed: true``) instead of a second
+loan or settlement. Keys are scoped per user and per endpoint and live in
+``idempotency_keys`` until they expire; each process keeps the most recent
+ones in memory so replays do not touch the database at all.
+
+Concurrent duplicates are single-flighted: a striped thread lock serialises
+them inside a process and a transaction-scoped advisory lock across
+processes, so only the first one runs the view. The view runs in the same
+transaction as the key insert, so the writes and the stored response commit
+together or not at all.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from authentication.services import get_authenticated_user
+from core.db import queries
+from core.renderers import dumps
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class _ResponseCache:
+    """Per-process LRU of (user_id, scope, key) -> (request_hash, status_code, body), bounded by TTL."""
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_response_cache = _ResponseCache(
+    getattr(settings, "IDEMPOTENCY_CACHE_SIZE", 2048),
+    getattr(settings, "IDEMPOTENCY_KEY_TTL_SECONDS", 86400),
+)
+
+# Striped so memory stays flat however many keys are in flight; a collision only serialises two requests.
+_key_locks = [threading.Lock() for _ in range(64)]
+
+
+def _request_hash(request):
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(b"\0")
+    digest.update(request.get_full_path().encode())
+    digest.update(b"\0")
+    digest.update(request.body or b"")
+    return digest.hexdigest()
+
+
+def _replay(request_hash, stored):
+    stored_hash, status_code, body = stored
+    if stored_hash != request_hash:
+        return Response(
+            {"error": "Idempotency-Key was already used with a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(body, status=status_code, headers={REPLAYED_HEADER: "true"})
+
+
+def _storable(response):
+    return response.status_code < 500 and response.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+
+
+def idempotent(scope):
+    """Replay the stored response for a repeated ``Idempotency-Key``; requests without one run as usual.
+
+    Goes under ``@api_view``/``@permission_classes`` so the view receives the DRF request, and
+    above ``@velocity_limited`` so replays are not counted against the velocity limits.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = request.META.get(HEADER)
+            if key is None:
+                return view(request, *args, **kwargs)
+            key = key.strip()
+            if not key or len(key) > MAX_KEY_LENGTH:
+                return Response(
+                    {"error": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            username, user_data = get_authenticated_user(request)
+            if not username or not user_data:
+                # The view answers 401; there is no user to scope the key to.
+                return view(request, *args, **kwargs)
+
+            user_id = user_data["user_id"]
+            cache_key = (user_id, scope, key)
+            request_hash = _request_hash(request)
+            stored = _response_cache.get(cache_key)
+            if stored is not None:
+                return _replay(request_hash, stored)
+
+            with _key_locks[hash(cache_key) % len(_key_locks)]:
+                stored = _response_cache.get(cache_key)
+                if stored is not None:
+                    return _replay(request_hash, stored)
+
+                with transaction.atomic():
+                    with connection.cursor() as cursor:
+                        queries.execute(cursor, queries.IDEMPOTENCY_LOCK, [f"idempotency:{user_id}:{scope}:{key}"])
+                        row = queries.fetchone(cursor, queries.IDEMPOTENCY_GET, [user_id, scope, key])
+                    if row is not None:
+                        stored_hash, status_code, body = row
+                        if isinstance(body, str):
+                            body = json.loads(body)
+                        stored = (stored_hash, status_code, body)
+                    else:
+                        response = view(request, *args, **kwargs)
+                        if not _storable(response):
+                            return response
+                        body = json.loads(dumps(response.data))
+                        stored = (request_hash, response.status_code, body)
+                        with connection.cursor() as cursor:
+                            queries.execute(
+                                cursor,
+                                queries.IDEMPOTENCY_STORE,
+                                [
+                                    user_id,
+                                    scope,
+                                    key,
+                                    request_hash,
+                                    response.status_code,
+                                    json.dumps(body),
+                                    settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+                                ],
+                            )
+
+                # Only cached once committed, so a rolled-back attempt is never replayed.
+                _response_cache.set(cache_key, stored)
+                if row is None:
+                    return response
+                return _replay(request_hash, stored)
+
+        return wrapper
+
+    return decorator
+
+
+def prune_expired(batch_size=5000):
+    """Delete expired keys in batches; returns the number removed."""
+    removed = 0
+    while True:
+        with connection.cursor() as cursor:
+            deleted = queries.execute(cursor, queries.IDEMPOTENCY_PRUNE, [batch_size]).rowcount
+        removed += deleted
+        if deleted < batch_size:
+            return removed
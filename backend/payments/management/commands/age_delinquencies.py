@@ -0,0 +1,47 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from creditscore_calculator.services import rescore_queued_users
+from payments.services import age_delinquencies
+
+
+class Command(BaseCommand):
+    help = "Age overdue installments into DPD buckets and queue affected users for rescoring."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--as-of", help="Aging date (YYYY-MM-DD). Defaults to today.")
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--lock-timeout-ms", type=int, default=2000)
+        parser.add_argument(
+            "--rescore",
+            action="store_true",
+            help="Drain score_refresh_queue after aging.",
+        )
+
+    def handle(self, *args, **options):
+        as_of = None
+        if options["as_of"]:
+            try:
+                as_of = date.fromisoformat(options["as_of"])
+            except ValueError as exc:
+                raise CommandError("--as-of must be YYYY-MM-DD.") from exc
+
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be greater than 0.")
+
+        def report(last_id, aged, queued):
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"  up to payment {last_id}: aged={aged} queued={queued}")
+
+        aged, queued = age_delinquencies(
+            as_of=as_of,
+            batch_size=options["batch_size"],
+            lock_timeout_ms=options["lock_timeout_ms"],
+            on_chunk=report,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Aged {aged} installments; queued {queued} users for rescoring."))
+
+        if options["rescore"]:
+            rescored = rescore_queued_users()
+            self.stdout.write(self.style.SUCCESS(f"Rescored {rescored} users."))
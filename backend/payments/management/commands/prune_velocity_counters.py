@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.velocity import prune_expired
+
+
+class Command(BaseCommand):
+    help = "Delete velocity_counters rows whose windows have all passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size must be greater than 0.")
+
+        removed = prune_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {removed} expired velocity counters."))
@@ -0,0 +1,204 @@
+"""Pre-approval quotes for the loan form: the largest affordable amount under the credit policy.
+
+A quote reads only: the applicant's latest score snapshot, income and account
+totals are fetched together once and kept per process for
+QUOTE_FEATURE_CACHE_TTL seconds, PD comes from the precomputed table and the
+limits from the credit policy. Keystroke-rate revalidation from the form is
+answered from memory after the first request.
+
+Affordability: the new installment (an annuity at the policy APR over the
+tenure) plus existing obligations may take at most QUOTE_MAX_DTI of monthly
+income. Existing obligations are each term loan's balance spread over its
+tenure and a minimum-payment share of revolving balances, pending requests
+included.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection
+
+from core.db import queries
+from daulterprobability.services import as_percentage, calculate_default_probability
+from evaluation import policy
+
+# Offers are rounded down to this many currency units.
+AMOUNT_STEP = 1000
+
+
+class Features(NamedTuple):
+    score: int
+    risk_category: str
+    monthly_income: float
+    employment_type: str
+    utilization_pct: float
+    monthly_obligations: float
+
+
+class _FeatureCache:
+    """Per-process LRU of user_id -> Features (or None for an unscored user), bounded by TTL."""
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry
+
+    def set(self, user_id, value):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_feature_cache = _FeatureCache(
+    getattr(settings, "QUOTE_FEATURE_CACHE_SIZE", 8192),
+    getattr(settings, "QUOTE_FEATURE_CACHE_TTL", 30),
+)
+
+
+def forget_user(user_id):
+    """Drop a user's cached features after their income or accounts change in this process."""
+    _feature_cache.discard(user_id)
+
+
+def load_features(user_id):
+    """Features for ``user_id``; None when the user has no score snapshot yet."""
+    cached = _feature_cache.get(user_id)
+    if cached is not None:
+        return cached[1]
+
+    with connection.cursor() as cursor:
+        score_row = queries.fetchone(cursor, queries.SCORES_LATEST, [user_id])
+        account_row = queries.fetchone(
+            cursor, queries.ACCOUNTS_QUOTE_FEATURES, [settings.QUOTE_REVOLVING_PAYMENT_RATE, user_id]
+        )
+    features = None
+    if score_row and account_row:
+        score, risk_level = int(score_row[0]), score_row[1]
+        monthly_income, employment_type, total_limit, total_balance, obligations = account_row
+        features = Features(
+            score=score,
+            risk_category=policy.risk_category(score, risk_level),
+            monthly_income=float(monthly_income or 0),
+            employment_type=employment_type or "",
+            utilization_pct=float(total_balance / total_limit * 100) if total_limit else 0.0,
+            monthly_obligations=float(obligations),
+        )
+    _feature_cache.set(user_id, features)
+    return features
+
+
+def debt_to_income(monthly_obligations, monthly_income):
+    """Existing monthly obligations over monthly income; None (unknown to the policy) without an income."""
+    return monthly_obligations / monthly_income if monthly_income > 0 else None
+
+
+def annuity_payment(principal, annual_rate_pct, months):
+    """Monthly installment that repays ``principal`` over ``months`` at ``annual_rate_pct`` APR."""
+    rate = annual_rate_pct / 1200
+    if rate == 0:
+        return principal / months
+    return principal * rate / (1 - (1 + rate) ** -months)
+
+
+def annuity_principal(payment, annual_rate_pct, months):
+    """The principal a monthly ``payment`` repays; the inverse of annuity_payment."""
+    rate = annual_rate_pct / 1200
+    if rate == 0:
+        return payment * months
+    return payment * (1 - (1 + rate) ** -months) / rate
+
+
+def build_quote(features, amount=None, tenure_months=None, monthly_income=None):
+    """Offer for the requested amount/tenure (both optional); ``monthly_income`` overrides the stored one."""
+    income = monthly_income if monthly_income and monthly_income > 0 else features.monthly_income
+    default_probability = calculate_default_probability(
+        features.score, risk_category=features.risk_category, utilization_pct=features.utilization_pct
+    )
+    current_dti = debt_to_income(features.monthly_obligations, income)
+    outcome = policy.evaluate(
+        score=features.score,
+        pd=default_probability,
+        dti=current_dti,
+        utilization=features.utilization_pct,
+        risk=features.risk_category,
+        employment_type=features.employment_type,
+    )
+    limits = outcome.limits
+    tenure = min(tenure_months or limits["maxTenureMonths"], limits["maxTenureMonths"])
+    apr = float(limits["interestApr"])
+    max_dti = settings.QUOTE_MAX_DTI
+
+    quote = {
+        "eligible": False,
+        "decision": outcome.decision,
+        "policyRule": outcome.rule,
+        "creditScore": features.score,
+        "riskBand": features.risk_category,
+        "probabilityOfDefault": default_probability,
+        "defaultProbabilityPercent": as_percentage(default_probability),
+        "tenureMonths": tenure,
+        "interestApr": apr,
+        "maxAmount": 0,
+        "amount": 0,
+        "emi": 0.0,
+        "monthlyObligations": round(features.monthly_obligations, 2),
+        "dti": round(current_dti, 4) if current_dti is not None else None,
+        "maxDti": max_dti,
+    }
+    if outcome.decision == "REJECT":
+        quote["reason"] = "Not eligible under the current credit policy."
+        return quote
+    if income <= 0:
+        quote["reason"] = "Monthly income is required for a quote."
+        return quote
+
+    headroom = income * max_dti - features.monthly_obligations
+    affordable = annuity_principal(headroom, apr, tenure) if headroom > 0 else 0.0
+    max_amount = math.floor(min(affordable, limits["maxLoan"]) / AMOUNT_STEP) * AMOUNT_STEP
+    if max_amount <= 0:
+        quote["reason"] = "Existing obligations leave no room for another installment."
+        return quote
+
+    offered = min(amount, max_amount) if amount and amount > 0 else max_amount
+    emi = annuity_payment(offered, apr, tenure)
+    quote.update(
+        {
+            "eligible": True,
+            "maxAmount": max_amount,
+            "amount": round(offered, 2),
+            "emi": round(emi, 2),
+            "dti": round((features.monthly_obligations + emi) / income, 4),
+        }
+    )
+    if amount and amount > max_amount:
+        quote["reason"] = "Requested amount is above the maximum offer."
+    return quote
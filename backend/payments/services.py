@@ -0,0 +1,106 @@
+from datetime import date
+
+from django.db import connection, transaction
+
+# Lower bounds of the days-past-due buckets, highest first: 90+, 60-89, 30-59, 1-29.
+DPD_BUCKETS = (90, 60, 30, 1)
+
+_DPD_BUCKET_SQL = """
+    CASE
+        WHEN c.dpd >= 90 THEN 90
+        WHEN c.dpd >= 60 THEN 60
+        WHEN c.dpd >= 30 THEN 30
+        WHEN c.dpd >= 1 THEN 1
+        ELSE 0
+    END
+"""
+
+
+def dpd_bucket(days_past_due):
+    for bucket in DPD_BUCKETS:
+        if days_past_due >= bucket:
+            return bucket
+    return 0
+
+
+def _age_overdue_chunk(cursor, after_id, as_of, batch_size):
+    """Age one keyset chunk of open installments and queue users whose bucket moved.
+
+    Rows locked by an in-flight settlement are skipped; they are picked up on the next run.
+    """
+    cursor.execute(
+        f"""
+        WITH candidates AS (
+            SELECT
+                p.payment_id,
+                p.due_date,
+                p.dpd_bucket AS old_bucket,
+                (%(as_of)s::date - p.due_date) AS dpd
+            FROM payments p
+            WHERE p.payment_id > %(after_id)s
+              AND p.status IN ('due', 'late')
+              AND p.amount_paid < p.amount_due
+              AND p.due_date < %(as_of)s::date
+            ORDER BY p.payment_id
+            LIMIT %(batch_size)s
+            FOR UPDATE SKIP LOCKED
+        ),
+        aged AS (
+            UPDATE payments p
+            SET status = 'late',
+                days_past_due = c.dpd,
+                dpd_bucket = {_DPD_BUCKET_SQL}
+            FROM candidates c
+            WHERE p.payment_id = c.payment_id
+              AND p.due_date = c.due_date
+              AND (p.status <> 'late' OR p.days_past_due <> c.dpd)
+            RETURNING p.account_id, c.old_bucket, p.dpd_bucket
+        ),
+        queued AS (
+            INSERT INTO score_refresh_queue (user_id, reason)
+            SELECT DISTINCT ca.user_id, 'dpd_bucket_changed'
+            FROM aged a
+            JOIN credit_accounts ca ON ca.account_id = a.account_id
+            WHERE a.old_bucket <> a.dpd_bucket
+            ON CONFLICT (user_id) DO UPDATE
+            SET reason = EXCLUDED.reason,
+                queued_at = NOW()
+            RETURNING user_id
+        )
+        SELECT
+            (SELECT MAX(payment_id) FROM candidates),
+            (SELECT COUNT(*) FROM aged),
+            (SELECT COUNT(*) FROM queued)
+        """,
+        {"after_id": after_id, "as_of": as_of, "batch_size": batch_size},
+    )
+    return cursor.fetchone()
+
+
+def age_delinquencies(as_of=None, batch_size=10000, lock_timeout_ms=2000, on_chunk=None):
+    """Move overdue installments to 'late' and refresh their DPD buckets.
+
+    Each chunk commits on its own so row locks are held for one chunk at most.
+    Returns (aged_payments, queued_users).
+    """
+    as_of = as_of or date.today()
+    after_id = 0
+    total_aged = 0
+    total_queued = 0
+
+    while True:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL lock_timeout = %s", [f"{int(lock_timeout_ms)}ms"])
+                last_id, aged, queued = _age_overdue_chunk(cursor, after_id, as_of, batch_size)
+
+        if last_id is None:
+            break
+
+        after_id = last_id
+        total_aged += aged
+        total_queued += queued
+        if on_chunk:
+            on_chunk(after_id, aged, queued)
+
+    return total_aged, total_queued
@@ -0,0 +1,190 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from evaluation.policy import compile_policy
+from payments import quote
+from payments.services import dpd_bucket
+from payments.velocity import WINDOWS, VelocityLimiter, _Ring, _shared_estimate
+
+LIMITS = {"maxLoan": 300000, "maxTenureMonths": 24, "interestApr": 12.0}
+QUOTE_POLICY = compile_policy(
+    {
+        "version": "test",
+        "rules": [
+            {"name": "high-risk", "when": {"risk": {"in": ["HIGH"]}}, "decision": "REJECT", "limits": LIMITS},
+            {"name": "fallback", "when": {}, "decision": "APPROVE", "limits": LIMITS},
+        ],
+    }
+)
+
+
+class DpdBucketTests(SimpleTestCase):
+    def test_buckets(self):
+        cases = {-3: 0, 0: 0, 1: 1, 29: 1, 30: 30, 59: 30, 60: 60, 89: 60, 90: 90, 400: 90}
+        for days, bucket in cases.items():
+            with self.subTest(days=days):
+                self.assertEqual(dpd_bucket(days), bucket)
+
+
+class RingTests(SimpleTestCase):
+    def test_counts_stay_in_the_window(self):
+        ring = _Ring(60, 60)
+        for now in (1000.0, 1000.5, 1030.0):
+            ring.add(now)
+        self.assertEqual(ring.total(1030.0), 3)
+        self.assertEqual(ring.total(1059.9), 3)
+        # The buckets of second 1000 have dropped out; 1030 is still in.
+        self.assertEqual(ring.total(1060.0), 1)
+        self.assertEqual(ring.total(1090.0), 0)
+
+    def test_reused_slot_is_reset(self):
+        ring = _Ring(60, 60)
+        ring.add(1000.0)
+        ring.add(1060.0)
+        self.assertEqual(ring.total(1060.0), 1)
+
+    def test_retry_after_is_when_the_oldest_hit_drops_out(self):
+        ring = _Ring(60, 60)
+        ring.add(1000.2)
+        ring.add(1010.0)
+        self.assertAlmostEqual(ring.retry_after(1020.0), 40.0)
+        self.assertEqual(_Ring(60, 60).retry_after(1020.0), 0.0)
+
+
+class SharedEstimateTests(SimpleTestCase):
+    def test_weights_the_previous_window_by_its_overlap(self):
+        self.assertEqual(_shared_estimate((60, 4, 10), 60, 90), 9.0)
+        self.assertEqual(_shared_estimate((0, 4, 10), 60, 90), 2.0)
+        self.assertEqual(_shared_estimate((0, 4, 10), 60, 150), 0.0)
+        self.assertEqual(_shared_estimate(None, 60, 90), 0.0)
+
+
+class VelocityLimiterTests(SimpleTestCase):
+    user = ("take_loan", "user:1")
+    ip = ("take_loan", "ip:10.0.0.1")
+
+    def setUp(self):
+        self.limiter = VelocityLimiter(max_subjects=100, sync_seconds=2)
+
+    def test_rejects_over_the_minute_limit_until_it_passes(self):
+        checks = [(self.user, (2, 0, 0))]
+        self.assertIsNone(self.limiter.hit(checks, now=1000.0))
+        self.assertIsNone(self.limiter.hit(checks, now=1001.0))
+        window, retry_after = self.limiter.hit(checks, now=1002.0)
+        self.assertEqual(window, "1m")
+        self.assertAlmostEqual(retry_after, 58.0)
+        self.assertIsNone(self.limiter.hit(checks, now=1061.0))
+
+    def test_rejected_requests_are_not_counted(self):
+        checks = [(self.user, (5, 0, 0)), (self.ip, (1, 0, 0))]
+        self.assertIsNone(self.limiter.hit(checks, now=1000.0))
+        self.assertEqual(self.limiter.hit(checks, now=1001.0)[0], "1m")
+        user = self.limiter._subjects[self.user]
+        self.assertEqual(user.rings[0].total(1001.0), 1)
+        self.assertEqual(sum(user.pending.values()), 1)
+
+    def test_longer_windows_apply(self):
+        checks = [(self.user, (0, 2, 0))]
+        self.limiter.hit(checks, now=1000.0)
+        self.limiter.hit(checks, now=2000.0)
+        self.assertEqual(self.limiter.hit(checks, now=3000.0)[0], "1h")
+
+    def test_shared_counts_from_other_workers_apply(self):
+        checks = [(self.user, (3, 0, 0))]
+        self.assertIsNone(self.limiter.hit(checks, now=1000.0))
+        self.limiter._subjects[self.user].shared[0] = (960, 2, 0)
+        window, retry_after = self.limiter.hit(checks, now=1001.0)
+        self.assertEqual(window, "1m")
+        # Only the shared estimate is over: wait for the next fixed window.
+        self.assertAlmostEqual(retry_after, 19.0)
+
+    def test_evicts_the_least_recently_used_subject(self):
+        limiter = VelocityLimiter(max_subjects=1, sync_seconds=2)
+        limiter.hit([(self.user, (5, 0, 0))], now=1000.0)
+        limiter.hit([(self.ip, (5, 0, 0))], now=1000.0)
+        self.assertEqual(list(limiter._subjects), [self.ip])
+        self.assertEqual(limiter._dirty, {self.ip})
+
+    def test_sync_batches_split_hits_across_a_window_boundary(self):
+        batches = VelocityLimiter._sync_batches({self.user: {959: 1, 960: 2}}, now=961.0)
+        for batch in batches:
+            keys = [row[:3] for row in batch]
+            self.assertEqual(len(keys), len(set(keys)))
+        rows = [row for batch in batches for row in batch]
+        minute = sorted((start, count) for _, _, seconds, start, count in rows if seconds == 60)
+        self.assertEqual(minute, [(900.0, 1), (960.0, 2)])
+        for seconds, _, _ in WINDOWS[1:]:
+            self.assertEqual([(start, count) for _, _, s, start, count in rows if s == seconds], [(0.0, 3)])
+
+    def test_sync_batches_send_the_current_window_without_hits(self):
+        batches = VelocityLimiter._sync_batches({self.user: {959: 1}}, now=1000.0)
+        minute = sorted((start, count) for batch in batches for _, _, s, start, count in batch if s == 60)
+        self.assertEqual(minute, [(900.0, 1), (960.0, 0)])
+
+
+class AnnuityTests(SimpleTestCase):
+    def test_payment(self):
+        self.assertAlmostEqual(quote.annuity_payment(100000, 12.0, 12), 8884.88, places=2)
+        self.assertEqual(quote.annuity_payment(1200, 0, 12), 100)
+
+    def test_principal_inverts_payment(self):
+        for apr in (0, 9.5, 22.0):
+            with self.subTest(apr=apr):
+                payment = quote.annuity_payment(250000, apr, 36)
+                self.assertAlmostEqual(quote.annuity_principal(payment, apr, 36), 250000, places=6)
+
+
+@mock.patch("evaluation.policy._store.get", return_value=QUOTE_POLICY)
+class BuildQuoteTests(SimpleTestCase):
+    features = quote.Features(
+        score=760,
+        risk_category="LOW",
+        monthly_income=50000.0,
+        employment_type="salaried",
+        utilization_pct=20.0,
+        monthly_obligations=5000.0,
+    )
+
+    def test_max_amount_fits_the_dti_headroom(self, _):
+        result = quote.build_quote(self.features._replace(monthly_income=30000.0))
+        # 30000 * 0.5 - 5000 = 10000 a month over 24 months at 12%.
+        affordable = quote.annuity_principal(10000, 12.0, 24)
+        self.assertTrue(result["eligible"])
+        self.assertEqual(result["maxAmount"], affordable // 1000 * 1000)
+        self.assertEqual(result["amount"], result["maxAmount"])
+        self.assertLessEqual(result["dti"], 0.5)
+        self.assertEqual(result["policyRule"], "fallback")
+
+    def test_max_amount_is_capped_by_the_policy(self, _):
+        result = quote.build_quote(self.features._replace(monthly_income=100000.0), amount=100000, tenure_months=12)
+        self.assertEqual(result["maxAmount"], 300000)
+        self.assertEqual(result["amount"], 100000)
+        self.assertEqual(result["tenureMonths"], 12)
+        self.assertEqual(result["emi"], round(quote.annuity_payment(100000, 12.0, 12), 2))
+        self.assertNotIn("reason", result)
+
+    def test_tenure_and_amount_are_limited(self, _):
+        result = quote.build_quote(self.features, amount=1000000, tenure_months=60)
+        self.assertEqual(result["tenureMonths"], 24)
+        self.assertEqual(result["amount"], 300000)
+        self.assertEqual(result["reason"], "Requested amount is above the maximum offer.")
+
+    def test_monthly_income_override(self, _):
+        result = quote.build_quote(self.features._replace(monthly_income=0.0), monthly_income=30000)
+        self.assertTrue(result["eligible"])
+
+    def test_ineligible(self, _):
+        cases = {
+            "Not eligible under the current credit policy.": self.features._replace(risk_category="HIGH"),
+            "Monthly income is required for a quote.": self.features._replace(monthly_income=0.0),
+            "Existing obligations leave no room for another installment.": self.features._replace(
+                monthly_obligations=25000.0
+            ),
+        }
+        for reason, features in cases.items():
+            with self.subTest(reason=reason):
+                result = quote.build_quote(features)
+                self.assertFalse(result["eligible"])
+                self.assertEqual(result["maxAmount"], 0)
+                self.assertEqual(result["reason"], reason)
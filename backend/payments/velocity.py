@@ -0,0 +1,294 @@
+"""Sliding-window velocity checks on the loan POSTs, per user and per client IP.
+
+Each (scope, subject) gets a ring buffer of counts per window (1 minute,
+1 hour, 24 hours): fixed-width buckets that are reset as the ring comes back
+round, so a check is a sum over at most a few dozen ints under one lock and
+never waits on the database.
+
+Workers share their counts through ``velocity_counters``: every
+VELOCITY_SYNC_SECONDS one request per process upserts the hits it let through
+since the last sync and reads back the cluster-wide row, which keeps the hits
+of the current and previous fixed window. A check takes the larger of the
+local exact count and that shared sliding estimate plus the hits not synced
+yet, so a burst spread over workers is caught within one sync interval. When
+the database is unreachable the local counts still apply.
+
+Only allowed requests count; a rejected burst does not push the window out.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from authentication.services import get_authenticated_user
+from authentication.throttling import client_ip
+from core.db import queries
+
+logger = logging.getLogger(__name__)
+
+# (window seconds, ring buckets, label); limits in settings follow this order.
+WINDOWS = ((60, 60, "1m"), (3600, 60, "1h"), (86400, 96, "24h"))
+DEFAULT_LIMITS = {
+    ("take_loan", "user"): (3, 10, 20),
+    ("take_loan", "ip"): (10, 60, 200),
+    ("settle_loan", "user"): (5, 30, 100),
+    ("settle_loan", "ip"): (20, 120, 500),
+}
+
+
+class _Ring:
+    __slots__ = ("width", "counts", "stamps")
+
+    def __init__(self, window_seconds, buckets):
+        self.width = window_seconds / buckets
+        self.counts = [0] * buckets
+        self.stamps = [-1] * buckets
+
+    def add(self, now):
+        index = int(now // self.width)
+        slot = index % len(self.counts)
+        if self.stamps[slot] != index:
+            self.stamps[slot] = index
+            self.counts[slot] = 0
+        self.counts[slot] += 1
+
+    def total(self, now):
+        oldest = int(now // self.width) - len(self.counts)
+        return sum(count for count, stamp in zip(self.counts, self.stamps) if stamp > oldest)
+
+    def retry_after(self, now):
+        """Seconds until the oldest bucket still in the window drops out."""
+        oldest = int(now // self.width) - len(self.counts)
+        live = [stamp for count, stamp in zip(self.counts, self.stamps) if count and stamp > oldest]
+        if not live:
+            return 0.0
+        return max(0.0, (min(live) + len(self.counts)) * self.width - now)
+
+
+class _Subject:
+    __slots__ = ("rings", "pending", "shared")
+
+    def __init__(self):
+        self.rings = [_Ring(seconds, buckets) for seconds, buckets, _ in WINDOWS]
+        # Allowed hits since the last sync, by whole second.
+        self.pending = {}
+        # Per window: (window_start, current_hits, previous_hits) as last read from velocity_counters.
+        self.shared = [None] * len(WINDOWS)
+
+
+def _shared_estimate(shared, window_seconds, now):
+    """Sliding-window estimate from a synced row: this window plus the overlapping part of the last one."""
+    if shared is None:
+        return 0.0
+    window_start, current, previous = shared
+    now_start = now // window_seconds * window_seconds
+    elapsed = (now - now_start) / window_seconds
+    if window_start == now_start:
+        return current + previous * (1 - elapsed)
+    if window_start == now_start - window_seconds:
+        return current * (1 - elapsed)
+    return 0.0
+
+
+class VelocityLimiter:
+    def __init__(self, max_subjects, sync_seconds):
+        self.max_subjects = max_subjects
+        self.sync_seconds = sync_seconds
+        self._subjects = OrderedDict()
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._next_sync = 0.0
+
+    def _subject(self, key):
+        subject = self._subjects.get(key)
+        if subject is None:
+            subject = self._subjects[key] = _Subject()
+            while len(self._subjects) > self.max_subjects:
+                evicted, _ = self._subjects.popitem(last=False)
+                self._dirty.discard(evicted)
+        else:
+            self._subjects.move_to_end(key)
+        return subject
+
+    def hit(self, checks, now=None):
+        """Count one request against every (key, limits) in ``checks`` unless one is over a limit.
+
+        Returns (window label, seconds to retry) for the first exceeded limit, or None when the
+        request was counted.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            subjects = [(key, self._subject(key), limits) for key, limits in checks]
+            for key, subject, limits in subjects:
+                self._dirty.add(key)
+                for position, ((window_seconds, _, label), limit) in enumerate(zip(WINDOWS, limits)):
+                    if limit <= 0:
+                        continue
+                    ring = subject.rings[position]
+                    local = ring.total(now)
+                    # Hits not synced yet are not in the shared row; only the ones still in this window count.
+                    unsynced = sum(count for second, count in subject.pending.items() if second > now - window_seconds)
+                    shared = _shared_estimate(subject.shared[position], window_seconds, now) + unsynced
+                    if max(local, shared) >= limit:
+                        if local >= limit:
+                            retry_after = ring.retry_after(now)
+                        else:
+                            retry_after = now // window_seconds * window_seconds + window_seconds - now
+                        return label, retry_after
+            second = int(now)
+            for _, subject, _ in subjects:
+                for ring in subject.rings:
+                    ring.add(now)
+                subject.pending[second] = subject.pending.get(second, 0) + 1
+        return None
+
+    def sync_due(self, now=None):
+        return (time.time() if now is None else now) >= self._next_sync
+
+    def sync(self, now=None):
+        """Push hits since the last sync to velocity_counters and read back the shared counts.
+
+        One thread per process syncs at a time; the others skip rather than wait.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return False
+        try:
+            now = time.time() if now is None else now
+            self._next_sync = now + self.sync_seconds
+            with self._lock:
+                taken = {}
+                for key in self._dirty:
+                    subject = self._subjects.get(key)
+                    if subject is not None:
+                        taken[key] = subject.pending
+                        subject.pending = {}
+                self._dirty = set()
+            if not taken:
+                return True
+
+            batches = self._sync_batches(taken, now)
+            try:
+                returned = []
+                with connection.cursor() as cursor:
+                    for batch in batches:
+                        returned.extend(
+                            queries.fetchall(cursor, queries.VELOCITY_SYNC, [list(column) for column in zip(*batch)])
+                        )
+            except DatabaseError:
+                logger.warning("Velocity counters could not be synced; using local counts.", exc_info=True)
+                self._restore(taken, now)
+                return False
+
+            positions = {seconds: position for position, (seconds, _, _) in enumerate(WINDOWS)}
+            with self._lock:
+                for scope, subject_id, window_seconds, window_start, current, previous in returned:
+                    subject = self._subjects.get((scope, subject_id))
+                    if subject is not None:
+                        subject.shared[positions[window_seconds]] = (window_start, current, previous)
+            return True
+        finally:
+            self._sync_lock.release()
+
+    @staticmethod
+    def _sync_batches(taken, now):
+        """Rows for VELOCITY_SYNC; a row key appears at most once per statement, so hits that straddle
+        a window boundary go out in a second batch."""
+        rows = {}
+        for (scope, subject_id), pending in taken.items():
+            for window_seconds, _, _ in WINDOWS:
+                hits = {now // window_seconds * window_seconds: 0}
+                for second, count in pending.items():
+                    window_start = second // window_seconds * window_seconds
+                    hits[window_start] = hits.get(window_start, 0) + count
+                for window_start, count in hits.items():
+                    rows.setdefault((scope, subject_id, window_seconds), []).append((window_start, count))
+        batches = []
+        for (scope, subject_id, window_seconds), entries in rows.items():
+            for position, (window_start, count) in enumerate(sorted(entries)):
+                if position == len(batches):
+                    batches.append([])
+                batches[position].append((scope, subject_id, window_seconds, float(window_start), count))
+        return batches
+
+    def _restore(self, taken, now):
+        # Hits older than the longest window can no longer count anywhere; drop them while the database is away.
+        expired = now - WINDOWS[-1][0]
+        with self._lock:
+            for key, pending in taken.items():
+                subject = self._subjects.get(key)
+                if subject is None:
+                    continue
+                for second, count in pending.items():
+                    if second > expired:
+                        subject.pending[second] = subject.pending.get(second, 0) + count
+                self._dirty.add(key)
+
+    def clear(self):
+        with self._lock:
+            self._subjects.clear()
+            self._dirty.clear()
+
+
+_limiter = VelocityLimiter(
+    getattr(settings, "VELOCITY_MAX_SUBJECTS", 100000),
+    getattr(settings, "VELOCITY_SYNC_SECONDS", 2),
+)
+
+
+def _limits(scope, kind):
+    return tuple(getattr(settings, f"VELOCITY_{scope.upper()}_{kind.upper()}", DEFAULT_LIMITS[(scope, kind)]))
+
+
+def velocity_limited(scope):
+    """Answer 429 once a user or client IP goes over a VELOCITY_<SCOPE>_USER/_IP limit.
+
+    Goes under ``@idempotent``: a retried Idempotency-Key gets its stored response back
+    without being counted, and a 429 is never stored, so the retry can still go through.
+    A rejected request never reaches credit_accounts.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            checks = [((scope, f"ip:{client_ip(request)}"), _limits(scope, "ip"))]
+            username, user_data = get_authenticated_user(request)
+            if username and user_data:
+                checks.insert(0, ((scope, f"user:{user_data['user_id']}"), _limits(scope, "user")))
+
+            exceeded = _limiter.hit(checks)
+            if _limiter.sync_due():
+                # Inside @idempotent's transaction, sync once it commits so a failed
+                # sync cannot abort it; outside one, on_commit runs it right away.
+                transaction.on_commit(_limiter.sync)
+            if exceeded is not None:
+                window, retry_after = exceeded
+                return Response(
+                    {"error": f"Too many requests in the last {window}. Try again later.", "window": window},
+                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def prune_expired(batch_size=5000):
+    """Delete counters whose windows have all passed; returns the number removed."""
+    removed = 0
+    while True:
+        with connection.cursor() as cursor:
+            deleted = queries.execute(cursor, queries.VELOCITY_PRUNE, [batch_size]).rowcount
+        removed += deleted
+        if deleted < batch_size:
+            return removed
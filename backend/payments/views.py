@@ -7,6 +7,10 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from authentication.services import get_authenticated_user
+from core.db import queries
+from payments import quote
+from payments.idempotency import idempotent
+from payments.velocity import velocity_limited
 
 
 def _parse_money(value) -> float:
@@ -23,15 +27,34 @@ def _parse_money(value) -> float:
 
 def _sync_credit_account_sequence(cursor):
     """Keep account_id sequence aligned with table data to avoid duplicate PK inserts."""
-    cursor.execute(
-        """
-        SELECT setval(
-            pg_get_serial_sequence('credit_accounts', 'account_id'),
-            COALESCE((SELECT MAX(account_id) FROM credit_accounts), 1),
-            true
+    queries.execute(cursor, queries.ACCOUNTS_SYNC_SEQUENCE)
+
+
+def build_loans_payload(rows):
+    loans = []
+    for account_id, account_type, current_balance, account_status, outstanding in rows:
+        loans.append(
+            {
+                "id": str(account_id),
+                "title": account_type.replace("_", " ").title(),
+                "outstanding": float(max(outstanding, current_balance or 0)),
+                "status": account_status.upper(),
+            }
         )
-        """
-    )
+    return loans
+
+
+def build_history_payload(rows):
+    return [
+        {
+            "id": str(payment_id),
+            "date": (paid_date or due_date).isoformat(),
+            "type": account_type.replace("_", " ").title(),
+            "amount": float(amount_paid or amount_due or 0),
+            "status": pay_status.upper(),
+        }
+        for payment_id, due_date, paid_date, amount_due, amount_paid, pay_status, account_type in rows
+    ]
 
 
 @api_view(["GET"])
@@ -44,40 +67,15 @@ def payment_loans(request):
     user_id = user_data["user_id"]
 
     with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT
-                ca.account_id,
-                ca.account_type,
-                ca.current_balance,
-                ca.status,
-                COALESCE(SUM(GREATEST(p.amount_due - p.amount_paid, 0)), 0) AS outstanding
-            FROM credit_accounts ca
-            LEFT JOIN payments p ON p.account_id = ca.account_id
-            WHERE ca.user_id = %s AND ca.status = 'active'
-            GROUP BY ca.account_id, ca.account_type, ca.current_balance, ca.status
-            ORDER BY ca.account_id DESC
-            """,
-            [user_id],
-        )
-        rows = cursor.fetchall()
-
-    loans = []
-    for account_id, account_type, current_balance, account_status, outstanding in rows:
-        loans.append(
-            {
-                "id": str(account_id),
-                "title": account_type.replace("_", " ").title(),
-                "outstanding": float(max(outstanding, current_balance or 0)),
-                "status": account_status.upper(),
-            }
-        )
+        rows = queries.fetchall(cursor, queries.ACCOUNTS_ACTIVE_LOANS, [user_id])
 
-    return Response({"loans": loans}, status=status.HTTP_200_OK)
+    return Response({"loans": build_loans_payload(rows)}, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@idempotent("take_loan")
+@velocity_limited("take_loan")
 def payment_take_loan(request):
     username, user_data = get_authenticated_user(request)
     if not username or not user_data:
@@ -127,33 +125,13 @@ def payment_take_loan(request):
     with connection.cursor() as cursor:
         _sync_credit_account_sequence(cursor)
 
-        cursor.execute(
-            """
-            UPDATE users
-            SET employment_type = %s, monthly_income = %s
-            WHERE user_id = %s
-            """,
-            [employment_type, income, user_id],
-        )
-
-        cursor.execute(
-            """
-            INSERT INTO credit_accounts (
-                user_id,
-                account_type,
-                purpose,
-                tenure_months,
-                credit_limit,
-                current_balance,
-                opened_date,
-                status
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, CURRENT_DATE, 'pending_approval')
-            RETURNING account_id
-            """,
+        queries.execute(cursor, queries.USERS_UPDATE_EMPLOYMENT, [employment_type, income, user_id])
+        new_account_id = queries.fetchone(
+            cursor,
+            queries.ACCOUNTS_INSERT_PENDING,
             [user_id, account_type_map[category], purpose, tenure_months, amount, amount],
-        )
-        new_account_id = cursor.fetchone()[0]
+        )[0]
+    quote.forget_user(user_id)
 
     return Response(
         {
@@ -171,6 +149,39 @@ def payment_take_loan(request):
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+def payment_quote(request):
+    """Pre-approval offer for ``amount``/``tenureMonths`` (both optional); reads only, never writes."""
+    username, user_data = get_authenticated_user(request)
+    if not username or not user_data:
+        return Response({"error": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
+
+    amount = _parse_money(request.data.get("amount", 0))
+    income = _parse_money(request.data.get("income", request.data.get("monthly_income", 0)))
+    tenure_months = None
+    if request.data.get("tenureMonths") not in (None, ""):
+        try:
+            tenure_months = int(request.data.get("tenureMonths"))
+        except (TypeError, ValueError):
+            tenure_months = 0
+        if tenure_months < 3 or tenure_months > 60:
+            return Response({"error": "Tenure must be 3-60 months."}, status=status.HTTP_400_BAD_REQUEST)
+
+    features = quote.load_features(user_data["user_id"])
+    if features is None:
+        return Response(
+            {"eligible": False, "reason": "No credit score yet; a quote needs a score snapshot."},
+            status=status.HTTP_200_OK,
+        )
+    return Response(
+        quote.build_quote(features, amount=amount, tenure_months=tenure_months, monthly_income=income),
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+@idempotent("settle_loan")
+@velocity_limited("settle_loan")
 def payment_settle_loan(request):
     username, user_data = get_authenticated_user(request)
     if not username or not user_data:
@@ -227,15 +238,7 @@ def payment_settle_loan(request):
     eps = 1e-6
 
     with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT account_id, current_balance
-            FROM credit_accounts
-            WHERE account_id = %s AND user_id = %s AND status = 'active'
-            """,
-            [loan_id, user_id],
-        )
-        account_row = cursor.fetchone()
+        account_row = queries.fetchone(cursor, queries.ACCOUNTS_ACTIVE_FOR_USER, [loan_id, user_id])
 
         if not account_row:
             return Response(
@@ -257,13 +260,7 @@ def payment_settle_loan(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cursor.execute(
-            """
-            INSERT INTO payments (account_id, due_date, amount_due, amount_paid, status)
-            VALUES (%s, CURRENT_DATE, %s, 0, 'pending_approval')
-            """,
-            [account_id, amount],
-        )
+        queries.execute(cursor, queries.PAYMENTS_INSERT_SETTLEMENT_REQUEST, [account_id, amount])
 
     return Response(
         {
@@ -285,35 +282,6 @@ def payment_history(request):
     user_id = user_data["user_id"]
 
     with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT
-                p.payment_id,
-                p.due_date,
-                p.paid_date,
-                p.amount_due,
-                p.amount_paid,
-                p.status,
-                ca.account_type
-            FROM payments p
-            JOIN credit_accounts ca ON ca.account_id = p.account_id
-            WHERE ca.user_id = %s
-            ORDER BY COALESCE(p.paid_date, p.due_date) DESC, p.payment_id DESC
-            LIMIT 30
-            """,
-            [user_id],
-        )
-        rows = cursor.fetchall()
-
-    history = [
-        {
-            "id": str(payment_id),
-            "date": (paid_date or due_date).isoformat(),
-            "type": account_type.replace("_", " ").title(),
-            "amount": float(amount_paid or amount_due or 0),
-            "status": pay_status.upper(),
-        }
-        for payment_id, due_date, paid_date, amount_due, amount_paid, pay_status, account_type in rows
-    ]
+        rows = queries.fetchall(cursor, queries.PAYMENTS_HISTORY_FOR_USER, [user_id])
 
-    return Response({"history": history}, status=status.HTTP_200_OK)
+    return Response({"history": build_history_payload(rows)}, status=status.HTTP_200_OK)
@@ -3,8 +3,19 @@
 
 BEGIN;
 
+DROP MATERIALIZED VIEW IF EXISTS portfolio_user_risk;
+DROP TABLE IF EXISTS portfolio_monthly_trend CASCADE;
+DROP TABLE IF EXISTS portfolio_summary CASCADE;
+DROP TABLE IF EXISTS cohort_cached_months CASCADE;
+DROP TABLE IF EXISTS cohort_events_monthly CASCADE;
+DROP TABLE IF EXISTS primary_pins CASCADE;
+DROP TABLE IF EXISTS velocity_counters CASCADE;
+DROP TABLE IF EXISTS idempotency_keys CASCADE;
+DROP TABLE IF EXISTS revoked_tokens CASCADE;
+DROP TABLE IF EXISTS score_refresh_queue CASCADE;
 DROP TABLE IF EXISTS payments CASCADE;
 DROP TABLE IF EXISTS credit_accounts CASCADE;
+DROP TABLE IF EXISTS score_history_monthly CASCADE;
 DROP TABLE IF EXISTS score_history CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
 
@@ -34,28 +45,197 @@ CREATE TABLE credit_accounts (
   status VARCHAR(20) NOT NULL DEFAULT 'active'
 );
 
+-- Monthly range partitions by due_date (see manage_partitions).
 CREATE TABLE payments (
-  payment_id BIGSERIAL PRIMARY KEY,
+  payment_id BIGSERIAL,
   account_id BIGINT NOT NULL REFERENCES credit_accounts(account_id) ON DELETE CASCADE,
   due_date DATE NOT NULL,
   paid_date DATE,
   amount_due NUMERIC(14,2) NOT NULL DEFAULT 0,
   amount_paid NUMERIC(14,2) NOT NULL DEFAULT 0,
-  status VARCHAR(20) NOT NULL DEFAULT 'due'
-);
+  status VARCHAR(20) NOT NULL DEFAULT 'due',
+  days_past_due INTEGER NOT NULL DEFAULT 0,
+  dpd_bucket SMALLINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (payment_id, due_date)
+) PARTITION BY RANGE (due_date);
 
+-- Monthly range partitions by calculated_at (UTC bounds); old months are rolled up into score_history_monthly.
 CREATE TABLE score_history (
-  score_id BIGSERIAL PRIMARY KEY,
+  score_id BIGSERIAL,
   user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
   score INTEGER NOT NULL CHECK (score BETWEEN 300 AND 850),
   risk_level VARCHAR(20) NOT NULL,
   factors JSONB NOT NULL DEFAULT '{}'::jsonb,
-  calculated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+  calculated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (score_id, calculated_at)
+) PARTITION BY RANGE (calculated_at);
+
+-- One row per user and month for snapshots past the score_history retention window.
+CREATE TABLE score_history_monthly (
+  user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+  month DATE NOT NULL,
+  snapshots INTEGER NOT NULL,
+  score_min INTEGER NOT NULL,
+  score_max INTEGER NOT NULL,
+  score_avg NUMERIC(6,2) NOT NULL,
+  last_score INTEGER NOT NULL,
+  last_risk_level VARCHAR(20) NOT NULL,
+  last_factors JSONB NOT NULL DEFAULT '{}'::jsonb,
+  last_calculated_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (user_id, month)
+);
+
+-- Three years back through three months ahead; manage_partitions keeps creating future months.
+DO $$
+DECLARE
+  month_start DATE;
+BEGIN
+  FOR month_start IN
+    SELECT generate_series(date_trunc('month', CURRENT_DATE) - INTERVAL '36 months',
+                           date_trunc('month', CURRENT_DATE) + INTERVAL '3 months',
+                           INTERVAL '1 month')::date
+  LOOP
+    EXECUTE format(
+      'CREATE TABLE payments_p%s PARTITION OF payments FOR VALUES FROM (%L) TO (%L)',
+      to_char(month_start, 'YYYYMM'), month_start, (month_start + INTERVAL '1 month')::date
+    );
+    EXECUTE format(
+      'CREATE TABLE score_history_p%s PARTITION OF score_history FOR VALUES FROM (%L) TO (%L)',
+      to_char(month_start, 'YYYYMM'),
+      month_start::text || ' 00:00:00+00',
+      (month_start + INTERVAL '1 month')::date::text || ' 00:00:00+00'
+    );
+  END LOOP;
+END $$;
+CREATE TABLE payments_default PARTITION OF payments DEFAULT;
+CREATE TABLE score_history_default PARTITION OF score_history DEFAULT;
+
+-- Users whose delinquency bucket moved and need a fresh score snapshot.
+CREATE TABLE score_refresh_queue (
+  user_id BIGINT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+  reason VARCHAR(40) NOT NULL,
+  queued_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- JWT ids revoked before expiry; rows past expires_at can be pruned.
+CREATE TABLE revoked_tokens (
+  jti VARCHAR(64) PRIMARY KEY,
+  expires_at TIMESTAMPTZ NOT NULL
+);
+
+-- Responses to POSTs sent with an Idempotency-Key, replayed until expires_at.
+CREATE TABLE idempotency_keys (
+  user_id BIGINT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+  scope VARCHAR(40) NOT NULL,
+  idem_key VARCHAR(255) NOT NULL,
+  request_hash CHAR(64) NOT NULL,
+  status_code SMALLINT NOT NULL,
+  response JSONB NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (user_id, scope, idem_key)
+);
+CREATE INDEX idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+
+-- Loan POST velocity: hits in the current and previous fixed window per (scope, subject, window),
+-- synced from every worker (payments.velocity); rows past expires_at can be pruned.
+CREATE TABLE velocity_counters (
+  scope VARCHAR(40) NOT NULL,
+  subject VARCHAR(80) NOT NULL,
+  window_seconds INTEGER NOT NULL,
+  window_start TIMESTAMPTZ NOT NULL,
+  current_hits INTEGER NOT NULL DEFAULT 0,
+  previous_hits INTEGER NOT NULL DEFAULT 0,
+  expires_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (scope, subject, window_seconds)
+);
+CREATE INDEX idx_velocity_counters_expires_at ON velocity_counters(expires_at);
+
+-- Read-your-writes: users (subject "user:<id>") who wrote recently read from the primary until
+-- pinned_until (core.db.routing). One row per subject, overwritten on every write.
+CREATE TABLE primary_pins (
+  subject VARCHAR(160) PRIMARY KEY,
+  pinned_until TIMESTAMPTZ NOT NULL
 );
 
-CREATE INDEX idx_accounts_user_id ON credit_accounts(user_id);
+CREATE INDEX idx_accounts_user_status ON credit_accounts(user_id, status);
+CREATE INDEX idx_accounts_pending_approval ON credit_accounts(user_id, account_id DESC)
+  WHERE status = 'pending_approval';
+CREATE INDEX idx_users_lower_username ON users(LOWER(username));
 CREATE INDEX idx_payments_account_id ON payments(account_id);
+-- Unpaid installments only; keeps the nightly aging scan off settled rows.
+CREATE INDEX idx_payments_open_payment_id ON payments(payment_id)
+  WHERE status IN ('due', 'late') AND amount_paid < amount_due;
+CREATE INDEX idx_payments_open_by_account ON payments(account_id, due_date, payment_id)
+  WHERE status IN ('due', 'late') AND amount_paid < amount_due;
+CREATE INDEX idx_payments_pending_approval ON payments(account_id, payment_id)
+  WHERE status = 'pending_approval';
+CREATE INDEX idx_payments_account_activity ON payments(account_id, (COALESCE(paid_date, due_date)) DESC, payment_id DESC);
 CREATE INDEX idx_score_user_id_time ON score_history(user_id, calculated_at DESC);
+-- Portfolio analytics (refresh_portfolio fills them; GET /api/admin/portfolio/summary reads them).
+CREATE MATERIALIZED VIEW portfolio_user_risk AS
+WITH latest AS (
+    SELECT DISTINCT ON (user_id) user_id, score, risk_level
+    FROM (
+        SELECT user_id, score, risk_level, calculated_at FROM score_history
+        UNION ALL
+        SELECT user_id, last_score, last_risk_level, last_calculated_at FROM score_history_monthly
+    ) snapshots
+    ORDER BY user_id, calculated_at DESC
+),
+balances AS (
+    SELECT user_id, SUM(credit_limit) AS total_limit, SUM(current_balance) AS total_balance
+    FROM credit_accounts
+    WHERE status = 'active'
+    GROUP BY user_id
+)
+SELECT
+    l.user_id,
+    l.score,
+    CASE
+        WHEN UPPER(l.risk_level) IN ('LOW', 'MEDIUM', 'HIGH') THEN UPPER(l.risk_level)
+        WHEN l.score >= 700 THEN 'LOW'
+        WHEN l.score >= 650 THEN 'MEDIUM'
+        ELSE 'HIGH'
+    END AS risk_category,
+    CASE WHEN b.total_limit > 0 THEN (b.total_balance / b.total_limit * 100)::float8 ELSE 0 END AS utilization_pct
+FROM latest l
+LEFT JOIN balances b USING (user_id);
+CREATE UNIQUE INDEX idx_portfolio_user_risk_user ON portfolio_user_risk (user_id);
+
+CREATE TABLE portfolio_summary (
+  summary_id SMALLINT PRIMARY KEY CHECK (summary_id = 1),
+  summary JSONB NOT NULL,
+  refreshed_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE TABLE portfolio_monthly_trend (
+  month DATE PRIMARY KEY,
+  users INTEGER NOT NULL,
+  snapshots INTEGER NOT NULL,
+  avg_score NUMERIC(6,2) NOT NULL,
+  low_users INTEGER NOT NULL,
+  medium_users INTEGER NOT NULL,
+  high_users INTEGER NOT NULL,
+  refreshed_at TIMESTAMPTZ NOT NULL
+);
+
+-- Vintage curve events per closed month (analytics.cohorts); a month is listed in
+-- cohort_cached_months once computed, even when it had no events.
+CREATE TABLE cohort_events_monthly (
+  event_month DATE NOT NULL,
+  cohort_month DATE NOT NULL,
+  account_type VARCHAR(50) NOT NULL,
+  late_accounts INTEGER NOT NULL,
+  defaulted_accounts INTEGER NOT NULL,
+  PRIMARY KEY (event_month, cohort_month, account_type)
+);
+CREATE TABLE cohort_cached_months (
+  event_month DATE PRIMARY KEY,
+  computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- backend/api/migrations build this same schema on an empty or older database (manage.py migrate).
 
 -- Seed users; support evaluation lookups by APP IDs, numeric IDs, and usernames.
 INSERT INTO users (